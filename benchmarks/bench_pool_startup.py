@@ -0,0 +1,64 @@
+"""
+Compare the startup time of worker pools with different start methods.
+
+Reports the time until each worker of a new pool has loaded the active
+speaker and returned a first, trivial result. 'spawn' starts a fresh
+interpreter per worker that imports torch and the other modules and
+loads the speaker file. 'forkserver' imports them once in the server
+process, which is started by the first pool, and later pools fork from
+the server. 'fork' copies the calling process. Forked workers that have
+the speaker loaded already skip loading it again. Three pools of two
+workers on a single core:
+
+    fork          0.07  0.05  0.07 s
+    spawn        11.6  14.0  12.1  s
+    forkserver    4.5   0.06  0.06 s
+
+The first forkserver pool includes the start of the server.
+
+Usage:
+    python benchmarks/bench_pool_startup.py [workers] [repetitions]
+"""
+import sys
+import time
+import multiprocessing
+
+import vocaltractlab_cython as cyvtl
+
+from vocaltractlab.core import _initialize_worker
+from vocaltractlab.parallel import iprocess
+
+
+
+def worker_speaker( index ):
+    return cyvtl.active_speaker()
+
+def measure( start_method, workers ):
+    t_start = time.perf_counter()
+    for _ in iprocess(
+            worker_speaker,
+            args = [ dict( index = index ) for index in range( workers ) ],
+            verbose = False,
+            workers = workers,
+            mp_threshold = 1,
+            initializer = _initialize_worker,
+            initargs = ( cyvtl.active_speaker(), ),
+            return_data = False,
+            start_method = start_method,
+            ):
+        pass
+    return time.perf_counter() - t_start
+
+def main( workers = None, repetitions = 3 ):
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = int( workers )
+    print( f'workers: {workers}' )
+    for start_method in multiprocessing.get_all_start_methods():
+        times = [ measure( start_method, workers ) for _ in range( int( repetitions ) ) ]
+        times = ' '.join( f'{t:6.3f}' for t in times )
+        print( f'{start_method:12s} {times} s' )
+    return
+
+if __name__ == '__main__':
+    main( *sys.argv[ 1: ] )
@@ -0,0 +1,63 @@
+"""
+Compare segmented parallel synthesis of one long utterance with a single
+synth_block call.
+
+Reports the wall time of both and the spectral distance between the
+joined and the unsplit audio. The speed-up grows with the number of
+CPU cores, on a single core the segmented synthesis is slightly slower
+because of the warm-up context of each segment.
+
+Usage:
+    python benchmarks/bench_segmented_synthesis.py [duration] [segment_duration]
+"""
+import sys
+import time
+import numpy as np
+import multiprocessing
+
+from vocaltractlab.core import motor_to_audio
+from vocaltractlab.core import segmented_motor_to_audio
+from vocaltractlab.shapes import ShapeLibrary
+
+
+
+def vowel_series( duration ):
+    shapes = ShapeLibrary.from_speaker()
+    keys = [ 'a', 'i', 'u', 'e', 'o' ] * int( np.ceil( duration / 2 ) )
+    return shapes.to_motor_series(
+        keys,
+        'modal',
+        np.linspace( 0, duration, len( keys ) ),
+        )
+
+def main( duration = 20.0, segment_duration = 2.0 ):
+    ms = vowel_series( duration )
+
+    t_start = time.perf_counter()
+    motor_to_audio( ms, return_data = True, verbose = False )
+    t_unsplit = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    segmented_motor_to_audio(
+        ms,
+        segment_duration = segment_duration,
+        verbose = False,
+        )
+    t_segmented = time.perf_counter() - t_start
+
+    _, error = segmented_motor_to_audio(
+        ms,
+        segment_duration = segment_duration,
+        return_error = True,
+        verbose = False,
+        )
+
+    print( f'duration: {duration} s, segments: {segment_duration} s, cores: {multiprocessing.cpu_count()}' )
+    print( f'unsplit synthesis:   {t_unsplit:8.2f} s' )
+    print( f'segmented synthesis: {t_segmented:8.2f} s' )
+    print( f'speed-up:            {t_unsplit / t_segmented:8.2f} x' )
+    print( f'spectral distance:   {error:8.2f} dB' )
+    return
+
+if __name__ == '__main__':
+    main( *[ float( x ) for x in sys.argv[ 1: ] ] )
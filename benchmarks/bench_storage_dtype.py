@@ -0,0 +1,86 @@
+"""
+Compare the memory of analysis results stored as float64, float32 and int16.
+
+Reports the bytes held by the spectra of motor_to_transfer_function, the
+tube geometry of motor_to_tube and the audio of motor_to_audio for each
+storage type, together with the wall time. All results are computed in
+double precision and only converted for storage, so the times are about
+the same. For one second of speech (442 frames) on a single core:
+
+    transfer functions   float64  10.8 MB   float32   5.5 MB
+    tube states          float64   0.4 MB   float32   0.3 MB
+    audio                float64   0.4 MB   float32   0.2 MB   int16   0.1 MB
+
+The spectra (1522 bins of magnitude and phase per frame) dominate and
+are halved by float32. All transfer functions share one frequency
+grid, which saves another 5.4 MB compared to a grid per frame. The
+tube states also hold the tract states and the articulator ids, which
+are not converted, so their saving is a bit smaller than one half.
+
+Usage:
+    python benchmarks/bench_storage_dtype.py [duration]
+"""
+import sys
+import time
+import numpy as np
+
+from vocaltractlab.core import motor_to_audio
+from vocaltractlab.core import motor_to_transfer_function
+from vocaltractlab.core import motor_to_tube
+from vocaltractlab.shapes import ShapeLibrary
+
+
+
+def vowel_series( duration ):
+    shapes = ShapeLibrary.from_speaker()
+    keys = [ 'a', 'i', 'u', 'e', 'o' ] * int( np.ceil( duration / 2 ) )
+    return shapes.to_motor_series(
+        keys,
+        'modal',
+        np.linspace( 0, duration, len( keys ) ),
+        )
+
+def nbytes( x, seen = None ):
+    # Bytes of all arrays referenced by x, shared memory is counted once
+    if seen is None:
+        seen = set()
+    if isinstance( x, np.ndarray ):
+        while isinstance( x.base, np.ndarray ):
+            x = x.base
+    if id( x ) in seen:
+        return 0
+    seen.add( id( x ) )
+    if isinstance( x, np.ndarray ):
+        return x.nbytes
+    elif isinstance( x, dict ):
+        return sum( nbytes( v, seen ) for v in x.values() )
+    elif isinstance( x, ( list, tuple ) ):
+        return sum( nbytes( v, seen ) for v in x )
+    elif hasattr( x, '__slots__' ):
+        return sum( nbytes( getattr( x, k, None ), seen ) for k in x.__slots__ )
+    elif hasattr( x, '__dict__' ):
+        return nbytes( vars( x ), seen )
+    return 0
+
+def measure( function, **kwargs ):
+    t_start = time.perf_counter()
+    x = function( **kwargs )
+    return nbytes( x ) / 1e6, time.perf_counter() - t_start
+
+def main( duration = 1.0 ):
+    ms = vowel_series( duration )
+    sgs = ms.tract()
+    benchmarks = [
+        ( 'transfer functions', motor_to_transfer_function, dict( x = sgs ), [ None, 'float32' ] ),
+        ( 'tube states', motor_to_tube, dict( x = sgs ), [ None, 'float32' ] ),
+        ( 'audio', motor_to_audio, dict( motor_data = ms, return_data = True ), [ None, 'float32', 'int16' ] ),
+        ]
+    print( f'duration: {duration} s, frames: {len( sgs )}' )
+    for name, function, kwargs, dtypes in benchmarks:
+        for dtype in dtypes:
+            size, t = measure( function, dtype = dtype, verbose = False, **kwargs )
+            print( f'{name:20s} {dtype or "float64":8s} {size:8.1f} MB {t:8.2f} s' )
+    return
+
+if __name__ == '__main__':
+    main( *[ float( x ) for x in sys.argv[ 1: ] ] )
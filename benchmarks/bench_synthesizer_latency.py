@@ -0,0 +1,69 @@
+"""
+Compare the latency of motor_to_audio and Synthesizer for short utterances.
+
+Reports the median wall time of motor_to_audio and of
+Synthesizer.synthesize, and the breakdown of the latter into parameter
+conversion, synth_block and post-processing (resampling to 16 kHz,
+normalization, int16). Measured on a single, shared core (ms):
+
+    duration   motor_to_audio   synthesizer   parameters   synth_block   postprocess
+    0.02 s           100.8          89.6         0.02          77.1           0.2
+    0.05 s           168.9         176.6         0.01         174.7           0.3
+    0.10 s           357.2         330.7         0.02         346.5           0.2
+
+The Synthesizer saves about 10 ms per call, its own overhead is below
+a millisecond. synth_block dominates and its time grows with the
+duration (on this machine it is slower than real time), so sub-100 ms
+latency is only reached for very short utterances or on faster cores.
+The times vary by some ms between runs.
+
+Usage:
+    python benchmarks/bench_synthesizer_latency.py [repetitions]
+"""
+import sys
+import time
+import numpy as np
+
+from vocaltractlab.core import motor_to_audio
+from vocaltractlab.shapes import ShapeLibrary
+from vocaltractlab.synthesizer import Synthesizer
+
+
+
+def median_time( function, repetitions ):
+    times = []
+    for _ in range( repetitions ):
+        t_start = time.perf_counter()
+        function()
+        times.append( time.perf_counter() - t_start )
+    return 1e3 * np.median( times )
+
+def main( repetitions = 10 ):
+    repetitions = int( repetitions )
+    shapes = ShapeLibrary.from_speaker()
+    kwargs = dict( sr = 16000, normalize_audio = -1, dtype = 'int16' )
+    synthesizer = Synthesizer( **kwargs )
+    print( 'duration   motor_to_audio   synthesizer   parameters   synth_block   postprocess' )
+    for duration in [ 0.02, 0.05, 0.1 ]:
+        ms = shapes.to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, duration ] )
+        t_motor_to_audio = median_time(
+            lambda: motor_to_audio( ms, return_data = True, verbose = False, **kwargs ),
+            repetitions,
+            )
+        t_synthesizer = median_time( lambda: synthesizer.synthesize( ms ), repetitions )
+        tract, glottis, state_samples = synthesizer.parameters( ms )
+        audio = synthesizer.synthesize_block( tract, glottis, state_samples )
+        t_parameters = median_time( lambda: synthesizer.parameters( ms ), repetitions )
+        t_synth_block = median_time(
+            lambda: synthesizer.synthesize_block( tract, glottis, state_samples ),
+            repetitions,
+            )
+        t_postprocess = median_time( lambda: synthesizer.postprocess( audio ), repetitions )
+        print(
+            f'{duration:.2f} s    {t_motor_to_audio:12.1f}  {t_synthesizer:12.1f}'
+            f'  {t_parameters:11.2f}  {t_synth_block:12.1f}  {t_postprocess:12.1f}'
+            )
+    return
+
+if __name__ == '__main__':
+    main( *sys.argv[ 1: ] )
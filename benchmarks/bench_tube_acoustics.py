@@ -0,0 +1,82 @@
+"""
+Compare the NumPy tube acoustics engine with the VocalTractLab API.
+
+Reports the time per frame of both transfer function engines and the
+formant deviation of the NumPy engine on a trajectory of interpolated
+vowel shapes.
+
+Usage:
+    python benchmarks/bench_tube_acoustics.py [n_frames]
+"""
+import sys
+import time
+import numpy as np
+
+from vocaltractlab_cython import get_constants
+from vocaltractlab_cython import get_shape
+from vocaltractlab_cython import tract_state_to_transfer_function
+from vocaltractlab_cython import tract_state_to_tube_state
+from vocaltractlab.frequency_domain import spectra_to_formants
+from vocaltractlab.tube_acoustics import tube_to_transfer_function
+
+
+
+def vowel_trajectory( n_frames ):
+    shapes = np.array( [
+        get_shape( vowel, params = 'tract' )
+        for vowel in [ 'a', 'e', 'i', 'o', 'u', 'E', 'O', '@', 'a' ]
+        ] )
+    t = np.linspace( 0, len( shapes ) - 1, n_frames )
+    index = np.minimum( t.astype( int ), len( shapes ) - 2 )
+    w = ( t - index )[ :, np.newaxis ]
+    return ( 1 - w ) * shapes[ index ] + w * shapes[ index + 1 ]
+
+def main( n_frames = 200, n_spectrum_samples = 8192 ):
+    sr = get_constants()[ 'sr_audio' ]
+    n_bins = round( n_spectrum_samples**2 / sr )
+    frequencies = np.arange( n_bins ) * sr / n_spectrum_samples
+    tract_states = vowel_trajectory( n_frames )
+
+    start = time.perf_counter()
+    vtl_spectra = np.array( [
+        tract_state_to_transfer_function(
+            ts,
+            n_spectrum_samples = n_spectrum_samples,
+            save_phase_spectrum = False,
+            )[ 'magnitude_spectrum' ][ : n_bins ]
+        for ts in tract_states
+        ] )
+    t_vtl = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tubes = [
+        tract_state_to_tube_state( ts, fast_calculation = True )
+        for ts in tract_states
+        ]
+    t_tube = time.perf_counter() - start
+    start = time.perf_counter()
+    h = tube_to_transfer_function(
+        tube_length = np.array( [ x[ 'tube_length' ] for x in tubes ] ),
+        tube_area = np.array( [ x[ 'tube_area' ] for x in tubes ] ),
+        frequencies = frequencies,
+        )
+    t_acoustics = time.perf_counter() - start
+
+    f_vtl = spectra_to_formants( vtl_spectra, n_spectrum_samples )
+    f_np = spectra_to_formants( np.abs( h ), n_spectrum_samples )
+    rel_error = np.abs( f_np - f_vtl ) / f_vtl
+
+    print( f'frames: {n_frames}, bins: {n_bins}' )
+    print( f'vtl   transfer function: {1e3 * t_vtl / n_frames:8.3f} ms/frame' )
+    print( f'numpy tube geometry:     {1e3 * t_tube / n_frames:8.3f} ms/frame' )
+    print( f'numpy tube acoustics:    {1e3 * t_acoustics / n_frames:8.3f} ms/frame' )
+    print( f'speed-up:                {t_vtl / ( t_tube + t_acoustics ):8.2f} x' )
+    for k in range( f_vtl.shape[ 1 ] ):
+        print(
+            f'F{k+1} deviation: median {100 * np.nanmedian( rel_error[ :, k ] ):5.2f} %,'
+            f' 90th percentile {100 * np.nanpercentile( rel_error[ :, k ], 90 ):5.2f} %'
+            )
+    return
+
+if __name__ == '__main__':
+    main( *[ int( arg ) for arg in sys.argv[ 1: ] ] )
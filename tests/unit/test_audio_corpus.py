@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+import multiprocessing
+import numpy as np
+from vocaltractlab.corpus import AudioCorpus
+from vocaltractlab.core import motor_to_audio, motor_to_corpus
+from vocaltractlab.shapes import ShapeLibrary
+
+def _append( args ):
+    path, seed = args
+    x = np.full( 100 + seed, seed, dtype = np.int16 )
+    return AudioCorpus( path ).append( x, seed = seed )
+
+class TestAudioCorpus(unittest.TestCase):
+
+    def test_append_and_read(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join( tmp_dir, 'corpus' )
+            corpus = AudioCorpus( path, dtype = 'float32', sr = 16000 )
+            x = np.linspace( -0.5, 0.5, 1000 )
+            self.assertEqual( corpus.append( x, motor_file = 'a.tsq' ), 0 )
+            self.assertEqual( corpus.append( np.zeros( ( 1, 10 ) ) ), 1 )
+            self.assertEqual( corpus[ 0 ].dtype, np.float32 )
+            np.testing.assert_allclose( corpus[ 0 ], x, atol = 1e-7 )
+            loaded = AudioCorpus( path, dtype = 'int16' )
+            self.assertEqual( loaded.dtype, np.float32 )
+            self.assertEqual( loaded.sr, 16000 )
+            self.assertEqual( len( loaded ), 2 )
+            np.testing.assert_array_equal( loaded.lengths, [ 1000, 10 ] )
+            np.testing.assert_array_equal( loaded.offsets, [ 0, 1000 ] )
+            self.assertEqual( loaded.metadata( 0 ), dict( motor_file = 'a.tsq' ) )
+            self.assertEqual( loaded[ -1 ].shape, ( 10, ) )
+            with self.assertRaises(IndexError):
+                loaded[ 2 ]
+
+    def test_parallel_appends(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join( tmp_dir, 'corpus' )
+            AudioCorpus( path )
+            with multiprocessing.Pool( 4 ) as pool:
+                indices = pool.map( _append, [ ( path, seed ) for seed in range( 20 ) ] )
+            corpus = AudioCorpus( path )
+            self.assertEqual( sorted( indices ), list( range( 20 ) ) )
+            for seed, index in enumerate( indices ):
+                np.testing.assert_array_equal( corpus[ index ], np.full( 100 + seed, seed ) )
+                self.assertEqual( corpus.metadata( index ), dict( seed = seed ) )
+
+    def test_invalid_dtype(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with self.assertRaises(ValueError):
+                AudioCorpus( os.path.join( tmp_dir, 'corpus' ), dtype = 'float64' )
+
+class TestMotorToCorpus(unittest.TestCase):
+
+    def test_valid_conversion(self):
+        shapes = ShapeLibrary.from_speaker()
+        motor_data = [
+            shapes.to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, duration ] )
+            for duration in [ 0.1, 0.2, 0.05, 0.15 ]
+            ]
+        expected = motor_to_audio(
+            motor_data,
+            return_data = True,
+            dtype = 'int16',
+            verbose = False,
+            )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join( tmp_dir, 'corpus' )
+            indices = motor_to_corpus(
+                motor_data,
+                path,
+                metadata = [ dict( item = i ) for i in range( 4 ) ],
+                workers = 2,
+                verbose = False,
+                )
+            corpus = AudioCorpus( path )
+            self.assertEqual( corpus.sr, 44100 )
+            for i, index in enumerate( indices ):
+                np.testing.assert_array_equal( corpus[ index ], expected[ i ][ 0 ] )
+                self.assertEqual( corpus.metadata( index )[ 'item' ], i )
+                self.assertIn( 'speaker', corpus.metadata( index ) )
+
+if __name__ == '__main__':
+    unittest.main()
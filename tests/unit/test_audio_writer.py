@@ -0,0 +1,54 @@
+import unittest
+import threading
+import time
+import numpy as np
+from vocaltractlab.audioprocessing import AudioWriter
+
+class TestAudioWriter(unittest.TestCase):
+
+    def test_writes_all_audio_on_exit(self):
+        written = {}
+        def save_function( file_path, x, sr ):
+            time.sleep( 0.01 )
+            written[ file_path ] = ( x, sr )
+        with AudioWriter( workers = 2, save_function = save_function ) as writer:
+            for index in range( 20 ):
+                writer.submit( f'{index}.wav', np.full( 4, index ), 16000 )
+        self.assertEqual( len( written ), 20 )
+        np.testing.assert_array_equal( written[ '7.wav' ][ 0 ], np.full( 4, 7 ) )
+        self.assertEqual( written[ '7.wav' ][ 1 ], 16000 )
+
+    def test_queue_is_bounded(self):
+        release = threading.Event()
+        def save_function( file_path, x, sr ):
+            release.wait()
+        writer = AudioWriter(
+            workers = 1,
+            max_queue_size = 2,
+            save_function = save_function,
+            )
+        writer.submit( 'a.wav', np.zeros( 4 ), 16000 )
+        writer.submit( 'b.wav', np.zeros( 4 ), 16000 )
+        blocked = threading.Thread(
+            target = writer.submit,
+            args = ( 'c.wav', np.zeros( 4 ), 16000 ),
+            )
+        blocked.start()
+        blocked.join( timeout = 0.2 )
+        self.assertTrue( blocked.is_alive() )
+        release.set()
+        blocked.join( timeout = 5 )
+        self.assertFalse( blocked.is_alive() )
+        writer.close()
+
+    def test_errors_are_raised(self):
+        def save_function( file_path, x, sr ):
+            raise OSError( file_path )
+        with self.assertRaises(OSError):
+            with AudioWriter( save_function = save_function ) as writer:
+                writer.submit( 'a.wav', np.zeros( 4 ), 16000 )
+        with self.assertRaises(RuntimeError):
+            writer.submit( 'b.wav', np.zeros( 4 ), 16000 )
+
+if __name__ == '__main__':
+    unittest.main()
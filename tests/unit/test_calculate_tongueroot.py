@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+from vocaltractlab_cython import get_shape, get_constants
+from vocaltractlab_cython import calculate_tongueroot_automatically
+from vocaltractlab_cython import tract_state_to_limited_tract_state
+from target_approximation.vocaltractlab import SupraGlottalSeries, MotorSeries
+from vocaltractlab.core import calculate_tongueroot
+
+class TestCalculateTongueroot(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        a = get_shape( 'a', params = 'tract' )
+        i = get_shape( 'i', params = 'tract' )
+        # Change the tongue root in all frames and the lips in the second
+        states = np.array( [ a, a, i, i, a ] )
+        states[ :, 14 ] = -1.0
+        states[ :, 15 ] = -1.0
+        states[ 1, 4 ] += 0.2
+        self.tract_states = states
+
+    def expected_tongueroot(self):
+        calculate_tongueroot_automatically( True )
+        try:
+            return np.array( [
+                tract_state_to_limited_tract_state( ts )[ 14 : 16 ]
+                for ts in self.tract_states
+                ] )
+        finally:
+            # Do not leak the setting into other tests, False is the default
+            calculate_tongueroot_automatically( False )
+
+    def test_supra_glottal_series(self):
+        sgs = SupraGlottalSeries( self.tract_states, sr = 441 )
+        y = calculate_tongueroot( sgs, chunk_size = 2, verbose = False )
+        self.assertIsInstance( y, SupraGlottalSeries )
+        self.assertEqual( y.sr, 441 )
+        x = y.to_numpy( transpose = False )
+        np.testing.assert_allclose( x[ :, 14 : 16 ], self.expected_tongueroot() )
+        # All other parameters are unchanged
+        np.testing.assert_array_equal( x[ :, : 14 ], self.tract_states[ :, : 14 ] )
+        # The input is not modified
+        self.assertTrue( np.all( sgs.to_numpy( transpose = False )[ :, 14 ] == -1.0 ) )
+
+    def test_skip_unchanged_is_equivalent(self):
+        sgs = SupraGlottalSeries( self.tract_states, sr = 441 )
+        skipped = calculate_tongueroot( sgs, verbose = False )
+        computed = calculate_tongueroot( sgs, skip_unchanged = False, verbose = False )
+        np.testing.assert_allclose(
+            skipped.to_numpy( transpose = False ),
+            computed.to_numpy( transpose = False ),
+            )
+
+    def test_motor_series(self):
+        glottis = np.tile( get_shape( 'modal', params = 'glottis' ), ( 5, 1 ) )
+        ms = MotorSeries(
+            np.concatenate( [ self.tract_states, glottis ], axis = 1 ),
+            sr = 441,
+            )
+        y = calculate_tongueroot( ms, verbose = False )
+        self.assertIsInstance( y, MotorSeries )
+        x = y.to_numpy( transpose = False )
+        self.assertEqual(
+            x.shape[ 1 ],
+            get_constants()[ 'n_tract_params' ] + get_constants()[ 'n_glottis_params' ],
+            )
+        np.testing.assert_allclose( x[ :, 14 : 16 ], self.expected_tongueroot() )
+        np.testing.assert_array_equal( x[ :, 19: ], glottis )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from vocaltractlab_cython import get_shape
+from vocaltractlab.inversion import Codebook
+
+class TestCodebook(unittest.TestCase):
+
+    def test_from_tract_states(self):
+        tract_states = np.array( [
+            get_shape( vowel, params = 'tract' )
+            for vowel in [ 'a', 'i', 'u' ]
+            ] )
+        codebook = Codebook.from_tract_states( tract_states, verbose = False )
+        self.assertEqual( len( codebook ), 3 )
+        self.assertEqual( codebook.formants.shape, ( 3, 4 ) )
+        self.assertEqual( codebook.tube_area.shape, codebook.tube_length.shape )
+        # The formants of /i/ are closest to the /i/ entry
+        distance, index = codebook.query( codebook.formants[ 1 ] * 1.02 )
+        self.assertEqual( index[ 0 ], 1 )
+        np.testing.assert_allclose( distance[ 0 ], np.sqrt( 3 ) * np.log( 1.02 ), rtol = 1e-4 )
+        np.testing.assert_array_equal(
+            codebook.invert( codebook.formants[ 2 ] )[ 0 ],
+            codebook.tract_states[ 2 ],
+            )
+
+    def test_query_skips_missing_formants(self):
+        formants = np.array( [
+            [ 500, 1500, 2500, 3500 ],
+            [ 700, 1100, np.nan, np.nan ],
+            [ 300, 2200, 3000, np.nan ],
+            ] )
+        codebook = Codebook(
+            tract_states = np.arange( 3 * 19 ).reshape( 3, 19 ),
+            formants = formants,
+            tube_length = np.ones( ( 3, 40 ) ),
+            tube_area = np.ones( ( 3, 40 ) ),
+            )
+        _, indices = codebook.query( [ [ 700, 1100, 2500 ], [ 310, 2200, 3000 ] ], k = 2 )
+        self.assertEqual( indices.shape, ( 2, 2 ) )
+        self.assertNotIn( 1, indices )
+        _, indices = codebook.query( [ 700, 1100 ], n_formants = 2 )
+        self.assertEqual( indices[ 0 ], 1 )
+        with self.assertRaises(ValueError):
+            codebook.query( [ 700, 1100, 2500 ], n_formants = 5 )
+
+    def test_save_and_load(self):
+        rng = np.random.default_rng( 0 )
+        codebook = Codebook(
+            tract_states = rng.normal( size = ( 10, 19 ) ),
+            formants = rng.uniform( 200, 4000, size = ( 10, 4 ) ),
+            tube_length = rng.uniform( size = ( 10, 40 ) ),
+            tube_area = rng.uniform( size = ( 10, 40 ) ),
+            )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join( tmp_dir, 'codebook.npz' )
+            codebook.save( file_path )
+            loaded = Codebook.load( file_path )
+        for name in [ 'tract_states', 'formants', 'tube_length', 'tube_area' ]:
+            np.testing.assert_array_equal( getattr( loaded, name ), getattr( codebook, name ) )
+
+if __name__ == '__main__':
+    unittest.main()
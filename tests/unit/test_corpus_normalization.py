@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from vocaltractlab.audioprocessing import CorpusStatistics
+from vocaltractlab.core import motor_to_audio
+from vocaltractlab.shapes import ShapeLibrary
+
+class TestCorpusStatistics(unittest.TestCase):
+
+    def test_update(self):
+        statistics = CorpusStatistics()
+        statistics.update( CorpusStatistics.measure( [ 0.5, -0.5 ] ) )
+        statistics.update( CorpusStatistics.measure( [ 0.0, 0.25, -1.0, 0.0 ] ) )
+        self.assertEqual( statistics.n_files, 2 )
+        self.assertEqual( statistics.peak, 1.0 )
+        self.assertAlmostEqual( statistics.rms, np.sqrt( 1.5625 / 6 ) )
+        self.assertAlmostEqual( statistics.gain( dBFS = -6 ), 10**( -0.3 ) )
+        self.assertEqual( CorpusStatistics().gain(), 1.0 )
+
+class TestCorpusNormalization(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        shapes = ShapeLibrary.from_speaker()
+        self.motor_data = []
+        for pressure in [ 4000, 8000, 6000, 2000 ]:
+            ms = shapes.to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, 0.1 ] )
+            ms[ 'PR' ] = np.full( len( ms ), pressure )
+            self.motor_data.append( ms )
+
+    def test_single_gain(self):
+        raw = motor_to_audio(
+            self.motor_data,
+            normalize_audio = None,
+            return_data = True,
+            verbose = False,
+            )
+        peak = max( np.max( np.abs( x ) ) for x in raw )
+        for segment_duration in [ None, 0.05 ]:
+            audio = motor_to_audio(
+                self.motor_data,
+                normalize_audio = -1,
+                normalization = 'corpus',
+                segment_duration = segment_duration,
+                return_data = True,
+                verbose = False,
+                )
+            with self.subTest( segment_duration = segment_duration ):
+                self.assertEqual( len( audio ), len( raw ) )
+                self.assertAlmostEqual(
+                    max( np.max( np.abs( x ) ) for x in audio ),
+                    10**( -0.05 ),
+                    places = 2 if segment_duration else 6,
+                    )
+                if segment_duration is None:
+                    for x, y in zip( raw, audio ):
+                        np.testing.assert_allclose( y, x * 10**( -0.05 ) / peak )
+
+    def test_invalid_normalization(self):
+        with self.assertRaises(ValueError):
+            motor_to_audio( self.motor_data, normalization = 'invalid', verbose = False )
+
+if __name__ == '__main__':
+    unittest.main()
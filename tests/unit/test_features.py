@@ -0,0 +1,65 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from vocaltractlab.core import motor_to_audio
+from vocaltractlab.features import (
+    DurationStatistics,
+    LogSpectrogram,
+    MelSpectrogram,
+    RMSEnergy,
+    extract_features,
+    feature_file_path,
+    )
+from vocaltractlab.shapes import ShapeLibrary
+
+class TestFeatures(unittest.TestCase):
+
+    def test_extract_features(self):
+        sr = 16000
+        x = np.zeros( sr )
+        x[ 4000 : 12000 ] = 0.5 * np.sin( 2 * np.pi * 1000 * np.arange( 8000 ) / sr )
+        features = extract_features(
+            x,
+            sr,
+            [ MelSpectrogram( n_mels = 40 ), LogSpectrogram(), RMSEnergy(), DurationStatistics() ],
+            )
+        n_frames = 1 + sr // 256
+        self.assertEqual( features[ 'mel' ].shape, ( n_frames, 40 ) )
+        self.assertEqual( features[ 'log_spectrogram' ].shape, ( n_frames, 513 ) )
+        self.assertEqual( features[ 'rms' ].shape, ( n_frames, ) )
+        self.assertEqual( np.argmax( features[ 'log_spectrogram' ][ 30 ] ), 64 )
+        self.assertAlmostEqual( features[ 'rms' ][ 30 ], 0.5 / np.sqrt( 2 ), places = 3 )
+        self.assertAlmostEqual( float( features[ 'duration' ] ), 1.0 )
+        self.assertAlmostEqual( float( features[ 'active_duration' ] ), 0.5, places = 3 )
+        # int16 audio gives the same features
+        int16_features = extract_features(
+            np.round( x * 32767 ).astype( np.int16 ),
+            sr,
+            [ RMSEnergy() ],
+            )
+        np.testing.assert_allclose( int16_features[ 'rms' ], features[ 'rms' ], atol = 1e-4 )
+        with self.assertRaises(ValueError):
+            extract_features( x, sr, [ RMSEnergy(), RMSEnergy() ] )
+
+    def test_motor_to_audio(self):
+        ms = ShapeLibrary.from_speaker().to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, 0.1 ] )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            feature_file = os.path.join( tmp_dir, 'features.npz' )
+            audio = motor_to_audio(
+                ms,
+                return_data = True,
+                features = [ MelSpectrogram(), DurationStatistics() ],
+                feature_files = feature_file,
+                verbose = False,
+                )[ 0 ]
+            with np.load( feature_file ) as features:
+                self.assertEqual( int( features[ 'sr' ] ), 44100 )
+                self.assertEqual( int( features[ 'n_samples' ] ), audio.shape[ -1 ] )
+                self.assertEqual( features[ 'mel' ].shape, ( 1 + audio.shape[ -1 ] // 256, 80 ) )
+        with self.assertRaises(ValueError):
+            motor_to_audio( ms, features = [ RMSEnergy() ], verbose = False )
+        self.assertEqual( feature_file_path( 'a/b.wav' ), 'a/b.features.npz' )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from vocaltractlab.core import imotor_to_audio, iphoneme_to_audio, motor_to_audio
+from vocaltractlab.shapes import ShapeLibrary
+
+class TestImotorToAudio(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        shapes = ShapeLibrary.from_speaker()
+        # Series of different lengths, so they complete in a different order
+        self.motor_data = [
+            shapes.to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, duration ] )
+            for duration in [ 0.4, 0.1, 0.3, 0.05, 0.2 ]
+            ]
+
+    def test_completion_order(self):
+        results = dict( imotor_to_audio(
+            self.motor_data,
+            workers = 2,
+            verbose = False,
+            ) )
+        self.assertEqual( sorted( results.keys() ), list( range( 5 ) ) )
+        expected = motor_to_audio(
+            self.motor_data,
+            return_data = True,
+            workers = 2,
+            verbose = False,
+            )
+        for index, audio in enumerate( expected ):
+            np.testing.assert_array_equal( results[ index ], audio )
+
+    def test_input_order(self):
+        indices = [
+            index
+            for index, _ in imotor_to_audio(
+                iter( self.motor_data ),
+                ordered = True,
+                workers = 2,
+                verbose = False,
+                )
+            ]
+        self.assertEqual( indices, list( range( 5 ) ) )
+
+    def test_storage_dtype(self):
+        reference = motor_to_audio(
+            self.motor_data[ :2 ],
+            return_data = True,
+            verbose = False,
+            )
+        for dtype, atol in [ ( 'float32', 1e-7 ), ( 'int16', 1.0 ) ]:
+            audio = motor_to_audio(
+                self.motor_data[ :2 ],
+                return_data = True,
+                dtype = dtype,
+                verbose = False,
+                )
+            with self.subTest( dtype = dtype ):
+                for x, y in zip( reference, audio ):
+                    self.assertEqual( y.dtype, np.dtype( dtype ) )
+                    scale = 32767 if dtype == 'int16' else 1
+                    np.testing.assert_allclose( y, x * scale, atol = atol )
+
+class TestIphonemeToAudio(unittest.TestCase):
+
+    def test_valid_conversion(self):
+        phoneme_file = os.path.join(
+            os.path.dirname(__file__),
+            'resources',
+            'valid_phoneme_sequence.txt',
+            )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results = list( iphoneme_to_audio(
+                [ phoneme_file ],
+                gesture_files = [ os.path.join( tmp_dir, 'x.ges' ) ],
+                motor_files = [ os.path.join( tmp_dir, 'x.tsq' ) ],
+                verbose = False,
+                ) )
+            self.assertTrue( os.path.exists( os.path.join( tmp_dir, 'x.tsq' ) ) )
+        self.assertEqual( len( results ), 1 )
+        self.assertEqual( results[ 0 ][ 0 ], 0 )
+        self.assertGreater( results[ 0 ][ 1 ].shape[ -1 ], 0 )
+
+    def test_invalid_number_of_files(self):
+        with self.assertRaises(ValueError):
+            iphoneme_to_audio(
+                [ 'a.seg', 'b.seg' ],
+                gesture_files = [ 'a.ges' ],
+                motor_files = [ 'a.txt', 'b.txt' ],
+                )
+
+if __name__ == '__main__':
+    unittest.main()
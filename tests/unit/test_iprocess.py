@@ -0,0 +1,115 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from vocaltractlab.parallel import iprocess, set_start_method
+
+def _square( x ):
+    return x * x
+
+def _sleep_and_log( x, log_file ):
+    with open( log_file, 'a' ) as f:
+        f.write( f'{x}\n' )
+    time.sleep( 0.01 * x )
+    return x
+
+class TestIprocess(unittest.TestCase):
+
+    def test_lazy_input_in_order(self):
+        results = iprocess(
+            _square,
+            args = ( dict( x = x ) for x in range( 50 ) ),
+            verbose = False,
+            workers = 2,
+            )
+        self.assertEqual( list( results ), [ x * x for x in range( 50 ) ] )
+
+    def test_bounded_in_flight(self):
+        consumed = []
+        def args():
+            for x in range( 100 ):
+                consumed.append( x )
+                yield dict( x = x )
+        results = iprocess(
+            _square,
+            args = args(),
+            verbose = False,
+            workers = 2,
+            max_in_flight = 3,
+            )
+        self.assertEqual( next( results ), 0 )
+        self.assertLessEqual( len( consumed ), 4 )
+        results.close()
+
+    def test_discard_results(self):
+        results = iprocess(
+            _square,
+            args = [ dict( x = x ) for x in range( 8 ) ],
+            verbose = False,
+            workers = 2,
+            return_data = False,
+            )
+        self.assertEqual( list( results ), [ None ] * 8 )
+
+    def test_forkserver(self):
+        results = iprocess(
+            _square,
+            args = [ dict( x = x ) for x in range( 8 ) ],
+            verbose = False,
+            workers = 2,
+            start_method = 'forkserver',
+            )
+        self.assertEqual( list( results ), [ x * x for x in range( 8 ) ] )
+        with self.assertRaises(ValueError):
+            set_start_method( 'invalid' )
+
+    def test_sequential_below_threshold(self):
+        results = iprocess(
+            _square,
+            args = iter( [ dict( x = 2 ), dict( x = 3 ) ] ),
+            verbose = False,
+            )
+        self.assertEqual( list( results ), [ 4, 9 ] )
+
+    def test_longest_first(self):
+        log_dir = tempfile.mkdtemp()
+        self.addCleanup( shutil.rmtree, log_dir )
+        log_file = os.path.join( log_dir, 'iprocess_schedule.txt' )
+        durations = [ 1, 5, 2, 20, 3, 1 ]
+        results = list( iprocess(
+            _sleep_and_log,
+            args = [ dict( x = x, log_file = log_file ) for x in durations ],
+            verbose = False,
+            workers = 1,
+            max_in_flight = len( durations ),
+            cost = lambda kwargs: kwargs[ 'x' ],
+            ) )
+        # Results in input order, processed longest first
+        self.assertEqual( results, durations )
+        with open( log_file ) as f:
+            started = [ int( line ) for line in f.read().split() ]
+        self.assertEqual( started, sorted( durations, reverse = True ) )
+
+    def test_longest_first_bounded(self):
+        # The first item is the shortest, so in input order all others
+        # would be buffered until it completes if all were sorted
+        consumed = []
+        def args():
+            for x in range( 40 ):
+                consumed.append( x )
+                yield dict( x = x )
+        results = iprocess(
+            _square,
+            args = args(),
+            verbose = False,
+            workers = 2,
+            max_in_flight = 4,
+            cost = lambda kwargs: kwargs[ 'x' ],
+            )
+        self.assertEqual( next( results ), 0 )
+        self.assertLessEqual( len( consumed ), 8 )
+        self.assertEqual( list( results ), [ x * x for x in range( 1, 40 ) ] )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from vocaltractlab_cython import get_shape
+from target_approximation.vocaltractlab import SupraGlottalSeries
+from vocaltractlab.core import motor_to_svg, motor_to_video_frames
+
+class TestMotorToSvg(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        # Five frames, of which only three differ from their predecessor
+        a = get_shape( 'a', params = 'tract' )
+        i = get_shape( 'i', params = 'tract' )
+        self.sgs = SupraGlottalSeries(
+            np.array( [ a, a, i, i, a ] ),
+            sr = 441,
+            )
+
+    def test_return_svg_strings(self):
+        svgs = motor_to_svg( self.sgs, return_data = True, verbose = False )
+        self.assertEqual( len( svgs ), 5 )
+        self.assertTrue( all( '<svg' in svg for svg in svgs ) )
+        self.assertEqual( svgs[ 0 ], svgs[ 1 ] )
+        self.assertNotEqual( svgs[ 1 ], svgs[ 2 ] )
+        self.assertEqual( svgs[ 0 ], svgs[ 4 ] )
+
+    def test_skip_unchanged_is_equivalent(self):
+        skipped = motor_to_svg( self.sgs, return_data = True, verbose = False )
+        rendered = motor_to_svg(
+            self.sgs,
+            skip_unchanged = False,
+            return_data = True,
+            workers = 2,
+            verbose = False,
+            )
+        self.assertEqual( skipped, rendered )
+
+    def test_write_directory(self):
+        with tempfile.TemporaryDirectory() as svg_dir:
+            motor_to_svg( self.sgs, svg_files = svg_dir, verbose = False )
+            self.assertEqual(
+                sorted( os.listdir( svg_dir ) ),
+                [ f'{index:06d}.svg' for index in range( 5 ) ],
+                )
+
+    def test_invalid_number_of_files(self):
+        with self.assertRaises(ValueError):
+            motor_to_svg( self.sgs, svg_files = [ 'a.svg' ], verbose = False )
+
+    def test_frame_sink(self):
+        frames = []
+        motor_to_video_frames(
+            self.sgs,
+            frame_sink = lambda index, svg: frames.append( index ),
+            verbose = False,
+            )
+        self.assertEqual( frames, [ 0, 1, 2, 3, 4 ] )
+
+if __name__ == '__main__':
+    unittest.main()
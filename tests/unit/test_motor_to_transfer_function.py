@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from vocaltractlab_cython import get_shape
+from target_approximation.vocaltractlab import SupraGlottalSeries
+from vocaltractlab.core import motor_to_transfer_function
+
+class TestMotorToTransferFunction(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.sgs = SupraGlottalSeries(
+            np.array( [ get_shape( v, params = 'tract' ) for v in [ 'a', 'i' ] ] ),
+            sr = 441,
+            )
+
+    def test_band_limited_vtl(self):
+        full = motor_to_transfer_function( self.sgs, verbose = False )
+        limited = motor_to_transfer_function(
+            self.sgs,
+            max_frequency = 5000,
+            verbose = False,
+            )
+        n_bins = int( 5000 * 8192 / 44100 ) + 1
+        for x, y in zip( full, limited ):
+            self.assertEqual( y.magnitude_spectrum.shape, ( n_bins, ) )
+            self.assertEqual( y.frequencies.shape, ( n_bins, ) )
+            self.assertLessEqual( y.frequencies[ -1 ], 5000 )
+            np.testing.assert_allclose(
+                y.magnitude_spectrum,
+                x.magnitude_spectrum[ : n_bins ],
+                )
+            self.assertEqual( x.formants, y.formants )
+
+    def test_custom_grid_numpy(self):
+        frequencies = np.geomspace( 50, 5000, 300 )
+        tfs = motor_to_transfer_function(
+            self.sgs,
+            engine = 'numpy',
+            frequencies = frequencies,
+            verbose = False,
+            )
+        for tf in tfs:
+            self.assertEqual( tf.magnitude_spectrum.shape, ( 300, ) )
+            self.assertEqual( tf.phase_spectrum.shape, ( 300, ) )
+            np.testing.assert_allclose( tf.frequencies, frequencies )
+            self.assertTrue( 150 < tf.f1 < 1000 )
+
+    def test_custom_grid_vtl(self):
+        with self.assertRaises(ValueError):
+            motor_to_transfer_function(
+                self.sgs,
+                frequencies = np.linspace( 0, 5000, 100 ),
+                verbose = False,
+                )
+
+    def test_formants_only(self):
+        full = motor_to_transfer_function( self.sgs, verbose = False )
+        formants = motor_to_transfer_function(
+            self.sgs,
+            formants_only = True,
+            verbose = False,
+            )
+        self.assertEqual( formants.shape, ( 2, 4 ) )
+        # Within the bin spacing of the 8192 sample spectrum
+        np.testing.assert_allclose(
+            formants,
+            np.array( [ tf.formants for tf in full ], dtype = float ),
+            atol = 44100 / 8192,
+            )
+
+    def test_float32_storage(self):
+        full = motor_to_transfer_function( self.sgs, verbose = False )
+        for engine in [ 'vtl', 'numpy' ]:
+            tfs = motor_to_transfer_function(
+                self.sgs,
+                engine = engine,
+                dtype = 'float32',
+                verbose = False,
+                )
+            with self.subTest( engine = engine ):
+                for tf in tfs:
+                    self.assertEqual( tf.magnitude_spectrum.dtype, np.float32 )
+                    self.assertEqual( tf.phase_spectrum.dtype, np.float32 )
+        for x, y in zip( full, motor_to_transfer_function( self.sgs, dtype = 'float32', verbose = False ) ):
+            np.testing.assert_allclose( y.magnitude_spectrum, x.magnitude_spectrum, rtol = 1e-6 )
+            self.assertEqual( x.formants, y.formants )
+
+if __name__ == '__main__':
+    unittest.main()
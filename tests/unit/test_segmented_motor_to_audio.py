@@ -0,0 +1,84 @@
+import unittest
+import numpy as np
+from unittest import mock
+from vocaltractlab import core
+from vocaltractlab.core import motor_to_audio, segmented_motor_to_audio
+from vocaltractlab.segmentation import plan_segments, stitch_segments
+from vocaltractlab.shapes import ShapeLibrary
+
+class TestPlanSegments(unittest.TestCase):
+
+    def test_segments_cover_all_frames(self):
+        plan = plan_segments(
+            n_frames = 1000,
+            segment_frames = 300,
+            warmup_frames = 20,
+            crossfade_frames = 5,
+            )
+        self.assertEqual( plan[ 0 ], ( 0, 0, 300, 305 ) )
+        self.assertEqual( plan[ 1 ], ( 280, 300, 600, 605 ) )
+        self.assertEqual( plan[ -1 ][ 2 ], 1000 )
+        for previous, current in zip( plan[ : -1 ], plan[ 1 : ] ):
+            self.assertEqual( previous[ 2 ], current[ 1 ] )
+
+    def test_boundaries_at_quiet_frames(self):
+        loudness = np.ones( 1000 )
+        loudness[ 340 ] = 0.0
+        plan = plan_segments(
+            n_frames = 1000,
+            segment_frames = 300,
+            warmup_frames = 20,
+            crossfade_frames = 5,
+            loudness = loudness,
+            )
+        self.assertEqual( plan[ 1 ][ 1 ], 340 )
+
+    def test_stitch_reconstructs_identical_segments(self):
+        # Segments cut from the same signal are joined without error
+        state_samples = 10
+        x = np.random.default_rng( 0 ).normal( size = 1000 * state_samples )
+        plan = plan_segments( 1000, 300, 20, 5 )
+        segments = [
+            x[ synth_start * state_samples : synth_end * state_samples ]
+            for synth_start, _, _, synth_end in plan
+            ]
+        np.testing.assert_allclose( stitch_segments( segments, plan, state_samples ), x )
+
+class TestSegmentedMotorToAudio(unittest.TestCase):
+
+    def test_close_to_unsplit_audio(self):
+        shapes = ShapeLibrary.from_speaker()
+        ms = shapes.to_motor_series(
+            [ 'a', 'i', 'u' ],
+            'modal',
+            [ 0.0, 0.4, 0.8 ],
+            )
+        audio, error = segmented_motor_to_audio(
+            ms,
+            segment_duration = 0.3,
+            return_error = True,
+            verbose = False,
+            )
+        unsplit = motor_to_audio( ms, return_data = True, verbose = False )[ 0 ]
+        self.assertEqual( audio.shape, unsplit.shape )
+        self.assertLess( error, 3.0 )
+
+    def test_async_write(self):
+        ms = ShapeLibrary.from_speaker().to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, 0.2 ] )
+        with mock.patch.object( core, 'AudioWriter' ) as writer:
+            audio = motor_to_audio(
+                [ ms, ms ],
+                audio_files = [ 'a.wav', 'b.wav' ],
+                segment_duration = 0.1,
+                sr = 16000,
+                return_data = True,
+                verbose = False,
+                )
+        # The files are written by the AudioWriter, not by the items
+        submit = writer.return_value.__enter__.return_value.submit
+        self.assertEqual( [ c.args[ 0 ] for c in submit.call_args_list ], [ 'a.wav', 'b.wav' ] )
+        self.assertEqual( submit.call_args_list[ 0 ].args[ 2 ], 16000 )
+        np.testing.assert_array_equal( submit.call_args_list[ 1 ].args[ 1 ], audio[ 1 ] )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from vocaltractlab_cython import get_shape
+from target_approximation.vocaltractlab import SupraGlottalSeries
+from vocaltractlab.core import motor_to_transfer_function, motor_to_tube
+from vocaltractlab.frequency_domain import TransferFunctionSeries
+from vocaltractlab.storage import load_columns, save_columns
+from vocaltractlab.tube_state import TubeSeries
+
+class TestColumnStorage(unittest.TestCase):
+
+    def test_partial_reads(self):
+        columns = dict(
+            x = np.arange( 100 * 3, dtype = float ).reshape( 100, 3 ),
+            y = np.arange( 100, dtype = np.int16 ),
+            )
+        for compress in [ False, True ]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_path = os.path.join( tmp_dir, 'columns.npz' )
+                save_columns(
+                    file_path,
+                    columns,
+                    attributes = dict( sr = 441 ),
+                    compress = compress,
+                    )
+                loaded, attributes = load_columns(
+                    file_path,
+                    fields = [ 'x' ],
+                    frames = slice( 10, 20 ),
+                    )
+            with self.subTest( compress = compress ):
+                self.assertEqual( list( loaded.keys() ), [ 'x' ] )
+                np.testing.assert_array_equal( loaded[ 'x' ], columns[ 'x' ][ 10 : 20 ] )
+                self.assertEqual( attributes[ 'sr' ], 441 )
+
+    def test_missing_suffix(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join( tmp_dir, 'columns' )
+            save_columns( file_path, dict( x = np.arange( 10 ) ), attributes = dict( sr = 100 ) )
+            self.assertEqual( os.listdir( tmp_dir ), [ 'columns.npz' ] )
+            loaded, _ = load_columns( file_path, time_range = ( 0.02, 0.05 ) )
+        np.testing.assert_array_equal( loaded[ 'x' ], np.arange( 2, 5 ) )
+
+    def test_invalid_columns(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join( tmp_dir, 'columns.npz' )
+            with self.assertRaises(ValueError):
+                save_columns( file_path, dict( x = np.zeros( 3 ), y = np.zeros( 4 ) ) )
+            save_columns( file_path, dict( x = np.zeros( 3 ) ) )
+            with self.assertRaises(ValueError):
+                load_columns( file_path, fields = [ 'y' ] )
+            with self.assertRaises(ValueError):
+                load_columns( file_path, frames = slice( 1 ), time_range = ( 0, 1 ) )
+
+class TestSeriesStorage(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.sgs = SupraGlottalSeries(
+            np.array( [
+                get_shape( v, params = 'tract' )
+                for v in [ 'a', 'e', 'i', 'o', 'u' ]
+                ] ),
+            sr = 441,
+            )
+
+    def test_tube_series(self):
+        tube_states = motor_to_tube( self.sgs, verbose = False )
+        tube_series = TubeSeries.from_tube_states( tube_states )
+        self.assertEqual( len( tube_series ), 5 )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join( tmp_dir, 'tube' )
+            tube_series.save( file_path )
+            loaded = TubeSeries.load( file_path )
+            # Frames 2 and 3 start at 2 / 441 s
+            partial = TubeSeries.load(
+                file_path,
+                fields = [ 'tube_area' ],
+                time_range = ( 2 / 441, 4 / 441 ),
+                )
+        for x, y in zip( tube_states, loaded ):
+            np.testing.assert_array_equal( y.tube_area, x.tube_area )
+            np.testing.assert_array_equal( y.tube_articulator, x.tube_articulator )
+            self.assertEqual( y.constriction, x.constriction )
+        self.assertIsNone( partial.tube_length )
+        np.testing.assert_array_equal( partial.tube_area, tube_series.tube_area[ 2 : 4 ] )
+
+    def test_transfer_function_series(self):
+        tfs = motor_to_transfer_function( self.sgs, verbose = False )
+        tf_series = TransferFunctionSeries.from_transfer_functions( tfs )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join( tmp_dir, 'tf.npz' )
+            tf_series.save( file_path, compress = True )
+            loaded = TransferFunctionSeries.load( file_path )
+            formants = TransferFunctionSeries.load( file_path, fields = [ 'formants' ] )
+        for x, y in zip( tfs, loaded ):
+            np.testing.assert_array_equal( y.magnitude_spectrum, x.magnitude_spectrum )
+            np.testing.assert_array_equal( y.frequencies, x.frequencies )
+            self.assertEqual( y.formants, x.formants )
+        self.assertIsNone( formants.magnitude_spectrum )
+        np.testing.assert_array_equal( formants.formants, tf_series.formants )
+        with self.assertRaises(ValueError):
+            formants[ 0 ]
+
+if __name__ == '__main__':
+    unittest.main()
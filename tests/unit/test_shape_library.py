@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from vocaltractlab_cython import get_shape, get_constants
+from target_approximation.vocaltractlab import MotorSeries
+from vocaltractlab.shapes import ShapeLibrary
+
+class TestShapeLibrary(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        self.shapes = ShapeLibrary.from_speaker()
+
+    def test_matches_api(self):
+        constants = get_constants()
+        self.assertEqual( self.shapes.tract_shapes.shape[ 1 ], constants[ 'n_tract_params' ] )
+        self.assertEqual( self.shapes.glottis_shapes.shape[ 1 ], constants[ 'n_glottis_params' ] )
+        for name in [ 'a', 'i', 'u' ]:
+            np.testing.assert_array_equal( self.shapes[ name ], get_shape( name, 'tract' ) )
+        np.testing.assert_array_equal(
+            self.shapes.get_shape( 'modal', 'glottis' ),
+            get_shape( 'modal', 'glottis' ),
+            )
+
+    def test_blend(self):
+        a = self.shapes[ 'a' ]
+        i = self.shapes[ 'i' ]
+        np.testing.assert_allclose(
+            self.shapes.blend( { 'a': 1.0, 'i': 3.0 } ),
+            0.25 * a + 0.75 * i,
+            )
+        weights = np.random.default_rng( 0 ).dirichlet(
+            np.ones( len( self.shapes.tract_names ) ),
+            size = 10,
+            )
+        blended = self.shapes.blend( weights )
+        self.assertEqual( blended.shape, ( 10, len( a ) ) )
+        np.testing.assert_allclose( blended[ 3 ], weights[ 3 ] @ self.shapes.tract_shapes )
+
+    def test_interpolate(self):
+        x = self.shapes.interpolate( [ 'a', 'i', 'u' ], [ 0.0, 0.1, 0.3 ], sr = 100 )
+        self.assertEqual( x.shape[ 0 ], 31 )
+        np.testing.assert_allclose( x[ 0 ], self.shapes[ 'a' ] )
+        np.testing.assert_allclose( x[ 10 ], self.shapes[ 'i' ] )
+        np.testing.assert_allclose( x[ 30 ], self.shapes[ 'u' ] )
+        np.testing.assert_allclose( x[ 5 ], 0.5 * ( self.shapes[ 'a' ] + self.shapes[ 'i' ] ) )
+
+    def test_to_motor_series(self):
+        ms = self.shapes.to_motor_series(
+            tract_keys = [ 'a', 'i' ],
+            glottis_keys = 'modal',
+            times = [ 0.0, 0.5 ],
+            )
+        self.assertIsInstance( ms, MotorSeries )
+        self.assertEqual( len( ms ), 221 )
+        self.assertEqual( ms.sr, 441 )
+        np.testing.assert_allclose(
+            ms.glottis().to_numpy( transpose = False )[ -1 ],
+            self.shapes[ 'modal' ],
+            )
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self.shapes.interpolate( [ 'a', 'i' ], [ 0.1, 0.0 ] )
+        with self.assertRaises(ValueError):
+            self.shapes.interpolate( [ 'a', 'i' ], [ 0.0 ] )
+        with self.assertRaises(ValueError):
+            self.shapes.blend( np.ones( 3 ) )
+        with self.assertRaises(ValueError):
+            self.shapes.get_shape( 'a', 'invalid_params' )
+        with self.assertRaises(KeyError):
+            self.shapes[ 'this_shape_does_not_exist' ]
+
+if __name__ == '__main__':
+    unittest.main()
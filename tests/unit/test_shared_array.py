@@ -0,0 +1,101 @@
+import unittest
+import os
+import errno
+import shutil
+import tempfile
+import numpy as np
+from unittest import mock
+from vocaltractlab import parallel
+from vocaltractlab.parallel import SharedArray, iprocess
+from vocaltractlab.parallel import share_arrays, load_shared_arrays
+
+def _make_arrays( n ):
+    return dict(
+        large = np.arange( n * 10000, dtype = float ).reshape( 10000, n ),
+        small = np.arange( n ),
+        )
+
+class TestSharedArray(unittest.TestCase):
+
+    def test_round_trip(self):
+        x = np.random.default_rng( 0 ).normal( size = ( 100, 300 ) )
+        handle = SharedArray.from_array( x )
+        self.assertTrue( os.path.exists( handle.path ) )
+        y = handle.load()
+        self.assertFalse( os.path.exists( handle.path ) )
+        np.testing.assert_array_equal( x, y )
+        # Copy-on-write, the loaded array can be modified
+        y *= 2
+        np.testing.assert_array_equal( 2 * x, y )
+
+    def test_nested_containers(self):
+        x = share_arrays( [ _make_arrays( 3 ), ( np.ones( 2 ), 'text' ) ] )
+        self.assertIsInstance( x[ 0 ][ 'large' ], SharedArray )
+        self.assertIsInstance( x[ 0 ][ 'small' ], np.ndarray )
+        y = load_shared_arrays( x )
+        np.testing.assert_array_equal( y[ 0 ][ 'large' ], _make_arrays( 3 )[ 'large' ] )
+        self.assertEqual( y[ 1 ][ 1 ], 'text' )
+
+    def test_iprocess_shared_memory(self):
+        args = [ dict( n = n ) for n in range( 1, 9 ) ]
+        results = list( iprocess(
+            _make_arrays,
+            args = args,
+            verbose = False,
+            workers = 2,
+            shared_memory = True,
+            ) )
+        self.assertEqual( len( results ), 8 )
+        for n, x in enumerate( results, start = 1 ):
+            np.testing.assert_array_equal( x[ 'large' ], _make_arrays( n )[ 'large' ] )
+
+    def test_small_shared_memory(self):
+        # E.g. the 64 MiB /dev/shm of a container
+        usage = shutil._ntuple_diskusage( 2**26, 2**26, 0 )
+        with mock.patch( 'shutil.disk_usage', return_value = usage ):
+            self.assertEqual( parallel.shared_memory_dir(), tempfile.gettempdir() )
+        with mock.patch( 'os.path.isdir', return_value = False ):
+            self.assertEqual( parallel.shared_memory_dir(), tempfile.gettempdir() )
+        with mock.patch.object( parallel, 'SHARED_MEMORY_DIR', '/shared' ):
+            self.assertEqual( parallel.shared_memory_dir(), '/shared' )
+
+    def test_full_directory(self):
+        x = np.arange( 10.0 )
+        directory = tempfile.mkdtemp( dir = tempfile.mkdtemp() )
+        save_array = parallel._save_array
+        def full( x, d ):
+            if d == directory:
+                raise OSError( errno.ENOSPC, os.strerror( errno.ENOSPC ) )
+            return save_array( x, d )
+        try:
+            with mock.patch.object( parallel, '_save_array', side_effect = full ):
+                handle = SharedArray.from_array( x, directory = directory )
+            self.assertEqual(
+                os.path.dirname( handle.path ),
+                parallel._fallback_directory( directory ),
+                )
+            np.testing.assert_array_equal( handle.load(), x )
+        finally:
+            shutil.rmtree( os.path.dirname( directory ) )
+            shutil.rmtree( parallel._fallback_directory( directory ) )
+
+    def test_iprocess_shared_directory(self):
+        directory = tempfile.mkdtemp()
+        try:
+            results = list( iprocess(
+                _make_arrays,
+                args = [ dict( n = n ) for n in range( 1, 5 ) ],
+                verbose = False,
+                workers = 2,
+                shared_memory = True,
+                shared_directory = directory,
+                ) )
+            for n, x in enumerate( results, start = 1 ):
+                np.testing.assert_array_equal( x[ 'large' ], _make_arrays( n )[ 'large' ] )
+            # The files and their directory are removed after the run
+            self.assertEqual( os.listdir( directory ), [] )
+        finally:
+            shutil.rmtree( directory )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import numpy as np
+from scipy.signal import find_peaks
+from vocaltractlab_cython import tract_state_to_transfer_function, get_shape
+from vocaltractlab.frequency_domain import TransferFunction
+from vocaltractlab.frequency_domain import spectra_to_formants
+from vocaltractlab.frequency_domain import refine_peak_frequencies
+
+class TestSpectraToFormants(unittest.TestCase):
+
+    def test_matches_transfer_function_formants(self):
+        # Compare the batch extraction to the per-frame implementation
+        spectra = []
+        expected = []
+        for shape in [ 'a', 'e', 'i', 'o', 'u' ]:
+            tract_state = get_shape( shape, params = 'tract' )
+            x = tract_state_to_transfer_function( tract_state )
+            x[ 'tract_state' ] = tract_state
+            tf = TransferFunction.from_dict( x )
+            spectra.append( tf.magnitude_spectrum )
+            expected.append( tf.formants )
+        formants = spectra_to_formants(
+            np.array( spectra ),
+            n_spectrum_samples = 8192,
+            )
+        self.assertEqual( formants.shape, ( 5, 4 ) )
+        np.testing.assert_allclose( formants, np.array( expected, dtype = float ) )
+
+    def test_missing_peaks_are_nan(self):
+        # One frame with two peaks above 100 Hz, one frame without peaks
+        spectra = np.zeros( ( 2, 64 ) )
+        spectra[ 0, [ 1, 20, 40 ] ] = 1.0
+        formants = spectra_to_formants(
+            spectra,
+            n_spectrum_samples = 64,
+            sr = 3200,
+            )
+        np.testing.assert_allclose( formants[ 0, :2 ], [ 1000.0, 2000.0 ] )
+        self.assertTrue( np.all( np.isnan( formants[ 0, 2: ] ) ) )
+        self.assertTrue( np.all( np.isnan( formants[ 1 ] ) ) )
+
+    def test_plateaus(self):
+        # Flat peaks at their middle bin, shelves are no peaks
+        spectrum = np.zeros( 64 )
+        spectrum[ 10 : 14 ] = 1.0
+        spectrum[ 20 : 23 ] = [ 1.0, 1.0, 2.0 ]
+        spectrum[ 30 : 33 ] = 1.0
+        formants = spectra_to_formants(
+            spectrum,
+            n_spectrum_samples = 64,
+            sr = 6400,
+            )
+        np.testing.assert_allclose( formants[ 0 ], [ 1100.0, 2200.0, 3100.0, np.nan ] )
+        np.testing.assert_allclose(
+            formants[ 0, : 3 ],
+            100.0 * find_peaks( spectrum )[ 0 ],
+            )
+
+    def test_single_spectrum(self):
+        spectrum = np.zeros( 64 )
+        spectrum[ [ 5, 15 ] ] = 1.0
+        formants = spectra_to_formants(
+            spectrum,
+            n_spectrum_samples = 64,
+            n_formants = 2,
+            sr = 6400,
+            )
+        self.assertEqual( formants.shape, ( 1, 2 ) )
+        np.testing.assert_allclose( formants[ 0 ], [ 500.0, 1500.0 ] )
+
+    def test_refine_off_grid_resonances(self):
+        # Two resonances between the bins of a coarse grid
+        sr = 44100
+        n_spectrum_samples = 1024
+        frequencies = np.arange( 200 ) * sr / n_spectrum_samples
+        spectrum = sum(
+            1.0 / np.abs( 1 - ( frequencies / f )**2 + 1j * frequencies / ( 10 * f ) )
+            for f in [ 731.0, 1234.5 ]
+            )
+        coarse = spectra_to_formants( spectrum, n_spectrum_samples, n_formants = 2 )
+        refined = spectra_to_formants(
+            spectrum,
+            n_spectrum_samples,
+            n_formants = 2,
+            refine = True,
+            )
+        np.testing.assert_allclose( refined[ 0 ], [ 731.0, 1234.5 ], atol = 5.0 )
+        self.assertLess(
+            np.max( np.abs( refined[ 0 ] - [ 731.0, 1234.5 ] ) ),
+            np.max( np.abs( coarse[ 0 ] - [ 731.0, 1234.5 ] ) ),
+            )
+
+    def test_refine_with_row_index(self):
+        # Indexing the rows of the peaks gives the same result as one
+        # (copied) row per peak
+        rng = np.random.default_rng( 0 )
+        spectra = rng.uniform( 0.1, 1.0, size = ( 3, 50 ) )
+        frequencies = np.arange( 50 ) * 10.0
+        rows = np.array( [ 0, 0, 1, 2, 2 ] )
+        peaks = np.array( [ 5, 20, 7, 3, 40 ] )
+        np.testing.assert_array_equal(
+            refine_peak_frequencies( spectra, peaks, frequencies, rows = rows ),
+            refine_peak_frequencies( spectra[ rows ], peaks, frequencies ),
+            )
+        np.testing.assert_array_equal(
+            refine_peak_frequencies( spectra[ 2 ], peaks[ 3 : ], frequencies ),
+            refine_peak_frequencies( spectra, peaks[ 3 : ], frequencies, rows = rows[ 3 : ] ),
+            )
+
+    def test_invalid_shape(self):
+        with self.assertRaises(ValueError):
+            spectra_to_formants( np.zeros( ( 2, 3, 4 ) ), n_spectrum_samples = 8 )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from unittest import mock
+from vocaltractlab import core
+from vocaltractlab.cache import StageCache
+from vocaltractlab.core import phoneme_to_motor, motor_to_audio, iphoneme_to_audio
+from vocaltractlab.shapes import ShapeLibrary
+
+class TestStageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.phoneme_file = os.path.join( self.tmp_dir, 'phonemes.txt' )
+        shutil.copyfile(
+            os.path.join(
+                os.path.dirname( __file__ ),
+                'resources',
+                'valid_phoneme_sequence.txt',
+                ),
+            self.phoneme_file,
+            )
+        self.gesture_file = os.path.join( self.tmp_dir, 'gestures.ges' )
+        self.motor_file = os.path.join( self.tmp_dir, 'motor.tsq' )
+
+    def tearDown(self):
+        shutil.rmtree( self.tmp_dir )
+
+    def run_stages(self, cache, motor_file):
+        phoneme_to_motor(
+            self.phoneme_file,
+            self.gesture_file,
+            motor_file,
+            cache = cache,
+            verbose = False,
+            )
+        with open( motor_file ) as f:
+            return f.read()
+
+    def test_unchanged_input_is_served_from_cache(self):
+        cache = StageCache( os.path.join( self.tmp_dir, 'cache' ) )
+        motor = self.run_stages( cache, self.motor_file )
+        self.assertEqual( ( cache.hits, cache.misses ), ( 0, 2 ) )
+        cached_motor = self.run_stages( cache, os.path.join( self.tmp_dir, 'cached.tsq' ) )
+        self.assertEqual( ( cache.hits, cache.misses ), ( 2, 2 ) )
+        self.assertEqual( cached_motor, motor )
+        # A changed phoneme file is a miss
+        with open( self.phoneme_file, 'a' ) as f:
+            f.write( '\n' )
+        self.run_stages( cache, self.motor_file )
+        self.assertEqual( cache.misses, 3 )
+
+    def test_evict(self):
+        cache = StageCache( os.path.join( self.tmp_dir, 'cache' ) )
+        self.run_stages( cache, self.motor_file )
+        self.assertGreater( cache.size(), 0 )
+        cache.max_size = 0
+        self.assertEqual( cache.evict(), 2 )
+        self.assertEqual( cache.size(), 0 )
+        # Evicted entries are computed again
+        self.run_stages( cache, self.motor_file )
+        self.assertEqual( cache.hits, 0 )
+
+    def test_motor_to_audio(self):
+        cache = StageCache( os.path.join( self.tmp_dir, 'cache' ) )
+        ms = ShapeLibrary.from_speaker().to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, 0.1 ] )
+        kwargs = dict( return_data = True, dtype = 'int16', normalize_audio = -1, verbose = False )
+        audio = motor_to_audio( ms, cache = cache, **kwargs )[ 0 ]
+        self.assertEqual( cache.misses, 1 )
+        with mock.patch.object( core, 'synth_block' ) as synth_block:
+            cached_audio = motor_to_audio( ms, cache = cache, **kwargs )[ 0 ]
+            synth_block.assert_not_called()
+        self.assertEqual( cache.hits, 1 )
+        self.assertEqual( cached_audio.dtype, np.int16 )
+        np.testing.assert_array_equal( cached_audio, audio )
+        # Other parameters are synthesized again
+        kwargs[ 'normalize_audio' ] = -3
+        motor_to_audio( ms, cache = cache, **kwargs )
+        self.assertEqual( cache.misses, 2 )
+
+    def test_iphoneme_to_audio_evicts(self):
+        cache = StageCache( os.path.join( self.tmp_dir, 'cache' ) )
+        files = dict(
+            x = [ self.phoneme_file ] * 2,
+            gesture_files = [ self.gesture_file ] * 2,
+            motor_files = [ self.motor_file ] * 2,
+            cache = cache,
+            verbose = False,
+            )
+        results = lambda *args, **kwargs: iter( [ ( 0, None ), ( 1, None ) ] )
+        with mock.patch.object( core, '_isynthesize_audio', side_effect = results ), \
+                mock.patch.object( cache, 'evict' ) as evict:
+            # Before the run and after the iterator is exhausted
+            self.assertEqual( len( list( iphoneme_to_audio( **files ) ) ), 2 )
+            self.assertEqual( evict.call_count, 2 )
+            # Also if the iterator is closed early
+            evict.reset_mock()
+            audio = iphoneme_to_audio( **files )
+            next( audio )
+            self.assertEqual( evict.call_count, 1 )
+            audio.close()
+            self.assertEqual( evict.call_count, 2 )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+import numpy as np
+from vocaltractlab.core import motor_to_audio
+from vocaltractlab.shapes import ShapeLibrary
+from vocaltractlab.synthesizer import Synthesizer
+
+class TestSynthesizer(unittest.TestCase):
+
+    def test_same_as_motor_to_audio(self):
+        shapes = ShapeLibrary.from_speaker()
+        for kwargs in [ dict(), dict( sr = 16000, normalize_audio = -3, dtype = 'int16' ) ]:
+            synthesizer = Synthesizer( **kwargs )
+            # The buffers grow and are reused by shorter series
+            for duration in [ 0.02, 0.05, 0.03 ]:
+                ms = shapes.to_motor_series( [ 'a', 'i' ], 'modal', [ 0.0, duration ] )
+                np.testing.assert_array_equal(
+                    synthesizer.synthesize( ms ),
+                    motor_to_audio( ms, return_data = True, verbose = False, **kwargs )[ 0 ][ 0 ],
+                    )
+
+    def test_invalid_dtype(self):
+        with self.assertRaises(ValueError):
+            Synthesizer( dtype = 'int32' )
+
+if __name__ == '__main__':
+    unittest.main()
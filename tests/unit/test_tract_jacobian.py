@@ -0,0 +1,84 @@
+import unittest
+import numpy as np
+from vocaltractlab_cython import get_shape, get_param_info
+from target_approximation.vocaltractlab import SupraGlottalSeries
+from vocaltractlab.core import motor_to_tube
+from vocaltractlab.inversion import tract_jacobian
+
+class TestTractJacobian(unittest.TestCase):
+
+    def test_matches_finite_difference(self):
+        tract_state = get_shape( 'a', params = 'tract' )
+        jacobians, values = tract_jacobian(
+            tract_state,
+            outputs = [ 'formants', 'tube_area' ],
+            return_values = True,
+            verbose = False,
+            )
+        self.assertEqual( jacobians[ 'formants' ].shape, ( 4, 19 ) )
+        self.assertEqual( jacobians[ 'tube_area' ].shape, ( 40, 19 ) )
+        self.assertEqual( values[ 'tube_area' ].shape, ( 40, ) )
+        # Central difference of the tube areas for the jaw angle (JA)
+        param_info = get_param_info( 'tract' )
+        index = 3
+        h = 0.01 * ( param_info[ index ][ 'max' ] - param_info[ index ][ 'min' ] )
+        states = np.array( [ tract_state, tract_state ] )
+        states[ 0, index ] += h
+        states[ 1, index ] -= h
+        tube_states = motor_to_tube( SupraGlottalSeries( states ), verbose = False )
+        np.testing.assert_allclose(
+            jacobians[ 'tube_area' ][ :, index ],
+            ( tube_states[ 0 ].tube_area - tube_states[ 1 ].tube_area ) / ( 2 * h ),
+            rtol = 1e-5,
+            atol = 1e-8,
+            )
+
+    def test_one_sided_at_limits(self):
+        param_info = get_param_info( 'tract' )
+        tract_state = get_shape( 'a', params = 'tract' )
+        tract_state[ 0 ] = param_info[ 0 ][ 'max' ]
+        tract_state[ 1 ] = param_info[ 1 ][ 'min' ]
+        cache = {}
+        jacobians = tract_jacobian(
+            tract_state,
+            outputs = [ 'tube_area' ],
+            cache = cache,
+            verbose = False,
+            )
+        self.assertTrue( np.all( np.isfinite( jacobians[ 'tube_area' ] ) ) )
+        # No state outside of the parameter ranges was evaluated
+        for _, key in cache:
+            state = np.frombuffer( key )
+            self.assertLessEqual( state[ 0 ], param_info[ 0 ][ 'max' ] )
+            self.assertGreaterEqual( state[ 1 ], param_info[ 1 ][ 'min' ] )
+
+    def test_cache_is_reused(self):
+        tract_states = np.array( [
+            get_shape( vowel, params = 'tract' )
+            for vowel in [ 'a', 'i' ]
+            ] )
+        cache = {}
+        jacobians = tract_jacobian( tract_states, cache = cache, verbose = False )
+        self.assertEqual( jacobians[ 'formants' ].shape, ( 2, 4, 19 ) )
+        n_cached = len( cache )
+        self.assertLessEqual( n_cached, 2 * ( 1 + 2 * 19 ) )
+        # The second call is served from the cache
+        for key in cache:
+            cache[ key ] = cache[ key ] + 1.0
+        repeated = tract_jacobian( tract_states, cache = cache, verbose = False )
+        self.assertEqual( len( cache ), n_cached )
+        np.testing.assert_allclose(
+            repeated[ 'formants' ],
+            jacobians[ 'formants' ],
+            )
+
+    def test_invalid_output(self):
+        with self.assertRaises(ValueError):
+            tract_jacobian(
+                get_shape( 'a', params = 'tract' ),
+                outputs = [ 'invalid' ],
+                verbose = False,
+                )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+from vocaltractlab_cython import get_shape, tract_state_to_transfer_function
+from vocaltractlab_cython import tract_state_to_tube_state
+from target_approximation.vocaltractlab import SupraGlottalSeries
+from vocaltractlab.core import motor_to_transfer_function
+from vocaltractlab.frequency_domain import spectra_to_formants
+from vocaltractlab.tube_acoustics import tube_to_transfer_function
+from vocaltractlab.tube_acoustics import SPEED_OF_SOUND
+
+class TestTubeToTransferFunction(unittest.TestCase):
+
+    def test_uniform_tube_resonances(self):
+        # A lossless tube that is closed at the glottis and open at the lips
+        # resonates at odd multiples of c / 4L
+        n_sections = 40
+        tube_length = np.full( n_sections, 17.5 / n_sections )
+        tube_area = np.full( n_sections, 3.0 )
+        frequencies = np.arange( 0, 5000, 1.0 )
+        h = tube_to_transfer_function(
+            tube_length,
+            tube_area,
+            frequencies,
+            losses = False,
+            radiation = False,
+            )
+        self.assertEqual( h.shape, ( 1, len( frequencies ) ) )
+        formants = spectra_to_formants(
+            np.abs( h ),
+            n_spectrum_samples = 1,
+            n_formants = 3,
+            sr = 1,
+            )
+        expected = np.array( [ 1, 3, 5 ] ) * SPEED_OF_SOUND / ( 4 * 17.5 )
+        np.testing.assert_allclose( formants[ 0 ], expected, atol = 1.0 )
+
+    def test_unit_gain_at_dc(self):
+        tube_state = tract_state_to_tube_state( get_shape( 'a', params = 'tract' ) )
+        h = tube_to_transfer_function(
+            tube_state[ 'tube_length' ],
+            tube_state[ 'tube_area' ],
+            [ 0.0 ],
+            )
+        self.assertAlmostEqual( np.abs( h[ 0, 0 ] ), 1.0, places = 3 )
+
+    def test_close_to_vtl_formants(self):
+        n_spectrum_samples = 8192
+        frequencies = np.arange( 1500 ) * 44100 / n_spectrum_samples
+        for vowel in [ 'a', 'i', 'u' ]:
+            tract_state = get_shape( vowel, params = 'tract' )
+            tube_state = tract_state_to_tube_state( tract_state )
+            h = tube_to_transfer_function(
+                tube_state[ 'tube_length' ],
+                tube_state[ 'tube_area' ],
+                frequencies,
+                )
+            vtl = tract_state_to_transfer_function( tract_state )
+            with self.subTest( vowel = vowel ):
+                np.testing.assert_allclose(
+                    spectra_to_formants( np.abs( h ), n_spectrum_samples )[ 0, :2 ],
+                    spectra_to_formants(
+                        vtl[ 'magnitude_spectrum' ][ : 1500 ],
+                        n_spectrum_samples,
+                        )[ 0, :2 ],
+                    rtol = 0.15,
+                    )
+
+    def test_mismatched_shapes(self):
+        with self.assertRaises(ValueError):
+            tube_to_transfer_function( np.ones( 40 ), np.ones( 39 ), [ 100.0 ] )
+
+class TestTransferFunctionEngine(unittest.TestCase):
+
+    def test_numpy_engine(self):
+        sgs = SupraGlottalSeries(
+            np.array( [ get_shape( v, params = 'tract' ) for v in [ 'a', 'i' ] ] ),
+            sr = 441,
+            )
+        tfs = motor_to_transfer_function( sgs, engine = 'numpy', verbose = False )
+        self.assertEqual( len( tfs ), 2 )
+        self.assertEqual( len( tfs[ 0 ].formants ), 4 )
+        self.assertIsNotNone( tfs[ 0 ].magnitude_spectrum )
+
+    def test_invalid_engine(self):
+        sgs = SupraGlottalSeries(
+            get_shape( 'a', params = 'tract' ).reshape( 1, -1 ),
+            sr = 441,
+            )
+        with self.assertRaises(ValueError):
+            motor_to_transfer_function( sgs, engine = 'invalid', verbose = False )
+
+if __name__ == '__main__':
+    unittest.main()
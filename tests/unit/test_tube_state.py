@@ -0,0 +1,56 @@
+import unittest
+import pickle
+import numpy as np
+from vocaltractlab_cython import tract_state_to_tube_state, get_shape
+from target_approximation.vocaltractlab import SupraGlottalSeries
+from vocaltractlab.core import motor_to_tube
+from vocaltractlab.tube_state import TubeState
+
+class TestTubeState(unittest.TestCase):
+
+    def __init__(self, methodName: str = "runTest") -> None:
+        super().__init__(methodName)
+        tract_state = get_shape( 'tt-alveolar-closure(a)', params = 'tract' )
+        self.x = tract_state_to_tube_state( tract_state )
+        self.x[ 'tract_state' ] = tract_state
+
+    def test_lazy_constriction(self):
+        tube_state = TubeState.from_dict( self.x )
+        self.assertFalse( hasattr( tube_state, '__dict__' ) )
+        self.assertIsNone( tube_state._constriction_data )
+        constriction_data = tube_state.constriction_data
+        self.assertIs( tube_state.constriction_data, constriction_data )
+        self.assertEqual(
+            constriction_data,
+            TubeState.from_dict( self.x ).get_constriction_threshold_crossings(),
+            )
+        self.assertEqual( len( tube_state.tube_articulator_tokens ), 40 )
+        self.assertIn( tube_state.constriction, [ 2, 5 ] )
+
+    def test_lazy_tokens(self):
+        tube_state = TubeState.from_dict( self.x )
+        tokens = tube_state.tube_articulator_tokens
+        self.assertIs( tube_state.tube_articulator_tokens, tokens )
+        self.assertIsNone( tube_state._constriction_data )
+        self.assertEqual( tokens, tube_state.get_tube_articulator_tokens() )
+        self.assertIn( 'T0', tokens )
+
+    def test_geometry_only(self):
+        tube_states = motor_to_tube(
+            SupraGlottalSeries( self.x[ 'tract_state' ].reshape( 1, -1 ) ),
+            save_tube_articulator = False,
+            verbose = False,
+            )
+        self.assertIsNone( tube_states[ 0 ].tube_articulator )
+        np.testing.assert_allclose( tube_states[ 0 ].tube_area, self.x[ 'tube_area' ] )
+        self.assertEqual( tube_states[ 0 ].constriction, TubeState.from_dict( self.x ).constriction )
+
+    def test_pickle(self):
+        tube_state = TubeState.from_dict( self.x )
+        tube_state.constriction_data
+        loaded = pickle.loads( pickle.dumps( tube_state ) )
+        np.testing.assert_array_equal( loaded.tube_area, tube_state.tube_area )
+        self.assertEqual( loaded.constriction_data, tube_state.constriction_data )
+
+if __name__ == '__main__':
+    unittest.main()
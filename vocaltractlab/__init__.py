@@ -4,4 +4,12 @@
 from vocaltractlab_cython import *
 from .core import *
 from .audioprocessing import *
-from .utils import *
\ No newline at end of file
+from .utils import *
+from .frequency_domain import spectra_to_formants, TransferFunctionSeries
+from .shapes import ShapeLibrary
+from .tube_state import TubeSeries
+from .cache import StageCache
+from .synthesizer import Synthesizer
+from .features import MelSpectrogram, LogSpectrogram, RMSEnergy, DurationStatistics, Pitch
+from .corpus import AudioCorpus
+from .inversion import Codebook, tract_jacobian
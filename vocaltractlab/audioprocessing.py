@@ -2,6 +2,7 @@
 
 
 import os
+import threading
 import torch
 import torchaudio
 import torchaudio.functional as F
@@ -13,6 +14,9 @@ import numpy as np
 #import matplotlib.pyplot as plt
 from vocaltractlab_cython import get_constants
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from typing import List
 from typing import Tuple
 from typing import Union
 from typing import Optional
@@ -80,6 +84,7 @@ def postprocess(
         dBFS: int = -1,
         file_path: str = None,
         to_numpy: bool = False,
+        dtype: Optional[ Union[ str, np.dtype ] ] = None,
         ) -> np.ndarray:
     
     vtl_constants = get_constants()
@@ -100,19 +105,19 @@ def postprocess(
             x = x,
             dBFS = dBFS,
             )
+
+    if dtype is not None:
+        # The file is written with the storage type as well
+        x = convert_audio_dtype(
+            x = x,
+            dtype = dtype,
+            )
         
     if file_path is not None:
-        if not os.path.exists(
-            os.path.dirname( file_path )
-            ):
-            os.makedirs(
-                os.path.dirname( file_path ),
-                exist_ok = True,
-                )
-        torchaudio.save(
-            file_path,
-            x,
-            sr_out,
+        save_audio(
+            file_path = file_path,
+            x = x,
+            sr = sr_out,
             )
         
     if to_numpy:
@@ -120,6 +125,242 @@ def postprocess(
     
     return x
 
+def convert_audio_dtype(
+        x: torch.Tensor,
+        dtype: Union[ str, np.dtype ],
+        ) -> torch.Tensor:
+    """
+    Convert audio in the range [-1, 1] into a storage type.
+    Args:
+        x (torch.Tensor): Audio of arbitrary shape.
+        dtype (Union[str, np.dtype]): 'float64', 'float32' or 'int16'. Audio
+            is scaled to the full int16 range and clipped, so int16 audio
+            should be normalized, e.g. with dBFS = -1.
+    Returns:
+        torch.Tensor: Audio with the specified dtype.
+    """
+    dtype = np.dtype( dtype )
+    if dtype == np.float64:
+        return x.to( torch.float64 )
+    elif dtype == np.float32:
+        return x.to( torch.float32 )
+    elif dtype == np.int16:
+        return torch.round(
+            torch.clamp( x, -1.0, 1.0 ) * ( MAX_WAV_VALUE - 1 )
+            ).to( torch.int16 )
+    raise ValueError(
+        f"""
+        The specified audio dtype: '{dtype}'
+        is not supported. Dtype must be one of the following:
+        - float64
+        - float32
+        - int16
+        """
+        )
+
+def save_audio(
+        file_path: str,
+        x: Union[torch.Tensor, ArrayLike],
+        sr: int,
+        ) -> None:
+    """
+    Save audio to a file, creating the parent directory if needed.
+    Args:
+        file_path (str): Path of the audio file.
+        x (Union[torch.Tensor, ArrayLike]): Audio of shape (channels, samples).
+        sr (int): Sampling rate of the audio.
+    """
+    if not isinstance( x, torch.Tensor ):
+        x = torch.as_tensor( np.asarray( x ) )
+    if x.dim() == 1:
+        x = x.unsqueeze( 0 )
+    directory = os.path.dirname( file_path )
+    if directory and not os.path.exists( directory ):
+        os.makedirs(
+            directory,
+            exist_ok = True,
+            )
+    torchaudio.save(
+        file_path,
+        x,
+        sr,
+        )
+    return
+
+class AudioWriter():
+    """
+    Write audio files asynchronously in a pool of background threads.
+
+    Audio is passed to the writer with submit() and written while the
+    caller continues. The number of pending writes is bounded, submit()
+    blocks if the queue is full, so that memory usage stays constant if
+    the disk is slower than the synthesis. Errors of a write are raised
+    by the next call to submit() or by close(). Used as a context
+    manager, all pending writes are flushed on exit.
+
+    Args:
+        workers (int): Number of writer threads. Default is 2.
+        max_queue_size (int): Maximum number of pending writes. Default is 16.
+        save_function (Callable): Called as save_function( file_path, x, sr )
+            for each submitted audio. Default is save_audio.
+
+    Examples:
+        >>> with AudioWriter() as writer:
+        ...     for file_path, x in zip( audio_files, waveforms ):
+        ...         writer.submit( file_path, x, sr = 44100 )
+    """
+    def __init__(
+            self,
+            workers: int = 2,
+            max_queue_size: int = 16,
+            save_function: Callable = save_audio,
+            ):
+        if workers < 1 or max_queue_size < 1:
+            raise ValueError(
+                "Args workers and max_queue_size must be positive."
+                )
+        self.save_function = save_function
+        self._executor = ThreadPoolExecutor(
+            max_workers = workers,
+            thread_name_prefix = 'AudioWriter',
+            )
+        self._slots = threading.BoundedSemaphore( max_queue_size )
+        self._lock = threading.Lock()
+        self._errors: List[ BaseException ] = []
+        self._closed = False
+        return
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, exc_type, exc_value, traceback ):
+        # Do not mask an exception that was raised inside the with block
+        self.close( raise_errors = exc_type is None )
+        return False
+
+    def submit(
+            self,
+            file_path: str,
+            x: Union[torch.Tensor, ArrayLike],
+            sr: int,
+            ) -> None:
+        """
+        Queue audio for writing, blocks while the queue is full.
+        """
+        if self._closed:
+            raise RuntimeError(
+                "Cannot submit audio to a closed AudioWriter."
+                )
+        self._raise_errors()
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(
+                self.save_function,
+                file_path,
+                x,
+                sr,
+                )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback( self._on_done )
+        return
+
+    def close(
+            self,
+            raise_errors: bool = True,
+            ) -> None:
+        """
+        Wait until all pending audio is written and stop the threads.
+        """
+        if not self._closed:
+            self._closed = True
+            self._executor.shutdown( wait = True )
+        if raise_errors:
+            self._raise_errors()
+        return
+
+    def _on_done( self, future ):
+        self._slots.release()
+        error = future.exception()
+        if error is not None:
+            with self._lock:
+                self._errors.append( error )
+        return
+
+    def _raise_errors( self ):
+        with self._lock:
+            if not self._errors:
+                return
+            error = self._errors[ 0 ]
+            self._errors = []
+        raise error
+
+class CorpusStatistics():
+    """
+    Peak and RMS statistics of an audio corpus, accumulated file by file.
+
+    The statistics of each file are measured where the audio is produced,
+    e.g. in the synthesis workers, and merged with update(). The gain()
+    is then applied to all files, so that the levels of the files are
+    consistent across the corpus and the loudest file peaks at the
+    target level.
+
+    Examples
+    --------
+    >>> statistics = CorpusStatistics()
+    >>> for x in corpus:
+    ...     statistics.update( CorpusStatistics.measure( x ) )
+    >>> corpus = [ x * statistics.gain( dBFS = -1 ) for x in corpus ]
+    """
+    def __init__( self ):
+        self.peak = 0.0
+        self.sum_squares = 0.0
+        self.n_samples = 0
+        self.n_files = 0
+        return
+
+    @staticmethod
+    def measure(
+            x: ArrayLike,
+            ) -> Dict[ str, float ]:
+        """
+        Measure the statistics of a single file.
+        """
+        x = np.asarray( x, dtype = float )
+        return dict(
+            peak = float( np.max( np.abs( x ) ) ) if x.size > 0 else 0.0,
+            sum_squares = float( np.sum( x**2 ) ),
+            n_samples = int( x.size ),
+            )
+
+    def update(
+            self,
+            statistics: Dict[ str, float ],
+            ) -> None:
+        self.peak = max( self.peak, statistics[ 'peak' ] )
+        self.sum_squares += statistics[ 'sum_squares' ]
+        self.n_samples += statistics[ 'n_samples' ]
+        self.n_files += 1
+        return
+
+    @property
+    def rms( self ) -> float:
+        if self.n_samples == 0:
+            return 0.0
+        return float( np.sqrt( self.sum_squares / self.n_samples ) )
+
+    def gain(
+            self,
+            dBFS: float = -1,
+            ) -> float:
+        """
+        Gain that scales the peak of the corpus to dBFS.
+        """
+        if self.peak == 0:
+            return 1.0
+        return 10**( dBFS * 0.05 ) / self.peak
+
 def resample_like_librosa(
         x: Union[torch.Tensor, ArrayLike],
         sr_in: int,
@@ -190,6 +431,60 @@ def amplitude_to_db(
         **kwargs,
         )
 
+def spectral_distance(
+        x: ArrayLike,
+        y: ArrayLike,
+        sr: int,
+        n_fft: int = 2048,
+        hop_length: int = 441,
+        n_bands: int = 32,
+        f_min: float = 50.0,
+        f_max: float = 10000.0,
+        ) -> float:
+    """
+    Mean absolute difference of log band energies in dB.
+
+    The energies are computed in log-spaced frequency bands of short-time
+    spectra. Unlike a sample-wise error, the distance does not depend on
+    the phase of the signals, e.g. on the phase of the glottal oscillation.
+    Args:
+        x (ArrayLike): First signal.
+        y (ArrayLike): Second signal, truncated to the length of x or vice versa.
+        sr (int): Sampling rate of the signals.
+        n_fft (int): Frame length of the short-time spectra. Default is 2048.
+        hop_length (int): Hop length of the short-time spectra. Default is 441.
+        n_bands (int): Number of frequency bands. Default is 32.
+        f_min (float): Lower edge of the lowest band in Hz. Default is 50.
+        f_max (float): Upper edge of the highest band in Hz. Default is 10000.
+    Returns:
+        float: The mean absolute band energy difference in dB.
+    """
+    x = np.asarray( x, dtype = float ).ravel()
+    y = np.asarray( y, dtype = float ).ravel()
+    n_samples = min( len( x ), len( y ) )
+    if n_samples < n_fft:
+        raise ValueError(
+            "The signals must be at least n_fft samples long."
+            )
+    frames = (
+        np.arange( 0, n_samples - n_fft + 1, hop_length )[ :, np.newaxis ]
+        + np.arange( n_fft )
+        )
+    window = np.hanning( n_fft )
+    edges = np.geomspace( f_min, f_max, n_bands + 1 )
+    bands = np.digitize( np.fft.rfftfreq( n_fft, 1.0 / sr ), edges ) - 1
+    band_matrix = (
+        bands[ :, np.newaxis ] == np.arange( n_bands )
+        ).astype( float )
+    energies = [
+        np.abs( np.fft.rfft( z[ frames ] * window ) )**2 @ band_matrix
+        for z in ( x, y )
+        ]
+    return float( np.mean( np.abs(
+        power_to_db( energies[ 0 ], eps = 1e-10 )
+        - power_to_db( energies[ 1 ], eps = 1e-10 )
+        ) ) )
+
 def audio_to_f0(
         x: Union[str, torch.Tensor, ArrayLike],
         sr_in: int = None,
@@ -0,0 +1,221 @@
+
+
+
+import os
+import hashlib
+import numpy as np
+import shutil
+import uuid
+
+import vocaltractlab_cython as cyvtl
+
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+
+class StageCache():
+    """
+    Content-addressed cache of the output files of conversion stages.
+
+    The output of a stage, e.g. the gesture file that is created from a
+    phoneme file, is stored under a hash of the stage name, the content
+    of the input file, the content of the speaker file and the API
+    version. If a stage is run again for unchanged inputs, the output
+    file is copied from the cache instead of being computed again.
+    Synthesized audio is stored as arrays, see load_array and
+    save_array, such that motor_to_audio and gesture_to_audio can skip
+    the synthesis of unchanged inputs.
+
+    The cache is a directory, so it can be shared by worker processes
+    and reused across runs. Entries are written atomically. The size of
+    the cache is bounded by evicting the least recently used entries,
+    see evict.
+
+    The attributes hits and misses count the lookups of the current
+    process only. Worker processes look up entries on their own copy of
+    the cache, so the counters of the caller are not statistics of a
+    run that used a worker pool, i.e. of four or more items.
+
+    Parameters
+    ----------
+    directory : str
+        Directory of the cache. It is created if it does not exist.
+
+    max_size : int, optional
+        Maximum size of the cache in bytes. Default is 1 GiB.
+
+    Examples
+    --------
+    >>> cache = StageCache( 'cache' )
+    >>> phoneme_to_motor( phoneme_files, gesture_files, motor_files, cache = cache )
+    """
+    def __init__(
+            self,
+            directory: str,
+            max_size: int = 2**30,
+            ):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs( directory, exist_ok = True )
+        return
+
+    def key(
+            self,
+            stage: str,
+            x: Union[ str, np.ndarray ],
+            **params: Any,
+            ) -> str:
+        """
+        Hash of the stage, the input, the active speaker and the API.
+
+        The input x is either a file path, which is hashed by content,
+        or an array. Further parameters that change the output, like
+        the sampling rate, are hashed by their repr.
+        """
+        h = hashlib.sha256()
+        h.update( stage.encode() )
+        h.update( cyvtl.get_version().encode() )
+        h.update( _speaker_hash( cyvtl.active_speaker() ).encode() )
+        if isinstance( x, str ):
+            h.update( _file_hash( x ).encode() )
+        else:
+            x = np.ascontiguousarray( x )
+            h.update( f'{x.dtype.str}{x.shape}'.encode() )
+            h.update( x.tobytes() )
+        for name in sorted( params ):
+            h.update( f'{name}={params[ name ]!r}'.encode() )
+        return h.hexdigest()
+
+    def _path( self, key: str ) -> str:
+        return os.path.join( self.directory, key[ : 2 ], key )
+
+    def get(
+            self,
+            key: str,
+            output_file: str,
+            ) -> bool:
+        """
+        Copy the cached output to output_file. Returns False on a miss.
+        """
+        path = self._path( key )
+        try:
+            shutil.copyfile( path, output_file )
+            # The modification time is the last use, see evict
+            os.utime( path )
+        except FileNotFoundError:
+            # Also if the entry was evicted by another process meanwhile
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def put(
+            self,
+            key: str,
+            output_file: str,
+            ) -> None:
+        """
+        Store an output file in the cache.
+        """
+        path = self._path( key )
+        os.makedirs( os.path.dirname( path ), exist_ok = True )
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        shutil.copyfile( output_file, tmp_path )
+        os.replace( tmp_path, path )
+        return
+
+    def load_array(
+            self,
+            key: str,
+            ) -> Optional[ np.ndarray ]:
+        """
+        Return the cached array or None on a miss.
+        """
+        path = self._path( key )
+        try:
+            with open( path, 'rb' ) as f:
+                x = np.lib.format.read_array( f )
+            os.utime( path )
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return x
+
+    def save_array(
+            self,
+            key: str,
+            x: np.ndarray,
+            ) -> None:
+        """
+        Store an array in the cache, uncompressed with its dtype.
+        """
+        path = self._path( key )
+        os.makedirs( os.path.dirname( path ), exist_ok = True )
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open( tmp_path, 'wb' ) as f:
+            np.lib.format.write_array( f, np.asarray( x ), allow_pickle = False )
+        os.replace( tmp_path, path )
+        return
+
+    def size( self ) -> int:
+        return sum( size for _, size, _ in self._entries() )
+
+    def _entries( self ):
+        entries = []
+        for root, _, files in os.walk( self.directory ):
+            for name in files:
+                if name.endswith( '.tmp' ):
+                    continue
+                try:
+                    stat = os.stat( os.path.join( root, name ) )
+                except FileNotFoundError:
+                    continue
+                entries.append( ( os.path.join( root, name ), stat.st_size, stat.st_mtime ) )
+        return entries
+
+    def evict( self ) -> int:
+        """
+        Remove the least recently used entries until the cache is not
+        larger than max_size. Returns the number of removed entries.
+        """
+        entries = sorted( self._entries(), key = lambda x: x[ 2 ] )
+        size = sum( x[ 1 ] for x in entries )
+        n_removed = 0
+        for path, entry_size, _ in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove( path )
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            n_removed += 1
+        return n_removed
+
+# The speaker file is only hashed again if it was modified
+_speaker_hashes: Dict[ Tuple[ str, int, int ], str ] = {}
+
+def _speaker_hash( speaker_file: str ) -> str:
+    stat = os.stat( speaker_file )
+    file_id = ( os.path.abspath( speaker_file ), stat.st_mtime_ns, stat.st_size )
+    if file_id not in _speaker_hashes:
+        _speaker_hashes[ file_id ] = _file_hash( speaker_file )
+    return _speaker_hashes[ file_id ]
+
+def _file_hash( file_path: str ) -> str:
+    h = hashlib.sha256()
+    with open( file_path, 'rb' ) as f:
+        for block in iter( lambda: f.read( 2**20 ), b'' ):
+            h.update( block )
+    return h.hexdigest()
+
+def as_stage_cache(
+        cache: Optional[ Union[ StageCache, str ] ],
+        ) -> Optional[ StageCache ]:
+    # Accept a cache directory in place of a StageCache
+    if cache is None or isinstance( cache, StageCache ):
+        return cache
+    return StageCache( cache )
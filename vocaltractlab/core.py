@@ -2,18 +2,26 @@
 
 
 import os
+import itertools
+import multiprocessing
+import tempfile
 import numpy as np
+import torch
+from copy import deepcopy
 
 import vocaltractlab_cython as cyvtl
 from vocaltractlab_cython.VocalTractLabApi import _close
 from vocaltractlab_cython.VocalTractLabApi import _initialize
 #from vocaltractlab_cython import active_speaker
+from vocaltractlab_cython import calculate_tongueroot_automatically
 from vocaltractlab_cython import get_constants
 from vocaltractlab_cython import gesture_file_to_audio
 from vocaltractlab_cython import gesture_file_to_motor_file
+from vocaltractlab_cython import get_gesture_duration
 from vocaltractlab_cython import phoneme_file_to_gesture_file
 from vocaltractlab_cython import synth_block
 from vocaltractlab_cython import tract_state_to_limited_tract_state
+from vocaltractlab_cython import tract_state_to_svg
 from vocaltractlab_cython import tract_state_to_transfer_function
 from vocaltractlab_cython import tract_state_to_tube_state
 #from vocaltractlab_cython.exceptions import VTLAPIError
@@ -23,18 +31,40 @@ from target_approximation.vocaltractlab import MotorSeries
 from target_approximation.vocaltractlab import SupraGlottalSequence
 from target_approximation.vocaltractlab import SupraGlottalSeries
 
-from typing import Union, List, Tuple, Dict, Any, Optional, Callable, Iterable, Sequence
+from typing import Union, List, Tuple, Dict, Any, Optional, Callable, Iterable, Iterator, Sequence
 from numpy.typing import ArrayLike
 
 from tools_mp import process
 
 from .utils import make_iterable
+from .audioprocessing import AudioWriter
+from .cache import StageCache
+from .cache import as_stage_cache
+from .audioprocessing import CorpusStatistics
+from .audioprocessing import convert_audio_dtype
 from .audioprocessing import audio_to_f0
 from .audioprocessing import postprocess
+from .audioprocessing import save_audio
 from .frequency_domain import TransferFunction
+from .frequency_domain import spectra_to_formants
+from .audioprocessing import spectral_distance
+from .corpus import AudioCorpus
+from .features import extract_features
+from .features import feature_file_path
+from .features import save_features
+from .parallel import iprocess
+from .segmentation import plan_segments
+from .segmentation import stitch_segments
+from .tube_acoustics import tube_to_transfer_function
 from .tube_state import TubeState
 
 
+# Spectrum size of motor_to_transfer_function( formants_only = True )
+FORMANTS_ONLY_SPECTRUM_SAMPLES = 2048
+
+# Tract parameters that the automatic tongue root calculation depends on
+TONGUEROOT_DEPENDENCIES = [ 'HX', 'HY', 'TCX', 'TCY', 'TTX', 'TTY' ]
+
 def active_speaker() -> str:
     return cyvtl.active_speaker()
 
@@ -87,7 +117,7 @@ def limit(
         workers = workers,
         verbose = verbose,
         mp_threshold = 4,
-        initializer = load_speaker,
+        initializer = _initialize_worker,
         initargs = ( cyvtl.active_speaker(), ),
         )
     
@@ -98,9 +128,176 @@ def limit(
     
     return lim
 
+def calculate_tongueroot(
+        x: Union[
+            MotorSequence,
+            MotorSeries,
+            SupraGlottalSequence,
+            SupraGlottalSeries,
+            str,
+            ],
+        chunk_size: int = 256,
+        skip_unchanged: bool = True,
+        workers: int = None,
+        verbose: bool = True,
+        ) -> Union[ MotorSeries, SupraGlottalSeries ]:
+    """
+    Calculate the tongue root parameters of a whole series automatically.
+
+    The tongue root parameters (TRX, TRY) of every frame are replaced by
+    the values that the VocalTractLab API calculates from the hyoid and
+    tongue parameters. The frames are split into chunks that are
+    processed by worker processes with the speaker loaded.
+
+    Parameters
+    ----------
+    x : Union[MotorSequence, MotorSeries, SupraGlottalSequence, SupraGlottalSeries, str]
+        Input data containing the supra-glottal (tract) states.
+
+    chunk_size : int, optional
+        Number of frames that are sent to a worker at once.
+        Default is 256.
+
+    skip_unchanged : bool, optional
+        If True, frames whose parameters in TONGUEROOT_DEPENDENCIES are
+        identical to the previous frame reuse the tongue root of that
+        frame instead of being calculated again. Default is True.
+
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
+
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Returns
+    -------
+    Union[MotorSeries, SupraGlottalSeries]
+        A new MotorSeries if the input contained glottis parameters,
+        otherwise a new SupraGlottalSeries.
+
+    Notes
+    -----
+    The calculation always runs in worker processes, because it has to
+    enable the automatic tongue root calculation of the API, which would
+    otherwise change the state of the calling process.
+    """
+    if isinstance( x, MotorSequence ):
+        x = x.to_series()
+    sgs = _to_supra_glottal_series( x )
+    tract_states = sgs.to_numpy( transpose = False )
+    tiers = sgs.tiers()
+    tongueroot_index = [ tiers.index( 'TRX' ), tiers.index( 'TRY' ) ]
+
+    if skip_unchanged and len( tract_states ) > 0:
+        dependencies = tract_states[
+            :,
+            [ tiers.index( tier ) for tier in TONGUEROOT_DEPENDENCIES ],
+            ]
+        changed = np.ones( len( tract_states ), dtype = bool )
+        changed[ 1: ] = np.any( dependencies[ 1: ] != dependencies[ :-1 ], axis = 1 )
+    else:
+        changed = np.ones( len( tract_states ), dtype = bool )
+    calculated = np.flatnonzero( changed )
+
+    args = [
+        dict(
+            tract_states = tract_states[ calculated[ i : i + chunk_size ] ],
+            tongueroot_index = tongueroot_index,
+            )
+        for i in range( 0, len( calculated ), chunk_size )
+        ]
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    tongueroot_data = process(
+        _calculate_tongueroot,
+        args = args,
+        return_data = True,
+        workers = max( 1, min( workers, len( args ) ) ),
+        verbose = verbose,
+        mp_threshold = 1,
+        initializer = _load_speaker_with_automatic_tongueroot,
+        initargs = ( cyvtl.active_speaker(), ),
+        )
+
+    # Frames that were skipped take the values of the last calculated frame
+    tongueroot = np.empty( ( len( tract_states ), 2 ) )
+    if len( args ) > 0:
+        tongueroot[ calculated ] = np.concatenate( tongueroot_data )
+        tongueroot = tongueroot[ np.maximum.accumulate(
+            np.where( changed, np.arange( len( tract_states ) ), 0 )
+            ) ]
+
+    if isinstance( x, MotorSeries ):
+        y = deepcopy( x )
+    else:
+        y = SupraGlottalSeries( tract_states.copy(), sr = sgs.sr )
+    y[ 'TRX' ] = tongueroot[ :, 0 ]
+    y[ 'TRY' ] = tongueroot[ :, 1 ]
+    return y
+
+def _calculate_tongueroot(
+        tract_states,
+        tongueroot_index,
+        ):
+    return np.array( [
+        tract_state_to_limited_tract_state( ts )[ tongueroot_index ]
+        for ts in tract_states
+        ] )
+
+def _load_speaker_with_automatic_tongueroot(
+        speaker: str,
+        ) -> None:
+    load_speaker( speaker )
+    calculate_tongueroot_automatically( True )
+    return
+
+def _to_supra_glottal_series(
+        x: Union[
+            MotorSequence,
+            MotorSeries,
+            SupraGlottalSequence,
+            SupraGlottalSeries,
+            str,
+            ],
+        ) -> SupraGlottalSeries:
+    if isinstance( x, MotorSequence ):
+        ms = x.to_series()
+        sgs = ms.tract()
+    elif isinstance( x, MotorSeries ):
+        sgs = x.tract()
+    elif isinstance( x, SupraGlottalSequence ):
+        sgs = x.to_series()
+    elif isinstance( x, str ):
+        sgs = SupraGlottalSeries.load( x )
+    elif isinstance( x, SupraGlottalSeries ):
+        sgs = x
+    else:
+        raise TypeError(
+            f"""
+            The specified data type: '{type(x)}'
+            is not supported. Type must be one of the following:
+            - MotorSequence
+            - MotorSeries
+            - SupraGlottalSequence
+            - SupraGlottalSeries
+            - str
+            """
+            )
+    return sgs
+
 def load_speaker(
         speaker: str,
         ) -> None:
+    speaker_path = _speaker_path( speaker )
+    _close()
+    _initialize( speaker_path )
+    return
+
+def _speaker_path(
+        speaker: str,
+        ) -> str:
     if not speaker.endswith( '.speaker' ):
         speaker = f"{speaker}.speaker"
 
@@ -120,8 +317,17 @@ def load_speaker(
                 does not exist.
                 """
                 )
-    _close()
-    _initialize( speaker_path )
+    return speaker_path
+
+def _initialize_worker(
+        speaker: str,
+        ) -> None:
+    # Workers that are forked from a process that has the speaker loaded
+    # already, e.g. the fork server, see parallel.set_start_method, keep
+    # the inherited speaker data instead of loading the file again
+    if os.path.abspath( cyvtl.active_speaker() ) == os.path.abspath( _speaker_path( speaker ) ):
+        return
+    load_speaker( speaker )
     return
 
 def speakers() -> List[ str ]:
@@ -142,51 +348,110 @@ def gesture_to_audio(
         normalize_audio: int = -1,
         sr: int = None,
         return_data: bool = False,
+        async_write: bool = True,
+        dtype: Optional[ str ] = None,
+        normalization: str = 'file',
+        cache: Optional[ Union[ StageCache, str ] ] = None,
+        features: Optional[ List[ Callable ] ] = None,
+        feature_files: Optional[ Union[ Iterable[ str ], str ] ] = None,
         workers: int = None,
         verbose: bool = True,
         ) -> None:
-
-    gesture_files = make_iterable( x )
-    audio_files = make_iterable( audio_files )
-    if len( gesture_files ) != len( audio_files ):
-        raise ValueError(
-            f"""
-            The number of gesture file paths: {len(gesture_files)}
-            does not match the number of audio file paths: {len(audio_files)}.
-            """
-            )
-    
-    args = [
+    """
+    Convert gesture files into audio signals. See motor_to_audio for
+    the arguments. The audio of cached gesture files is keyed on the
+    content of the gesture file.
+    """
+    _check_features( features, feature_files, audio_files, normalization )
+    if features is None:
+        feature_files = None
+    cache = as_stage_cache( cache )
+    args = (
         dict(
             gesture_data = gf,
             audio_file_path = af,
             verbose_api = False,
             normalize_audio = normalize_audio,
             sr = sr,
+            dtype = dtype,
+            cache = cache,
+            features = features,
+            feature_file = _feature_file( features, ff, af ),
             )
-        for gf, af in zip(
-            gesture_files,
-            audio_files,
+        for gf, af, ff in _zip_inputs(
+            ( 'gesture file paths', x ),
+            ( 'audio file paths', audio_files ),
+            ( 'feature file paths', feature_files ),
             )
-        ]
-    audio_data = process(
+        )
+    audio_data = _synthesize_audio(
         _gesture_to_audio,
         args = args,
+        sr = sr,
+        write_files = audio_files is not None,
         return_data = return_data,
+        async_write = async_write,
         workers = workers,
         verbose = verbose,
-        mp_threshold = 4,
-        initializer = load_speaker,
-        initargs = ( cyvtl.active_speaker(), ),
+        cost = _schedule_cost( x, _gesture_cost ),
+        normalization = normalization,
         )
+    if cache is not None:
+        cache.evict()
     return audio_data
 
+def igesture_to_audio(
+        x: Union[ Iterable[ str ], str ],
+        audio_files: Optional[ Union[ Iterable[ str ], str ] ] = None,
+        normalize_audio: int = -1,
+        sr: int = None,
+        ordered: bool = False,
+        async_write: bool = True,
+        dtype: Optional[ str ] = None,
+        workers: int = None,
+        verbose: bool = True,
+        ) -> Iterator[ Tuple[ int, np.ndarray ] ]:
+    """
+    Iterator version of gesture_to_audio, yields ( index, audio ) pairs
+    as the items complete. See imotor_to_audio for the arguments.
+    """
+    args = (
+        dict(
+            gesture_data = gf,
+            audio_file_path = af,
+            verbose_api = False,
+            normalize_audio = normalize_audio,
+            sr = sr,
+            dtype = dtype,
+            )
+        for gf, af in _zip_inputs(
+            ( 'gesture file paths', x ),
+            ( 'audio file paths', audio_files ),
+            )
+        )
+    return _isynthesize_audio(
+        _gesture_to_audio,
+        args = args,
+        sr = sr,
+        write_files = audio_files is not None,
+        return_data = True,
+        async_write = async_write,
+        ordered = ordered,
+        workers = workers,
+        verbose = verbose,
+        cost = _schedule_cost( x, _gesture_cost ),
+        )
+
 def _gesture_to_audio(
         gesture_data,
         audio_file_path,
         verbose_api,
         normalize_audio,
         sr,
+        dtype = None,
+        cache = None,
+        features = None,
+        feature_file = None,
         ) -> np.ndarray:
     if isinstance( gesture_data, str ):
         #gesture_file = gesture_data.to_gesture_file( file_path = None )
@@ -199,28 +464,141 @@ def _gesture_to_audio(
             - str
             """
             )
-    audio = gesture_file_to_audio(
-        ges_file_path = gesture_file,
-        audio_file_path = None,
-        verbose_api = verbose_api,
-    )
-    
-    audio = postprocess(
-        x = audio,
-        sr_out = sr,
-        dBFS = normalize_audio,
-        file_path = audio_file_path,
-        to_numpy = True,
+    audio = None
+    if cache is not None:
+        key = _audio_cache_key(
+            cache,
+            'gesture_to_audio',
+            gesture_file,
+            normalize_audio = normalize_audio,
+            sr = sr,
+            dtype = dtype,
+            )
+        audio = _load_cached_audio( cache, key, audio_file_path, sr )
+    if audio is None:
+        audio = gesture_file_to_audio(
+            ges_file_path = gesture_file,
+            audio_file_path = None,
+            verbose_api = verbose_api,
         )
+        
+        audio = postprocess(
+            x = audio,
+            sr_out = sr,
+            dBFS = normalize_audio,
+            file_path = audio_file_path,
+            to_numpy = True,
+            dtype = dtype,
+            )
+        if cache is not None:
+            cache.save_array( key, audio )
+    if features is not None:
+        _save_audio_features( audio, sr, features, feature_file )
     
     return audio
 
+def _save_audio_features(
+        audio,
+        sr,
+        features,
+        feature_file,
+        ):
+    # Features are computed from the audio in memory, before it leaves
+    # the worker, so the audio files never have to be read again
+    if sr is None:
+        sr = get_constants()[ 'sr_audio' ]
+    save_features(
+        file_path = feature_file,
+        features = extract_features( audio, sr, features ),
+        sr = sr,
+        )
+    return
+
+def _check_features(
+        features,
+        feature_files,
+        audio_files,
+        normalization = 'file',
+        ):
+    if features is None:
+        return
+    if normalization == 'corpus':
+        raise ValueError(
+            f"""
+            Feature extraction is not supported with normalization:
+            'corpus', because the corpus gain is applied after the
+            synthesis of all files.
+            """
+            )
+    if feature_files is None and audio_files is None:
+        raise ValueError(
+            f"""
+            Features can only be extracted if feature file paths or
+            audio file paths are specified.
+            """
+            )
+    return
+
+def _feature_file(
+        features,
+        feature_file,
+        audio_file,
+        ):
+    # Feature files default to the audio file paths with the
+    # extension '.features.npz'
+    if features is None or feature_file is not None:
+        return feature_file
+    return feature_file_path( audio_file )
+
+def _audio_cache_key(
+        cache,
+        stage,
+        x,
+        normalize_audio,
+        sr,
+        dtype,
+        **params,
+        ):
+    # Equivalent arguments, like sr = None and the native rate, share a key
+    return cache.key(
+        stage,
+        x,
+        normalize_audio = normalize_audio,
+        sr = get_constants()[ 'sr_audio' ] if sr is None else sr,
+        dtype = None if dtype is None else np.dtype( dtype ).name,
+        **params,
+        )
+
+def _load_cached_audio(
+        cache,
+        key,
+        audio_file_path,
+        sr,
+        ):
+    audio = cache.load_array( key )
+    if audio is not None and audio_file_path is not None:
+        save_audio(
+            file_path = audio_file_path,
+            x = torch.from_numpy( audio ),
+            sr = get_constants()[ 'sr_audio' ] if sr is None else sr,
+            )
+    return audio
+
 def gesture_to_motor(
         gesture_files: Union[ Iterable[ str ], str ],
         motor_files: Optional[ Union[ Iterable[ str ], str ] ],
+        cache: Optional[ Union[ StageCache, str ] ] = None,
         workers: int = None,
         verbose: bool = True,
         ) -> None:
+    """
+    Convert gesture files into motor files.
+
+    If cache is given, a StageCache or a cache directory, motor files
+    of unchanged gesture files are copied from the cache instead of
+    being computed again, see StageCache.
+    """
+    cache = as_stage_cache( cache )
 
     gesture_files = make_iterable( gesture_files )
     motor_files = make_iterable( motor_files )
@@ -236,30 +614,64 @@ def gesture_to_motor(
         dict(
             gesture_file = gf,
             motor_file = mf,
+            cache = cache,
             )
         for gf, mf in zip(
             gesture_files,
             motor_files,
             )
         ]
-    process(
-        gesture_file_to_motor_file,
-        args = args,
-        return_data = False,
-        workers = workers,
-        verbose = verbose,
-        mp_threshold = 4,
-        initializer = load_speaker,
-        initargs = ( cyvtl.active_speaker(), ),
+    for _ in iprocess(
+            _gesture_file_to_motor_file,
+            args = args,
+            verbose = verbose,
+            workers = workers,
+            mp_threshold = 4,
+            initializer = _initialize_worker,
+            initargs = ( cyvtl.active_speaker(), ),
+            return_data = False,
+            cost = _gesture_cost,
+            ):
+        pass
+    if cache is not None:
+        cache.evict()
+    return
+
+def _gesture_file_to_motor_file(
+        gesture_file,
+        motor_file,
+        cache = None,
+        ):
+    if cache is not None:
+        key = cache.key( 'gesture_to_motor', gesture_file )
+        if cache.get( key, motor_file ):
+            return
+    gesture_file_to_motor_file(
+        gesture_file = gesture_file,
+        motor_file = motor_file,
         )
+    if cache is not None:
+        cache.put( key, motor_file )
     return
 
 def motor_to_audio(
-        motor_data: Union[ MotorSequence, MotorSeries, str ],
+        motor_data: Union[
+            MotorSequence,
+            MotorSeries,
+            str,
+            Iterable[ Union[ MotorSequence, MotorSeries, str ] ],
+            ],
         audio_files: Optional[ Union[ Iterable[str], str ] ] = None,
         normalize_audio: int = -1,
         sr: int = None,
         return_data: bool = False,
+        async_write: bool = True,
+        segment_duration: Optional[ float ] = None,
+        dtype: Optional[ str ] = None,
+        normalization: str = 'file',
+        cache: Optional[ Union[ StageCache, str ] ] = None,
+        features: Optional[ List[ Callable ] ] = None,
+        feature_files: Optional[ Union[ Iterable[ str ], str ] ] = None,
         workers: int = None,
         verbose: bool = True,
         ) -> np.ndarray:
@@ -268,12 +680,15 @@ def motor_to_audio(
 
     Parameters
     ----------
-    motor_data : Union[MotorScore, MotorSeries, str]
+    motor_data : Union[MotorScore, MotorSeries, str, Iterable]
         Input data representing motor scores or series.
-        Can be a MotorScore object, MotorSeries object, or a path to a file.
+        Can be a MotorScore object, MotorSeries object, or a path to a file,
+        or an iterable of those. Iterables are consumed lazily, e.g. a
+        generator that loads the motor series one by one, and only a
+        bounded number of items is held in memory at once.
 
     audio_files : Optional[Union[Iterable[str], str]], optional
-        Path or list of paths to store the generated audio files.
+        Path or iterable of paths to store the generated audio files.
         If None, audio files will not be saved. Default is None.
 
     normalize_audio : int, optional
@@ -288,6 +703,66 @@ def motor_to_audio(
         Flag indicating whether to return the generated audio data.
         Default is False.
 
+    async_write : bool, optional
+        If True, the worker processes return the audio and the files are
+        written by background threads of the calling process, so that
+        synthesis and disk writes overlap. If False, each worker writes
+        its file before it continues. Default is True.
+
+    segment_duration : float, optional
+        If given, each motor series is split into segments of about this
+        duration in seconds, which are synthesized in parallel and joined
+        with cross-fades, see segmented_motor_to_audio. This speeds up
+        the synthesis of few, long utterances. The items themselves are
+        then processed one after another, each with its own worker pool,
+        so batches of many items are faster without segment_duration.
+        With async_write, the files are written in the background while
+        the next item is synthesized. Default is None.
+
+    dtype : str, optional
+        Storage type of the returned and written audio, 'float64',
+        'float32' or 'int16'. The audio is synthesized and normalized in
+        double precision and converted at the end, inside the workers,
+        so that float32 halves and int16 quarters the memory of the
+        results and of the audio files. If None, the audio is returned
+        as float64. Default is None.
+
+    normalization : str, optional
+        'file' normalizes the peak of each file to normalize_audio dBFS.
+        'corpus' applies one gain to all files, such that the loudest
+        file peaks at normalize_audio dBFS and the relative levels of
+        the files are kept. The workers synthesize the audio without
+        normalization and measure the peak and RMS of each file, see
+        audioprocessing.CorpusStatistics. Once all files are
+        synthesized, the gain is applied to the buffered results while
+        they are written. All audio is held in (shared) memory until
+        then. Default is 'file'.
+
+    cache : Union[StageCache, str], optional
+        A StageCache or a cache directory. The audio is cached under a
+        hash of the motor parameters, the speaker, sr, normalize_audio,
+        dtype and the API version. Cached items skip the synthesis and
+        are read from the cache instead. The audio is stored
+        uncompressed with the returned dtype, so with dtype None an
+        entry takes four times the space of an int16 entry. The least
+        recently used entries are evicted after each call, until the
+        cache fits its size limit. Not used with segment_duration.
+        Default is None.
+
+    features : List[Callable], optional
+        Feature extractors, e.g. features.MelSpectrogram, RMSEnergy or
+        DurationStatistics. They are applied inside the workers to the
+        audio in memory, before it is written, and the features of each
+        item are saved to an npz file, see features.save_features. So
+        the audio files never have to be read again to compute
+        training features. Not supported with normalization='corpus'.
+        Default is None.
+
+    feature_files : Optional[Union[Iterable[str], str]], optional
+        Paths of the feature files. If None, the features are saved
+        next to the audio files, e.g. 'x.wav' -> 'x.features.npz'.
+        Default is None.
+
     workers : int, optional
         Number of worker processes for parallel processing.
         If None, uses the system's default number of CPU cores.
@@ -335,107 +810,735 @@ def motor_to_audio(
     >>> audio_data = motor_to_audio(motor_file_path, normalize_audio=0.5, return_data=True)
     """
 
-    motor_data = make_iterable( motor_data )
-    if audio_files is None:
-        audio_files = [ None ] * len( motor_data )
-    else:
-        audio_files = make_iterable( audio_files )
-    if len( audio_files ) != len( motor_data ):
-        raise ValueError(
-            f"""
-            The number of audio file paths: {len(audio_files)}
-            does not match the number of motor data: {len(motor_data)}.
-            """
-            )
-    
-    args = [
+    _check_normalization( normalization )
+    _check_features( features, feature_files, audio_files, normalization )
+    if features is None:
+        feature_files = None
+    if segment_duration is not None:
+        corpus = normalization == 'corpus'
+        audio_data = []
+        buffer = {}
+        audio_file_paths = {}
+        statistics = CorpusStatistics()
+        write_async = async_write and not corpus
+        with AudioWriter() as writer:
+            for index, ( md, audio_file_path, feature_file ) in enumerate( _zip_inputs(
+                    ( 'motor data', motor_data ),
+                    ( 'audio file paths', audio_files ),
+                    ( 'feature file paths', feature_files ),
+                    ) ):
+                audio = segmented_motor_to_audio(
+                    motor_data = md,
+                    segment_duration = segment_duration,
+                    audio_file = None if corpus or write_async else audio_file_path,
+                    normalize_audio = None if corpus else normalize_audio,
+                    sr = sr,
+                    dtype = None if corpus else dtype,
+                    workers = workers,
+                    verbose = verbose,
+                    )
+                if write_async and audio_file_path is not None:
+                    writer.submit(
+                        audio_file_path,
+                        audio,
+                        get_constants()[ 'sr_audio' ] if sr is None else sr,
+                        )
+                if features is not None:
+                    _save_audio_features(
+                        audio,
+                        sr,
+                        features,
+                        _feature_file( features, feature_file, audio_file_path ),
+                        )
+                if corpus:
+                    statistics.update( CorpusStatistics.measure( audio ) )
+                    buffer[ index ] = audio
+                    audio_file_paths[ index ] = audio_file_path
+                elif return_data:
+                    audio_data.append( audio )
+        if corpus:
+            return _apply_corpus_gain(
+                buffer = buffer,
+                audio_files = audio_file_paths,
+                gain = _corpus_gain( statistics, normalize_audio ),
+                sr = sr,
+                return_data = return_data,
+                dtype = dtype,
+                )
+        return audio_data if return_data else None
+
+    cache = as_stage_cache( cache )
+    args = (
         dict(
             motor_data = md,
             audio_file_path = audio_file_path,
             normalize_audio = normalize_audio,
             sr = sr,
+            dtype = dtype,
+            cache = cache,
+            features = features,
+            feature_file = _feature_file( features, feature_file, audio_file_path ),
             )
-        for md, audio_file_path in zip(
-            motor_data,
-            audio_files,
+        for md, audio_file_path, feature_file in _zip_inputs(
+            ( 'motor data', motor_data ),
+            ( 'audio file paths', audio_files ),
+            ( 'feature file paths', feature_files ),
             )
-        ]
-    audio_data = process(
+        )
+    audio_data = _synthesize_audio(
         _motor_to_audio,
         args = args,
+        sr = sr,
+        write_files = audio_files is not None,
         return_data = return_data,
+        async_write = async_write,
         workers = workers,
         verbose = verbose,
-        mp_threshold = 4,
-        initializer = load_speaker,
-        initargs = ( cyvtl.active_speaker(), ),
+        cost = _schedule_cost( motor_data, _motor_cost ),
+        normalization = normalization,
         )
+    if cache is not None:
+        cache.evict()
     return audio_data
 
-def _motor_to_audio(
-        motor_data,
-        audio_file_path,
-        normalize_audio,
-        sr,
-        state_samples = None,
-        ):
+def imotor_to_audio(
+        motor_data: Union[
+            MotorSequence,
+            MotorSeries,
+            str,
+            Iterable[ Union[ MotorSequence, MotorSeries, str ] ],
+            ],
+        audio_files: Optional[ Union[ Iterable[str], str ] ] = None,
+        normalize_audio: int = -1,
+        sr: int = None,
+        ordered: bool = False,
+        async_write: bool = True,
+        dtype: Optional[ str ] = None,
+        workers: int = None,
+        verbose: bool = True,
+        ) -> Iterator[ Tuple[ int, np.ndarray ] ]:
     """
-    Generate audio from motor data.
+    Convert motor data into audio signals and yield them as they finish.
+
+    Works like motor_to_audio with return_data=True, but instead of a
+    list that is returned after all items are synthesized, the audio
+    of each item is yielded as soon as a worker finished it. This way,
+    downstream processing can overlap with the synthesis.
 
     Parameters
     ----------
-    motor_data : Union[MotorScore, MotorSeries, str]
-        Input data representing motor scores or series.
-        Can be a MotorScore object, MotorSeries object, or a path to a file.
+    motor_data : Union[MotorScore, MotorSeries, str, Iterable]
+        Input data, see motor_to_audio.
 
-    audio_file_path : Optional[str]
-        Path to store the generated audio file. If None, audio will not be saved.
+    audio_files : Optional[Union[Iterable[str], str]], optional
+        Path or iterable of paths to store the generated audio files.
+        If None, audio files will not be saved. Default is None.
 
-    normalize_audio : int
-        Amplitude normalization factor. Use -1 for no normalization.
+    normalize_audio : int, optional
+        Amplitude normalization factor.
+        -1 indicates no normalization. Default is -1.
 
-    sr : int
+    sr : int, optional
         Sampling rate of the output audio.
+        If None, defaults to the system's default audio sampling rate.
 
-    state_samples : int, optional
-        Number of samples for state duration.
-        If None, defaults to a predefined constant value.
+    ordered : bool, optional
+        If True, the items are yielded in input order, otherwise in the
+        order in which they complete. Default is False.
 
-    Returns
-    -------
-    torch.Tensor
-        A tensor representing the generated audio.
+    async_write : bool, optional
+        If True, the audio files are written by background threads of
+        the calling process. Default is True.
 
-    Raises
-    ------
-    FileNotFoundError
-        If the specified motor file path does not exist.
+    dtype : str, optional
+        Storage type of the audio, see motor_to_audio. Default is None.
 
-    TypeError
-        If the specified motor data type is not supported.
-        Supported types include str, MotorScore, and MotorSeries.
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
 
-    Notes
-    -----
-    This function generates audio signals from motor data using the VocalTractLab synthesizer.
-    It processes the motor parameters and synthesizes corresponding audio signals.
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Yields
+    ------
+    Tuple[int, np.ndarray]
+        The index of the item in motor_data and its audio.
 
     Examples
     --------
-    # Example 1: Generate audio from MotorScore object without saving the file
-    >>> motor_data = MotorScore(...)  # Replace '...' with actual MotorScore data
-    >>> audio_tensor = _motor_to_audio(motor_data, audio_file_path=None, normalize_audio=0, sr=44100)
+    >>> for index, audio in imotor_to_audio( motor_files ):
+    ...     features[ index ] = extract_features( audio )
+    """
+    args = (
+        dict(
+            motor_data = md,
+            audio_file_path = audio_file_path,
+            normalize_audio = normalize_audio,
+            sr = sr,
+            dtype = dtype,
+            )
+        for md, audio_file_path in _zip_inputs(
+            ( 'motor data', motor_data ),
+            ( 'audio file paths', audio_files ),
+            )
+        )
+    return _isynthesize_audio(
+        _motor_to_audio,
+        args = args,
+        sr = sr,
+        write_files = audio_files is not None,
+        return_data = True,
+        async_write = async_write,
+        ordered = ordered,
+        workers = workers,
+        verbose = verbose,
+        cost = _schedule_cost( motor_data, _motor_cost ),
+        )
 
-    # Example 2: Generate audio from MotorSeries object and save the audio file
-    >>> motor_series = MotorSeries(...)  # Replace '...' with actual MotorSeries data
-    >>> audio_path = 'output_audio.wav'  # Path to save the audio file
-    >>> _motor_to_audio(motor_series, audio_file_path=audio_path, normalize_audio=-1, sr=22050)
+def motor_to_corpus(
+        motor_data: Union[
+            MotorSequence,
+            MotorSeries,
+            str,
+            Iterable[ Union[ MotorSequence, MotorSeries, str ] ],
+            ],
+        corpus: Union[ str, AudioCorpus ],
+        metadata: Optional[ Iterable[ Dict[ str, Any ] ] ] = None,
+        normalize_audio: int = -1,
+        sr: int = None,
+        dtype: str = 'int16',
+        workers: int = None,
+        verbose: bool = True,
+        ) -> List[ int ]:
+    """
+    Synthesize motor data and append the audio to an audio corpus.
 
-    # Example 3: Generate audio from a file containing motor data with custom state samples
-    >>> motor_file_path = 'path/to/motor_data.csv'  # Replace with the actual file path
-    >>> audio_tensor = _motor_to_audio(motor_file_path, audio_file_path=None, normalize_audio=0.8, sr=44100, state_samples=120)
+    Instead of writing one audio file per item, the workers append the
+    audio directly to a single memory-mapped corpus file, see
+    corpus.AudioCorpus. No audio is passed back to the calling process.
+
+    Parameters
+    ----------
+    motor_data : Union[MotorScore, MotorSeries, str, Iterable]
+        Input data, see motor_to_audio.
+
+    corpus : Union[str, AudioCorpus]
+        The corpus or its directory. A new corpus is created with the
+        specified dtype and sampling rate if the directory does not
+        contain a corpus yet.
+
+    metadata : Iterable[Dict[str, Any]], optional
+        Additional metadata of each item. The path of the motor file
+        (if the motor data is a path) and the speaker file are always
+        stored. Default is None.
+
+    normalize_audio : int, optional
+        Amplitude normalization in dBFS. Default is -1.
+
+    sr : int, optional
+        Sampling rate of the audio.
+        If None, defaults to the system's default audio sampling rate.
+
+    dtype : str, optional
+        Sample type of a new corpus, 'int16' or 'float32'.
+        Default is 'int16'.
+
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
+
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Returns
+    -------
+    List[int]
+        The index of each item in the corpus, in input order.
     """
+    if sr is None:
+        sr = get_constants()[ 'sr_audio' ]
+    if not isinstance( corpus, AudioCorpus ):
+        corpus = AudioCorpus( corpus, dtype = dtype, sr = sr )
+    speaker = cyvtl.active_speaker()
+    args = (
+        dict(
+            motor_data = md,
+            corpus_path = corpus.path,
+            metadata = dict(
+                motor_file = md if isinstance( md, str ) else None,
+                speaker = speaker,
+                **( item_metadata or {} ),
+                ),
+            normalize_audio = normalize_audio,
+            sr = sr,
+            )
+        for md, item_metadata in _zip_inputs(
+            ( 'motor data', motor_data ),
+            ( 'metadata', metadata ),
+            )
+        )
+    return list( iprocess(
+        _motor_to_corpus,
+        args = args,
+        verbose = verbose,
+        workers = workers,
+        mp_threshold = 4,
+        initializer = _initialize_worker,
+        initargs = ( speaker, ),
+        cost = _schedule_cost( motor_data, _motor_cost ),
+        ) )
+
+def _motor_to_corpus(
+        motor_data,
+        corpus_path,
+        metadata,
+        normalize_audio,
+        sr,
+        ):
+    audio = _motor_to_audio(
+        motor_data = motor_data,
+        audio_file_path = None,
+        normalize_audio = normalize_audio,
+        sr = sr,
+        )
+    return AudioCorpus( corpus_path ).append( audio, **metadata )
+
+def _synthesize_audio(
+        function: Callable,
+        args: Iterable[ Dict[ str, Any ] ],
+        sr: Optional[ int ],
+        write_files: bool,
+        return_data: bool,
+        async_write: bool,
+        workers: Optional[ int ],
+        verbose: bool,
+        cost: Optional[ Callable ] = None,
+        normalization: str = 'file',
+        ):
+    _check_normalization( normalization )
+    if normalization == 'corpus':
+        return _synthesize_corpus(
+            function,
+            args = args,
+            sr = sr,
+            return_data = return_data,
+            workers = workers,
+            verbose = verbose,
+            cost = cost,
+            )
+    # The results are consumed as they complete, so the files are
+    # written while the longest first schedule is still running, and
+    # are only put in input order in memory if they are returned
+    audio_data = {}
+    for index, audio in _isynthesize_audio(
+            function,
+            args = args,
+            sr = sr,
+            write_files = write_files,
+            return_data = return_data,
+            async_write = async_write,
+            ordered = False,
+            workers = workers,
+            verbose = verbose,
+            cost = cost,
+            ):
+        if return_data:
+            audio_data[ index ] = audio
+    if not return_data:
+        return None
+    return [ audio_data[ index ] for index in range( len( audio_data ) ) ]
+
+def _isynthesize_audio(
+        function: Callable,
+        args: Iterable[ Dict[ str, Any ] ],
+        sr: Optional[ int ],
+        write_files: bool,
+        return_data: bool,
+        async_write: bool,
+        ordered: bool,
+        workers: Optional[ int ],
+        verbose: bool,
+        cost: Optional[ Callable ] = None,
+        ) -> Iterator[ Tuple[ int, Optional[ np.ndarray ] ] ]:
+    # Synthesize audio in worker processes. If async_write is True, the
+    # workers do not write the audio files themselves but return the
+    # audio, which is then written by an AudioWriter in the background.
+    # Returned audio is passed via shared memory instead of being pickled.
+    write_async = async_write and write_files
+    if sr is None:
+        sr = get_constants()[ 'sr_audio' ]
+    # The args are consumed lazily by iprocess, so the file paths of
+    # the submitted items are stored by their index
+    audio_files = {}
+    def _args():
+        for index, kwargs in enumerate( args ):
+            audio_files[ index ] = kwargs[ 'audio_file_path' ]
+            if write_async:
+                kwargs = dict( kwargs, audio_file_path = None )
+            yield kwargs
+    with AudioWriter() as writer:
+        for index, audio in iprocess(
+                function,
+                args = _args(),
+                verbose = verbose,
+                workers = workers,
+                mp_threshold = 4,
+                initializer = _initialize_worker,
+                initargs = ( cyvtl.active_speaker(), ),
+                shared_memory = True,
+                return_data = return_data or write_async,
+                ordered = ordered,
+                return_index = True,
+                cost = cost,
+                ):
+            audio_file_path = audio_files.pop( index )
+            if write_async and audio_file_path is not None:
+                writer.submit( audio_file_path, audio, sr )
+            yield index, audio if return_data else None
+    return
+
+def _check_normalization( normalization: str ):
+    if normalization not in [ 'file', 'corpus' ]:
+        raise ValueError(
+            f"""
+            The specified normalization: '{normalization}'
+            is not supported. Normalization must be one of the following:
+            - file
+            - corpus
+            """
+            )
+    return
+
+def _synthesize_corpus(
+        function: Callable,
+        args: Iterable[ Dict[ str, Any ] ],
+        sr: Optional[ int ],
+        return_data: bool,
+        workers: Optional[ int ],
+        verbose: bool,
+        cost: Optional[ Callable ] = None,
+        ):
+    # First pass: the workers synthesize the audio without normalization
+    # and measure the statistics of each file. The audio is buffered in
+    # shared memory until the gain of the corpus is known.
+    audio_files = {}
+    normalize_audio = {}
+    dtype = {}
+    def _args():
+        for index, kwargs in enumerate( args ):
+            audio_files[ index ] = kwargs[ 'audio_file_path' ]
+            normalize_audio[ index ] = kwargs[ 'normalize_audio' ]
+            dtype[ index ] = kwargs.get( 'dtype' )
+            yield dict(
+                kwargs,
+                synthesize = function,
+                audio_file_path = None,
+                normalize_audio = None,
+                dtype = None,
+                )
+    statistics = CorpusStatistics()
+    buffer = {}
+    for index, x in iprocess(
+            _synthesize_with_statistics,
+            args = _args(),
+            verbose = verbose,
+            workers = workers,
+            mp_threshold = 4,
+            initializer = _initialize_worker,
+            initargs = ( cyvtl.active_speaker(), ),
+            shared_memory = True,
+            ordered = False,
+            return_index = True,
+            cost = cost,
+            ):
+        statistics.update( x[ 'statistics' ] )
+        buffer[ index ] = x[ 'audio' ]
+    if not buffer:
+        return [] if return_data else None
+    # Second pass: one gain for all files, applied while writing
+    return _apply_corpus_gain(
+        buffer = buffer,
+        audio_files = audio_files,
+        gain = _corpus_gain( statistics, normalize_audio[ 0 ] ),
+        sr = sr,
+        return_data = return_data,
+        dtype = dtype[ 0 ],
+        )
+
+def _synthesize_with_statistics( synthesize: Callable, **kwargs ):
+    audio = synthesize( **kwargs )
+    return dict(
+        audio = audio,
+        statistics = CorpusStatistics.measure( audio ),
+        )
+
+def _corpus_gain(
+        statistics: CorpusStatistics,
+        normalize_audio: Optional[ float ],
+        ) -> float:
+    if normalize_audio is None:
+        return 1.0
+    return statistics.gain( dBFS = normalize_audio )
+
+def _apply_corpus_gain(
+        buffer: Dict[ int, np.ndarray ],
+        audio_files: Dict[ int, Optional[ str ] ],
+        gain: float,
+        sr: Optional[ int ],
+        return_data: bool,
+        dtype: Optional[ str ],
+        ):
+    if sr is None:
+        sr = get_constants()[ 'sr_audio' ]
+    audio_data = []
+    with AudioWriter() as writer:
+        for index in sorted( buffer ):
+            audio = buffer.pop( index )
+            # In place, the shared memory results are copy-on-write mappings
+            audio *= gain
+            if dtype is not None:
+                audio = convert_audio_dtype(
+                    torch.from_numpy( np.asarray( audio ) ),
+                    dtype = dtype,
+                    ).numpy()
+            if audio_files[ index ] is not None:
+                writer.submit( audio_files[ index ], audio, sr )
+            if return_data:
+                audio_data.append( audio )
+    return audio_data if return_data else None
+
+def _schedule_cost( x, cost: Callable ) -> Optional[ Callable ]:
+    # Longest first scheduling reads all inputs up front, so it is
+    # only used for sized inputs. Lazy inputs are processed in input
+    # order to keep the memory bounded.
+    if hasattr( _iterable_inputs( x ), '__len__' ):
+        return cost
+    return None
+
+def _motor_cost( kwargs ) -> float:
+    # Relative synthesis time, the number of frames or the file size
+    motor_data = kwargs[ 'motor_data' ]
+    if isinstance( motor_data, MotorSequence ):
+        return motor_data.duration() * 441
+    elif isinstance( motor_data, TargetSeries ):
+        return len( motor_data )
+    elif isinstance( motor_data, str ) and os.path.exists( motor_data ):
+        return os.path.getsize( motor_data )
+    return 0.0
+
+def _gesture_cost( kwargs ) -> float:
+    gesture_file = kwargs.get( 'gesture_data', kwargs.get( 'gesture_file' ) )
+    if isinstance( gesture_file, str ) and os.path.exists( gesture_file ):
+        return get_gesture_duration( gesture_file )[ 'duration' ]
+    return 0.0
+
+def _phoneme_cost( kwargs ) -> float:
+    phoneme_file = kwargs[ 'phoneme_file' ]
+    if os.path.exists( phoneme_file ):
+        return os.path.getsize( phoneme_file )
+    return 0.0
+
+def _iterable_inputs( x ):
+    # Series and sequences are iterable, but are a single input
+    if isinstance( x, ( TargetSeries, MotorSequence, SupraGlottalSequence ) ):
+        return [ x ]
+    return make_iterable( x )
+
+def _zip_inputs( *inputs ):
+    # Zip ( name, x ) pairs of inputs and output file paths, an x of
+    # None is paired with every item. The lengths of sized inputs are
+    # checked up front, lazy inputs are checked while they are consumed.
+    names = [ name for name, _ in inputs ]
+    columns = [
+        _iterable_inputs( x ) if x is not None else None
+        for _, x in inputs
+        ]
+    sized = [
+        ( name, column )
+        for name, column in zip( names, columns )
+        if column is not None and hasattr( column, '__len__' )
+        ]
+    for name, column in sized[ 1: ]:
+        if len( column ) != len( sized[ 0 ][ 1 ] ):
+            raise ValueError(
+                f"""
+                The number of {sized[ 0 ][ 0 ]}: {len( sized[ 0 ][ 1 ] )}
+                does not match the number of {name}: {len( column )}.
+                """
+                )
+    return _zip_strict( names, columns )
+
+def _zip_strict( names, columns ):
+    sentinel = object()
+    active = [ column for column in columns if column is not None ]
+    for items in itertools.zip_longest( *active, fillvalue = sentinel ):
+        if any( item is sentinel for item in items ):
+            raise ValueError(
+                f"""
+                The number of items does not match between
+                the inputs: {[ n for n, c in zip( names, columns ) if c is not None ]}.
+                """
+                )
+        items = iter( items )
+        yield tuple(
+            next( items ) if column is not None else None
+            for column in columns
+            )
+    return
+
+def segmented_motor_to_audio(
+        motor_data: Union[ MotorSequence, MotorSeries, str ],
+        segment_duration: float = 10.0,
+        warmup_duration: float = 0.1,
+        crossfade_duration: float = 0.01,
+        audio_file: Optional[ str ] = None,
+        normalize_audio: int = -1,
+        sr: int = None,
+        return_error: bool = False,
+        dtype: Optional[ str ] = None,
+        workers: int = None,
+        verbose: bool = True,
+        ) -> Union[ np.ndarray, Tuple[ np.ndarray, float ] ]:
+    """
+    Synthesize a single long utterance in parallel segments.
+
+    The motor series is split into segments, which are synthesized on
+    separate workers and joined with cross-fades. Each segment starts
+    with a warm-up context that is discarded, so that the synthesizer
+    has settled at the start of the segment. The segment boundaries are
+    moved to frames with a low lung pressure, where cross-fades are
+    least audible. The latency for long inputs decreases roughly in
+    proportion to the number of workers.
+
+    Parameters
+    ----------
+    motor_data : Union[MotorScore, MotorSeries, str]
+        The motor series to synthesize, or a path to a motor file.
+
+    segment_duration : float, optional
+        Nominal duration of the segments in seconds. Default is 10.0.
+
+    warmup_duration : float, optional
+        Duration of the warm-up context of each segment in seconds.
+        Default is 0.1.
+
+    crossfade_duration : float, optional
+        Duration of the cross-fades in seconds. Default is 0.01.
+
+    audio_file : str, optional
+        Path to store the generated audio. Default is None.
 
+    normalize_audio : int, optional
+        Amplitude normalization factor.
+        -1 indicates no normalization. Default is -1.
+
+    sr : int, optional
+        Sampling rate of the output audio.
+        If None, defaults to the system's default audio sampling rate.
+
+    return_error : bool, optional
+        If True, the unsplit series is synthesized as well and the
+        spectral distance between the joined and the unsplit audio is
+        returned, see audioprocessing.spectral_distance. A sample-wise
+        error is not meaningful, because the phase of the glottal
+        oscillation differs after each boundary. Default is False.
+
+    dtype : str, optional
+        Storage type of the audio, see motor_to_audio. The spectral
+        distance is computed before the conversion. Default is None.
+
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
+
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Returns
+    -------
+    Union[np.ndarray, Tuple[np.ndarray, float]]
+        The audio, and the spectral distance in dB if return_error is True.
+    """
+    motor_series = _to_motor_series( motor_data )
+    if motor_series.sr is None:
+        raise ValueError(
+            f"""
+            The specified motor series has no asociated sampling
+            rate and thus, cannot be used for audio generation.
+            """
+            )
+    sr_audio = get_constants()[ 'sr_audio' ]
+    state_samples = int( sr_audio / motor_series.sr )
+    tract_params = motor_series.tract().to_numpy( transpose = False )
+    glottal_params = motor_series.glottis().to_numpy( transpose = False )
+
+    plan = plan_segments(
+        n_frames = len( tract_params ),
+        segment_frames = max( 1, int( segment_duration * motor_series.sr ) ),
+        warmup_frames = int( warmup_duration * motor_series.sr ),
+        crossfade_frames = max( 1, int( crossfade_duration * motor_series.sr ) ),
+        loudness = motor_series[ 'PR' ] if 'PR' in motor_series.tiers() else None,
+        )
+    args = [
+        dict(
+            tract_parameters = tract_params[ synth_start : synth_end ],
+            glottis_parameters = glottal_params[ synth_start : synth_end ],
+            state_samples = state_samples,
+            )
+        for synth_start, _, _, synth_end in plan
+        ]
+    if return_error:
+        # The reference is the longest task, so it is submitted first
+        args.insert(
+            0,
+            dict(
+                tract_parameters = tract_params,
+                glottis_parameters = glottal_params,
+                state_samples = state_samples,
+                ),
+            )
+    segments = list( iprocess(
+        _synth_block,
+        args = args,
+        verbose = verbose,
+        workers = workers,
+        mp_threshold = 2,
+        initializer = _initialize_worker,
+        initargs = ( cyvtl.active_speaker(), ),
+        shared_memory = True,
+        ) )
+    if return_error:
+        reference = segments.pop( 0 )
+    audio = stitch_segments(
+        segments = segments,
+        plan = plan,
+        state_samples = state_samples,
+        )
+    if return_error:
+        error = spectral_distance( audio, reference, sr = sr_audio )
+
+    audio = postprocess(
+        x = audio,
+        sr_out = sr,
+        dBFS = normalize_audio,
+        file_path = audio_file,
+        to_numpy = True,
+        dtype = dtype,
+        )
+    if return_error:
+        return audio, error
+    return audio
+
+def _synth_block( **kwargs ):
+    return synth_block( verbose_api = False, **kwargs )
+
+def _to_motor_series(
+        motor_data: Union[ MotorSequence, MotorSeries, str ],
+        ) -> MotorSeries:
     if isinstance( motor_data, str ):
         if not os.path.exists( motor_data ):
             raise FileNotFoundError( 
@@ -473,6 +1576,77 @@ def _motor_to_audio(
             generating audio.
             """
             )
+    return motor_series
+
+def _motor_to_audio(
+        motor_data,
+        audio_file_path,
+        normalize_audio,
+        sr,
+        state_samples = None,
+        dtype = None,
+        cache = None,
+        features = None,
+        feature_file = None,
+        ):
+    """
+    Generate audio from motor data.
+
+    Parameters
+    ----------
+    motor_data : Union[MotorScore, MotorSeries, str]
+        Input data representing motor scores or series.
+        Can be a MotorScore object, MotorSeries object, or a path to a file.
+
+    audio_file_path : Optional[str]
+        Path to store the generated audio file. If None, audio will not be saved.
+
+    normalize_audio : int
+        Amplitude normalization factor. Use -1 for no normalization.
+
+    sr : int
+        Sampling rate of the output audio.
+
+    state_samples : int, optional
+        Number of samples for state duration.
+        If None, defaults to a predefined constant value.
+
+    Returns
+    -------
+    torch.Tensor
+        A tensor representing the generated audio.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the specified motor file path does not exist.
+
+    TypeError
+        If the specified motor data type is not supported.
+        Supported types include str, MotorScore, and MotorSeries.
+
+    Notes
+    -----
+    This function generates audio signals from motor data using the VocalTractLab synthesizer.
+    It processes the motor parameters and synthesizes corresponding audio signals.
+
+    Examples
+    --------
+    # Example 1: Generate audio from MotorScore object without saving the file
+    >>> motor_data = MotorScore(...)  # Replace '...' with actual MotorScore data
+    >>> audio_tensor = _motor_to_audio(motor_data, audio_file_path=None, normalize_audio=0, sr=44100)
+
+    # Example 2: Generate audio from MotorSeries object and save the audio file
+    >>> motor_series = MotorSeries(...)  # Replace '...' with actual MotorSeries data
+    >>> audio_path = 'output_audio.wav'  # Path to save the audio file
+    >>> _motor_to_audio(motor_series, audio_file_path=audio_path, normalize_audio=-1, sr=22050)
+
+    # Example 3: Generate audio from a file containing motor data with custom state samples
+    >>> motor_file_path = 'path/to/motor_data.csv'  # Replace with the actual file path
+    >>> audio_tensor = _motor_to_audio(motor_file_path, audio_file_path=None, normalize_audio=0.8, sr=44100, state_samples=120)
+    """
+
+    motor_series = _to_motor_series( motor_data )
     vtl_constants = get_constants()
     if state_samples is None:
         #state_samples = vtl_constants[ 'n_samples_per_state' ]
@@ -489,21 +1663,39 @@ def _motor_to_audio(
     #print( glottal_params.shape )
     #print( state_samples )
 
+    audio = None
+    if cache is not None:
+        key = _audio_cache_key(
+            cache,
+            'motor_to_audio',
+            np.concatenate( [ tract_params, glottal_params ], axis = 1 ),
+            normalize_audio = normalize_audio,
+            sr = sr,
+            dtype = dtype,
+            state_samples = state_samples,
+            )
+        audio = _load_cached_audio( cache, key, audio_file_path, sr )
     
-    audio = synth_block(
-        tract_parameters = tract_params,
-        glottis_parameters = glottal_params,
-        state_samples = state_samples,
-        verbose_api = False,
-        )
-    
-    audio = postprocess(
-        x = audio,
-        sr_out = sr,
-        dBFS = normalize_audio,
-        file_path = audio_file_path,
-        to_numpy = True,
-        )
+    if audio is None:
+        audio = synth_block(
+            tract_parameters = tract_params,
+            glottis_parameters = glottal_params,
+            state_samples = state_samples,
+            verbose_api = False,
+            )
+        
+        audio = postprocess(
+            x = audio,
+            sr_out = sr,
+            dBFS = normalize_audio,
+            file_path = audio_file_path,
+            to_numpy = True,
+            dtype = dtype,
+            )
+        if cache is not None:
+            cache.save_array( key, audio )
+    if features is not None:
+        _save_audio_features( audio, sr, features, feature_file )
     
     return audio
 
@@ -515,62 +1707,418 @@ def motor_to_transfer_function(
             SupraGlottalSeries,
             str,
             ],
-        n_spectrum_samples: int = 8192,
+        n_spectrum_samples: Optional[ int ] = None,
         save_magnitude_spectrum: bool = True,
         save_phase_spectrum: bool = True,
+        engine: str = 'vtl',
+        frequencies: Optional[ ArrayLike ] = None,
+        max_frequency: Optional[ float ] = None,
+        formants_only: bool = False,
+        dtype: Optional[ str ] = None,
         workers: int = None,
         verbose: bool = True,
-        ):
-    if isinstance( x, MotorSequence ):
-        ms = x.to_series()
-        sgs = ms.glottis()
-    elif isinstance( x, MotorSeries ):
-        sgs = x.glottis()
-    elif isinstance( x, SupraGlottalSequence ):
-        sgs = x.to_series()
-    elif isinstance( x, str ):
-        sgs = SupraGlottalSeries.load( x )
-    elif isinstance( x, SupraGlottalSeries ):
-        sgs = x
-    else:
-        raise TypeError(
+        ) -> Union[ List[ TransferFunction ], np.ndarray ]:
+    """
+    Compute the vocal tract transfer function of each tract state.
+
+    Parameters
+    ----------
+    x : Union[MotorSequence, MotorSeries, SupraGlottalSequence, SupraGlottalSeries, str]
+        Input data containing the supra-glottal (tract) states.
+
+    n_spectrum_samples : int, optional
+        Number of spectrum samples. If None, uses 8192, or
+        FORMANTS_ONLY_SPECTRUM_SAMPLES if formants_only is True.
+
+    save_magnitude_spectrum : bool, optional
+        Whether to keep the magnitude spectrum. Default is True.
+
+    save_phase_spectrum : bool, optional
+        Whether to keep the phase spectrum. Default is True.
+
+    engine : str, optional
+        'vtl' computes each transfer function with the VocalTractLab API.
+        'numpy' only computes the tube geometry with the API and evaluates
+        the acoustics of all frames at once with the chain matrix model in
+        vocaltractlab.tube_acoustics. The 'numpy' engine is faster, but it
+        is an approximation that ignores the nasal cavity.
+        Default is 'vtl'.
+
+    frequencies : ArrayLike, optional
+        Explicit frequency grid in Hz, e.g. a few hundred log-spaced
+        frequencies. The spectra are evaluated and stored at exactly
+        these frequencies. Only supported by the 'numpy' engine.
+        Default is None.
+
+    max_frequency : float, optional
+        Band limit in Hz. Only the bins of the n_spectrum_samples grid up
+        to this frequency are kept. The 'numpy' engine only evaluates
+        these bins, the 'vtl' engine computes the full spectrum and
+        truncates it inside the workers, which still reduces the memory
+        and the transfer of the results. Default is None.
+
+    formants_only : bool, optional
+        If True, only the formants are computed and returned as an array.
+        The spectra are computed with a small number of samples and the
+        formants are refined to sub-bin precision inside the workers,
+        see frequency_domain.refine_peak_frequencies. With the default
+        of 2048 samples, the formants are about as precise as the peaks
+        of an 8192 sample spectrum at about half the cost per frame.
+        Default is False.
+
+    dtype : str, optional
+        Storage type of the spectra, e.g. 'float32' to halve their
+        memory. The spectra are computed in double precision and
+        converted inside the workers, the formants are not affected.
+        If None, the spectra are stored as float64. Default is None.
+
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
+
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Returns
+    -------
+    Union[List[TransferFunction], np.ndarray]
+        One TransferFunction object per tract state, or an array of
+        shape (n_frames, 4) with the formants in Hz if formants_only is
+        True. Missing formants are NaN.
+
+    Raises
+    ------
+    ValueError
+        If the specified engine is not supported, or if frequencies
+        are passed to the 'vtl' engine.
+
+    TypeError
+        If the specified data type is not supported.
+    """
+    if engine not in [ 'vtl', 'numpy' ]:
+        raise ValueError(
             f"""
-            The specified data type: '{type(x)}'
-            is not supported. Type must be one of the following:
-            - MotorSequence
-            - MotorSeries
-            - SupraGlottalSequence
-            - SupraGlottalSeries
-            - str
+            The specified engine: '{engine}'
+            is not supported. Engine must be one of the following:
+            - vtl
+            - numpy
+            """
+            )
+    if frequencies is not None and engine == 'vtl':
+        raise ValueError(
+            f"""
+            The VocalTractLab API can only compute the transfer function
+            on the grid of n_spectrum_samples. Use engine='numpy' to
+            evaluate the transfer function at custom frequencies.
             """
             )
+    sgs = _to_supra_glottal_series( x )
+    tract_states = sgs.to_numpy( transpose = False )
+
+    if n_spectrum_samples is None:
+        n_spectrum_samples = (
+            FORMANTS_ONLY_SPECTRUM_SAMPLES if formants_only else 8192
+            )
+    if formants_only:
+        return _motor_to_formants(
+            tract_states = tract_states,
+            n_spectrum_samples = n_spectrum_samples,
+            engine = engine,
+            frequencies = frequencies,
+            max_frequency = max_frequency,
+            workers = workers,
+            verbose = verbose,
+            )
+
+    if frequencies is None and max_frequency is not None:
+        sr = get_constants()[ 'sr_audio' ]
+        n_bins = min(
+            n_spectrum_samples,
+            int( max_frequency * n_spectrum_samples / sr ) + 1,
+            )
+        frequencies = np.arange( n_bins ) * sr / n_spectrum_samples
+
+    if engine == 'numpy':
+        return _tube_acoustics_transfer_function(
+            tract_states = tract_states,
+            n_spectrum_samples = n_spectrum_samples,
+            save_magnitude_spectrum = save_magnitude_spectrum,
+            save_phase_spectrum = save_phase_spectrum,
+            frequencies = frequencies,
+            dtype = dtype,
+            workers = workers,
+            verbose = verbose,
+            )
+
+    if frequencies is None:
+        # The bins that are kept by TransferFunction, one grid is
+        # shared by all TransferFunction objects
+        sr = get_constants()[ 'sr_audio' ]
+        n_bins = min(
+            n_spectrum_samples,
+            round( n_spectrum_samples**2 / sr ),
+            )
+        frequencies = np.arange( n_bins ) * sr / n_spectrum_samples
+
+    # Frames are processed in chunks, so that the spectra of a chunk can
+    # be passed from the workers as one array in shared memory
     args = [
         dict(
-            tract_state = ts,
+            tract_states = chunk,
             n_spectrum_samples = n_spectrum_samples,
             save_magnitude_spectrum = save_magnitude_spectrum,
             save_phase_spectrum = save_phase_spectrum,
+            frequencies = frequencies,
+            dtype = dtype,
             )
-        for ts in sgs.to_numpy( transpose = False )
+        for chunk in _split_frames( tract_states, workers )
         ]
-    
-    trf_data = process(
-        _motor_to_transfer_function,
+    trf_data = []
+    for chunk, x in zip(
+            args,
+            iprocess(
+                _motor_to_transfer_function,
+                args = args,
+                verbose = verbose,
+                workers = workers,
+                mp_threshold = 4,
+                initializer = _initialize_worker,
+                initargs = ( cyvtl.active_speaker(), ),
+                shared_memory = True,
+                ),
+            ):
+        for index, ts in enumerate( chunk[ 'tract_states' ] ):
+            trf_data.append(
+                TransferFunction(
+                    tract_state = ts,
+                    magnitude_spectrum = (
+                        x[ 'magnitude_spectra' ][ index ]
+                        if x[ 'magnitude_spectra' ] is not None else None
+                        ),
+                    phase_spectrum = (
+                        x[ 'phase_spectra' ][ index ]
+                        if x[ 'phase_spectra' ] is not None else None
+                        ),
+                    n_spectrum_samples = n_spectrum_samples,
+                    frequencies = frequencies,
+                    dtype = dtype,
+                    )
+                )
+    return trf_data
+
+def _split_frames(
+        x: np.ndarray,
+        workers: Optional[ int ],
+        max_chunk_size: int = 256,
+        ) -> List[ np.ndarray ]:
+    # About four chunks per worker for load balancing
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    chunk_size = int( np.clip(
+        np.ceil( len( x ) / ( 4 * workers ) ),
+        1,
+        max_chunk_size,
+        ) )
+    return [
+        x[ start : start + chunk_size ]
+        for start in range( 0, len( x ), chunk_size )
+        ]
+
+def _motor_to_formants(
+        tract_states,
+        n_spectrum_samples,
+        engine,
+        frequencies,
+        max_frequency,
+        workers,
+        verbose,
+        ):
+    if frequencies is None:
+        sr = get_constants()[ 'sr_audio' ]
+        n_bins = n_spectrum_samples // 2 + 1
+        if max_frequency is not None:
+            n_bins = min(
+                n_bins,
+                int( max_frequency * n_spectrum_samples / sr ) + 1,
+                )
+        frequencies = np.arange( n_bins ) * sr / n_spectrum_samples
+    else:
+        frequencies = np.asarray( frequencies, dtype = float )
+
+    if engine == 'numpy':
+        args = [
+            dict(
+                tract_states = chunk,
+                fast_calculation = True,
+                save_tube_articulator = False,
+                save_incisor_position = False,
+                save_tongue_tip_side_elevation = False,
+                save_velum_opening = False,
+                )
+            for chunk in _split_frames( tract_states, workers )
+            ]
+        tube_data = list( _iter_tube_chunks( args, workers, verbose ) )
+        h = tube_to_transfer_function(
+            tube_length = np.concatenate( [ x[ 'tube_length' ] for x in tube_data ] ),
+            tube_area = np.concatenate( [ x[ 'tube_area' ] for x in tube_data ] ),
+            frequencies = frequencies,
+            )
+        return spectra_to_formants(
+            np.abs( h ),
+            frequencies = frequencies,
+            refine = True,
+            )
+
+    args = [
+        dict(
+            tract_states = chunk,
+            n_spectrum_samples = n_spectrum_samples,
+            frequencies = frequencies,
+            )
+        for chunk in _split_frames( tract_states, workers )
+        ]
+    formants = list( iprocess(
+        _motor_to_formants_chunk,
         args = args,
-        return_data = True,
-        workers = workers,
         verbose = verbose,
+        workers = workers,
         mp_threshold = 4,
-        initializer = load_speaker,
+        initializer = _initialize_worker,
         initargs = ( cyvtl.active_speaker(), ),
+        ) )
+    return np.concatenate( formants )
+
+def _motor_to_formants_chunk(
+        tract_states,
+        n_spectrum_samples,
+        frequencies,
+        ):
+    magnitude_spectra = np.array( [
+        tract_state_to_transfer_function(
+            tract_state = tract_state,
+            n_spectrum_samples = n_spectrum_samples,
+            save_magnitude_spectrum = True,
+            save_phase_spectrum = False,
+            )[ 'magnitude_spectrum' ][ : len( frequencies ) ]
+        for tract_state in tract_states
+        ] )
+    return spectra_to_formants(
+        magnitude_spectra,
+        frequencies = frequencies,
+        refine = True,
         )
-    
+
+def _tube_acoustics_transfer_function(
+        tract_states,
+        n_spectrum_samples,
+        save_magnitude_spectrum,
+        save_phase_spectrum,
+        frequencies,
+        workers,
+        verbose,
+        dtype = None,
+        ):
+    if not isinstance( n_spectrum_samples, int ):
+        raise ValueError(
+            f"""
+            Argument n_spectrum_samples must be an integer
+            and should be a power of 2, but you passed:
+            {n_spectrum_samples}
+            """
+            )
+    args = [
+        dict(
+            tract_states = chunk,
+            fast_calculation = True,
+            save_tube_articulator = False,
+            save_incisor_position = False,
+            save_tongue_tip_side_elevation = False,
+            save_velum_opening = False,
+            )
+        for chunk in _split_frames( tract_states, workers )
+        ]
+    tube_data = list( _iter_tube_chunks( args, workers, verbose ) )
+    tube_length = np.concatenate( [ x[ 'tube_length' ] for x in tube_data ] )
+    tube_area = np.concatenate( [ x[ 'tube_area' ] for x in tube_data ] )
+
+    if frequencies is None:
+        # Only evaluate the bins that are kept by TransferFunction
+        sr = get_constants()[ 'sr_audio' ]
+        n_bins = min(
+            n_spectrum_samples,
+            round( n_spectrum_samples**2 / sr ),
+            )
+        frequencies = np.arange( n_bins ) * sr / n_spectrum_samples
+    else:
+        frequencies = np.asarray( frequencies, dtype = float )
+    h = tube_to_transfer_function(
+        tube_length = tube_length,
+        tube_area = tube_area,
+        frequencies = frequencies,
+        )
+    magnitude_spectra = np.abs( h ) if save_magnitude_spectrum else None
+    phase_spectra = np.angle( h ) if save_phase_spectrum else None
+
+    trf_data = [
+        TransferFunction(
+            tract_state = ts,
+            magnitude_spectrum = (
+                magnitude_spectra[ index ]
+                if magnitude_spectra is not None else None
+                ),
+            phase_spectrum = (
+                phase_spectra[ index ]
+                if phase_spectra is not None else None
+                ),
+            n_spectrum_samples = n_spectrum_samples,
+            frequencies = frequencies,
+            dtype = dtype,
+            )
+        for index, ts in enumerate( tract_states )
+        ]
     return trf_data
 
-def _motor_to_transfer_function( **kwargs ):
-    x = tract_state_to_transfer_function( **kwargs )
-    x[ 'tract_state' ] = kwargs[ 'tract_state' ]
-    return TransferFunction.from_dict( x )
+def _motor_to_transfer_function(
+        tract_states,
+        n_spectrum_samples,
+        save_magnitude_spectrum,
+        save_phase_spectrum,
+        frequencies = None,
+        dtype = None,
+        ):
+    if frequencies is not None:
+        n_bins = len( frequencies )
+    else:
+        # The bins that are kept by TransferFunction
+        n_bins = round(
+            n_spectrum_samples**2 / get_constants()[ 'sr_audio' ]
+            )
+    magnitude_spectra = []
+    phase_spectra = []
+    for tract_state in tract_states:
+        x = tract_state_to_transfer_function(
+            tract_state = tract_state,
+            n_spectrum_samples = n_spectrum_samples,
+            save_magnitude_spectrum = save_magnitude_spectrum,
+            save_phase_spectrum = save_phase_spectrum,
+            )
+        # Truncate before the result leaves the worker
+        if save_magnitude_spectrum:
+            magnitude_spectra.append( x[ 'magnitude_spectrum' ][ : n_bins ] )
+        if save_phase_spectrum:
+            phase_spectra.append( x[ 'phase_spectrum' ][ : n_bins ] )
+    # Converted before the result leaves the worker, too
+    return dict(
+        magnitude_spectra = (
+            np.array( magnitude_spectra, dtype = dtype )
+            if save_magnitude_spectrum else None
+            ),
+        phase_spectra = (
+            np.array( phase_spectra, dtype = dtype )
+            if save_phase_spectrum else None
+            ),
+        )
 
 def motor_to_tube(
         x: Union[
@@ -587,37 +2135,25 @@ def motor_to_tube(
 	    save_tongue_tip_side_elevation: bool = True,
 	    save_velum_opening: bool = True,
 	    fast_calculation = True,
+	    dtype: Optional[ str ] = None,
 	    workers: int = None,
         verbose: bool = True,
         ) -> np.ndarray:
-    
-    if isinstance( x, MotorSequence ):
-        ms = x.to_series()
-        sgs = ms.glottis()
-    elif isinstance( x, MotorSeries ):
-        sgs = x.glottis()
-    elif isinstance( x, SupraGlottalSequence ):
-        sgs = x.to_series()
-    elif isinstance( x, str ):
-        sgs = SupraGlottalSeries.load( x )
-    elif isinstance( x, SupraGlottalSeries ):
-        sgs = x
-    else:
-        raise TypeError(
-            f"""
-            The specified data type: '{type(x)}'
-            is not supported. Type must be one of the following:
-            - MotorSequence
-            - MotorSeries
-            - SupraGlottalSequence
-            - SupraGlottalSeries
-            - str
-            """
-            )
-    
+    """
+    Compute the tube geometry of each tract state.
+
+    Returns one TubeState object per tract state. If dtype is given,
+    e.g. 'float32', the floating point tube data is stored with this
+    type. It is converted inside the workers, before it is passed to
+    the calling process.
+    """
+
+    sgs = _to_supra_glottal_series( x )
+    tract_states = sgs.to_numpy( transpose = False )
+
     args = [
         dict(
-            tract_state = ts,
+            tract_states = chunk,
             fast_calculation = fast_calculation,
             save_tube_length = save_tube_length,
             save_tube_area = save_tube_area,
@@ -625,27 +2161,256 @@ def motor_to_tube(
             save_incisor_position = save_incisor_position,
             save_tongue_tip_side_elevation = save_tongue_tip_side_elevation,
             save_velum_opening = save_velum_opening,
+            dtype = dtype,
             )
-        for ts in sgs.to_numpy( transpose = False )
+        for chunk in _split_frames( tract_states, workers )
         ]
-    
-    tube_data = process(
+    tube_data = []
+    for chunk, x in zip(
+            args,
+            _iter_tube_chunks( args, workers, verbose ),
+            ):
+        for index, ts in enumerate( chunk[ 'tract_states' ] ):
+            y = {
+                key: value[ index ] if value is not None else None
+                for key, value in x.items()
+                }
+            y[ 'tract_state' ] = ts
+            tube_data.append( TubeState.from_dict( y ) )
+    return tube_data
+
+def _iter_tube_chunks( args, workers, verbose ):
+    return iprocess(
         _motor_to_tube,
         args = args,
-        return_data = True,
-        workers = workers,
         verbose = verbose,
+        workers = workers,
         mp_threshold = 4,
-        initializer = load_speaker,
+        initializer = _initialize_worker,
         initargs = ( cyvtl.active_speaker(), ),
+        shared_memory = True,
         )
-    
+
+def _motor_to_tube( tract_states, dtype = None, **kwargs ):
+    # Stack the tube states of a chunk of frames into arrays
+    data = [
+        tract_state_to_tube_state( tract_state = ts, **kwargs )
+        for ts in tract_states
+        ]
+    tube_data = {
+        key: (
+            np.array( [ x[ key ] for x in data ] )
+            if data[ 0 ][ key ] is not None else None
+            )
+        for key in data[ 0 ]
+        }
+    if dtype is not None:
+        # Only floating point data is converted, not the articulator ids
+        for key, value in tube_data.items():
+            if value is not None and np.issubdtype( value.dtype, np.floating ):
+                tube_data[ key ] = value.astype( dtype )
     return tube_data
 
-def _motor_to_tube( **kwargs ):
-    x = tract_state_to_tube_state( **kwargs )
-    x[ 'tract_state' ] = kwargs[ 'tract_state' ]
-    return TubeState.from_dict( x )
+def motor_to_svg(
+        x: Union[
+            MotorSequence,
+            MotorSeries,
+            SupraGlottalSequence,
+            SupraGlottalSeries,
+            str,
+            ],
+        svg_files: Optional[ Union[ Iterable[ str ], str ] ] = None,
+        skip_unchanged: bool = True,
+        return_data: bool = False,
+        workers: int = None,
+        verbose: bool = True,
+        ) -> Optional[ List[ str ] ]:
+    """
+    Render the vocal tract shape of each frame as SVG.
+
+    Parameters
+    ----------
+    x : Union[MotorSequence, MotorSeries, SupraGlottalSequence, SupraGlottalSeries, str]
+        Input data containing the supra-glottal (tract) states.
+
+    svg_files : Optional[Union[Iterable[str], str]], optional
+        Either one file path per frame, or a directory in which the frames
+        are stored as '000000.svg', '000001.svg', etc.
+        If None, no files are written. Default is None.
+
+    skip_unchanged : bool, optional
+        If True, frames that are identical to the previous frame are not
+        rendered again but reuse the previous SVG. Default is True.
+
+    return_data : bool, optional
+        Flag indicating whether to return the SVG strings.
+        Default is False.
+
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
+
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Returns
+    -------
+    Optional[List[str]]
+        If 'return_data' is True, returns one SVG string per frame.
+
+    Raises
+    ------
+    ValueError
+        If the number of SVG file paths doesn't match the number of frames.
+    """
+    sgs = _to_supra_glottal_series( x )
+    n_frames = len( sgs )
+    if svg_files is not None:
+        if isinstance( svg_files, str ):
+            svg_files = [
+                os.path.join( svg_files, f'{index:06d}.svg' )
+                for index in range( n_frames )
+                ]
+        else:
+            svg_files = list( svg_files )
+        if len( svg_files ) != n_frames:
+            raise ValueError(
+                f"""
+                The number of svg file paths: {len(svg_files)}
+                does not match the number of frames: {n_frames}.
+                """
+                )
+
+    svg_data = [] if return_data else None
+    for index, svg in enumerate(
+            motor_to_video_frames(
+                x = sgs,
+                skip_unchanged = skip_unchanged,
+                workers = workers,
+                verbose = verbose,
+                )
+            ):
+        if svg_files is not None:
+            os.makedirs(
+                os.path.dirname( os.path.abspath( svg_files[ index ] ) ),
+                exist_ok = True,
+                )
+            with open( svg_files[ index ], 'w' ) as f:
+                f.write( svg )
+        if return_data:
+            svg_data.append( svg )
+    return svg_data
+
+def motor_to_video_frames(
+        x: Union[
+            MotorSequence,
+            MotorSeries,
+            SupraGlottalSequence,
+            SupraGlottalSeries,
+            str,
+            ],
+        frame_sink: Optional[ Callable[ [ int, str ], Any ] ] = None,
+        skip_unchanged: bool = True,
+        workers: int = None,
+        verbose: bool = True,
+        ) -> Optional[ Iterable[ str ] ]:
+    """
+    Stream the vocal tract shape of each frame as an SVG string.
+
+    The frames are rendered in parallel and delivered in frame order
+    as soon as they are available, e.g. to a rasterizer or video encoder.
+
+    Parameters
+    ----------
+    x : Union[MotorSequence, MotorSeries, SupraGlottalSequence, SupraGlottalSeries, str]
+        Input data containing the supra-glottal (tract) states.
+
+    frame_sink : Callable[[int, str], Any], optional
+        If provided, frame_sink( index, svg ) is called for every frame
+        and the function returns None. Otherwise, a generator over the
+        SVG strings is returned. Default is None.
+
+    skip_unchanged : bool, optional
+        If True, frames that are identical to the previous frame are not
+        rendered again but reuse the previous SVG. Default is True.
+
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
+
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Returns
+    -------
+    Optional[Iterable[str]]
+        If frame_sink is None, a generator that yields one SVG string
+        per frame.
+    """
+    frames = _iter_video_frames(
+        sgs = _to_supra_glottal_series( x ),
+        skip_unchanged = skip_unchanged,
+        workers = workers,
+        verbose = verbose,
+        )
+    if frame_sink is None:
+        return frames
+    for index, svg in enumerate( frames ):
+        frame_sink( index, svg )
+    return
+
+def _iter_video_frames(
+        sgs,
+        skip_unchanged,
+        workers,
+        verbose,
+        ):
+    tract_states = sgs.to_numpy( transpose = False )
+    if skip_unchanged and len( tract_states ) > 0:
+        changed = np.ones( len( tract_states ), dtype = bool )
+        changed[ 1: ] = np.any( tract_states[ 1: ] != tract_states[ :-1 ], axis = 1 )
+        starts = np.flatnonzero( changed )
+        repeats = np.diff( np.append( starts, len( tract_states ) ) )
+    else:
+        starts = np.arange( len( tract_states ) )
+        repeats = np.ones( len( tract_states ), dtype = int )
+
+    args = [
+        dict(
+            tract_state = tract_states[ index ],
+            )
+        for index in starts
+        ]
+    svg_data = iprocess(
+        _tract_state_to_svg_str,
+        args = args,
+        verbose = verbose,
+        workers = workers,
+        mp_threshold = 4,
+        initializer = _initialize_worker,
+        initargs = ( cyvtl.active_speaker(), ),
+        )
+    for svg, n in zip( svg_data, repeats ):
+        for _ in range( n ):
+            yield svg
+    return
+
+def _tract_state_to_svg_str( tract_state ):
+    # The API can only export to files, so a temporary file is used
+    fd, svg_path = tempfile.mkstemp( suffix = '.svg' )
+    os.close( fd )
+    try:
+        tract_state_to_svg(
+            tract_state = tract_state,
+            svg_path = svg_path,
+            )
+        with open( svg_path, 'r' ) as f:
+            svg = f.read()
+    finally:
+        os.remove( svg_path )
+    return svg
 
 def phoneme_to_audio(
         x: List[ str ],
@@ -657,6 +2422,9 @@ def phoneme_to_audio(
         normalize_audio = -1,
         sr = None,
         return_data = False,
+        dtype: Optional[ str ] = None,
+        normalization: str = 'file',
+        cache: Optional[ Union[ StageCache, str ] ] = None,
         workers: int = None,
         verbose: bool = True,
         ):
@@ -665,6 +2433,7 @@ def phoneme_to_audio(
         x = x,
         gesture_files = gesture_files,
         motor_files = motor_files,
+        cache = cache,
         workers = workers,
         verbose = verbose,
         )
@@ -699,18 +2468,147 @@ def phoneme_to_audio(
         normalize_audio = normalize_audio,
         sr = sr,
         return_data = return_data,
+        dtype = dtype,
+        normalization = normalization,
         workers = workers,
         verbose = verbose,
         )
     
     return audio_data
 
+def iphoneme_to_audio(
+        x: Union[ Iterable[ str ], str ],
+        gesture_files: Union[ Iterable[ str ], str ],
+        motor_files: Union[ Iterable[ str ], str ],
+        f0_files: Optional[ Union[ Iterable[ str ], str ] ] = None,
+        motor_f0_files: Optional[ Union[ Iterable[ str ], str ] ] = None,
+        audio_files: Optional[ Union[ Iterable[ str ], str ] ] = None,
+        normalize_audio: int = -1,
+        sr: int = None,
+        ordered: bool = False,
+        async_write: bool = True,
+        dtype: Optional[ str ] = None,
+        cache: Optional[ Union[ StageCache, str ] ] = None,
+        workers: int = None,
+        verbose: bool = True,
+        ) -> Iterator[ Tuple[ int, np.ndarray ] ]:
+    """
+    Iterator version of phoneme_to_audio, yields ( index, audio ) pairs
+    as the items complete.
+
+    Unlike phoneme_to_audio, which runs each stage for all items before
+    the next stage starts, each worker runs all stages of one item, so
+    the first audio is available after a single item was processed.
+    See imotor_to_audio for the arguments and StageCache for the cache.
+    The cache is bounded again when the iterator is exhausted or closed.
+    """
+    cache = as_stage_cache( cache )
+    if cache is not None:
+        # Entries are only evicted between runs, not while workers use them
+        cache.evict()
+    args = (
+        dict(
+            phoneme_file = pf,
+            gesture_file = gf,
+            motor_file = mf,
+            f0_file = ff,
+            motor_f0_file = mff,
+            audio_file_path = af,
+            normalize_audio = normalize_audio,
+            sr = sr,
+            dtype = dtype,
+            cache = cache,
+            )
+        for pf, gf, mf, ff, mff, af in _zip_inputs(
+            ( 'phoneme file paths', x ),
+            ( 'gesture file paths', gesture_files ),
+            ( 'motor file paths', motor_files ),
+            ( 'f0 file paths', f0_files ),
+            ( 'motor f0 file paths', motor_f0_files ),
+            ( 'audio file paths', audio_files ),
+            )
+        )
+    results = _isynthesize_audio(
+        _phoneme_to_audio,
+        args = args,
+        sr = sr,
+        write_files = audio_files is not None,
+        return_data = True,
+        async_write = async_write,
+        ordered = ordered,
+        workers = workers,
+        verbose = verbose,
+        cost = _schedule_cost( x, _phoneme_cost ),
+        )
+    if cache is not None:
+        results = _evict_after( results, cache )
+    return results
+
+def _evict_after(
+        results: Iterator[ Any ],
+        cache: StageCache,
+        ) -> Iterator[ Any ]:
+    # Closing this generator closes the results first, which stops the
+    # workers, so the entries are evicted after they are no longer used
+    try:
+        yield from results
+    finally:
+        cache.evict()
+
+def _phoneme_to_audio(
+        phoneme_file,
+        gesture_file,
+        motor_file,
+        f0_file,
+        motor_f0_file,
+        audio_file_path,
+        normalize_audio,
+        sr,
+        dtype = None,
+        cache = None,
+        ):
+    _phoneme_file_to_gesture_file(
+        phoneme_file = phoneme_file,
+        gesture_file = gesture_file,
+        verbose_api = False,
+        cache = cache,
+        )
+    _gesture_file_to_motor_file(
+        gesture_file = gesture_file,
+        motor_file = motor_file,
+        cache = cache,
+        )
+    motor_data = motor_file
+    if f0_file is not None:
+        motor_data = _augment_motor_f0(
+            motor_file = motor_file,
+            f0_file = f0_file,
+            out_file = motor_f0_file,
+            target_sr = 441,
+            )
+    return _motor_to_audio(
+        motor_data = motor_data,
+        audio_file_path = audio_file_path,
+        normalize_audio = normalize_audio,
+        sr = sr,
+        dtype = dtype,
+        )
+
 def phoneme_to_gesture(
         x: List[ str ],
         gesture_files: List[ str ],
+        cache: Optional[ Union[ StageCache, str ] ] = None,
         workers: int = None,
         verbose: bool = True,
         ) -> np.ndarray:
+    """
+    Convert phoneme files into gesture files.
+
+    If cache is given, a StageCache or a cache directory, gesture files
+    of unchanged phoneme files are copied from the cache instead of
+    being computed again, see StageCache.
+    """
+    cache = as_stage_cache( cache )
     phoneme_files = make_iterable( x )
     # TODO: implement phn sequence to phn file
     gesture_files = make_iterable( gesture_files )
@@ -727,6 +2625,7 @@ def phoneme_to_gesture(
             phoneme_file = pf,
             gesture_file = gf,
             verbose_api = False,
+            cache = cache,
             )
         for pf, gf in zip(
             phoneme_files,
@@ -734,28 +2633,52 @@ def phoneme_to_gesture(
             )
         ]
     process(
-        phoneme_file_to_gesture_file,
+        _phoneme_file_to_gesture_file,
         args = args,
         return_data = False,
         workers = workers,
         verbose = verbose,
         mp_threshold = 4,
-        initializer = load_speaker,
+        initializer = _initialize_worker,
         initargs = ( cyvtl.active_speaker(), ),
         )
+    if cache is not None:
+        cache.evict()
+    return
+
+def _phoneme_file_to_gesture_file(
+        phoneme_file,
+        gesture_file,
+        verbose_api = False,
+        cache = None,
+        ):
+    if cache is not None:
+        key = cache.key( 'phoneme_to_gesture', phoneme_file )
+        if cache.get( key, gesture_file ):
+            return
+    phoneme_file_to_gesture_file(
+        phoneme_file = phoneme_file,
+        gesture_file = gesture_file,
+        verbose_api = verbose_api,
+        )
+    if cache is not None:
+        cache.put( key, gesture_file )
     return
 
 def phoneme_to_motor(
         x: List[ str ],
         gesture_files: List[ str ],
         motor_files: List[ str ],
+        cache: Optional[ Union[ StageCache, str ] ] = None,
         workers: int = None,
         verbose: bool = True,
         ):
+    cache = as_stage_cache( cache )
     
     phoneme_to_gesture(
         x = x,
         gesture_files = gesture_files,
+        cache = cache,
         workers = workers,
         verbose = verbose,
         )
@@ -763,6 +2686,7 @@ def phoneme_to_motor(
     gesture_to_motor(
         gesture_files = gesture_files,
         motor_files = motor_files,
+        cache = cache,
         workers = workers,
         verbose = verbose,
         )
@@ -0,0 +1,251 @@
+
+
+
+import os
+import json
+import numpy as np
+import torch
+
+from typing import Any, Dict, Optional
+from numpy.typing import ArrayLike
+
+from .audioprocessing import convert_audio_dtype
+
+
+
+AUDIO_CORPUS_FORMAT_VERSION = 1
+
+class AudioCorpus():
+    """
+    Many audio signals concatenated in one memory-mapped file.
+
+    Writing and reading millions of small audio files is slow. An audio
+    corpus appends all signals to a single file of raw samples and keeps
+    an index of the offset and length of each item, together with
+    metadata such as the source file and the speaker. Items are read in
+    O(1) as views of the memory-mapped file, e.g. by training loaders.
+
+    Appends are process-safe, so worker processes can append to the same
+    corpus in parallel, see core.motor_to_corpus. The corpus is a
+    directory with the following files:
+
+    - header.json: dtype, sampling rate and format version
+    - audio.bin: the raw samples of all items
+    - index.bin: offset and length in samples of each item as int64
+    - metadata.jsonl: one JSON object per item
+
+    Parameters
+    ----------
+    path : str
+        Directory of the corpus. It is created if it does not exist.
+
+    dtype : str, optional
+        Sample type of a new corpus, 'int16' or 'float32'. For an
+        existing corpus, the dtype is read from the header. Default is
+        'int16'.
+
+    sr : int, optional
+        Sampling rate of a new corpus, stored in the header. Default is
+        None.
+
+    Examples
+    --------
+    >>> corpus = AudioCorpus( 'corpus', dtype = 'int16', sr = 44100 )
+    >>> corpus.append( audio, motor_file = 'x.tsq' )
+    >>> x = AudioCorpus( 'corpus' )[ 0 ]
+    """
+    def __init__(
+            self,
+            path: str,
+            dtype: str = 'int16',
+            sr: Optional[ int ] = None,
+            ):
+        self.path = path
+        header_path = os.path.join( path, 'header.json' )
+        if not os.path.exists( header_path ):
+            if np.dtype( dtype ) not in [ np.int16, np.float32 ]:
+                raise ValueError(
+                    f"""
+                    The specified corpus dtype: '{dtype}'
+                    is not supported. Dtype must be one of the following:
+                    - int16
+                    - float32
+                    """
+                    )
+            os.makedirs( path, exist_ok = True )
+            with self._lock():
+                # Another process may have created the corpus meanwhile
+                if not os.path.exists( header_path ):
+                    for name in [ 'audio.bin', 'index.bin', 'metadata.jsonl' ]:
+                        open( os.path.join( path, name ), 'ab' ).close()
+                    with open( header_path, 'w' ) as f:
+                        json.dump(
+                            dict(
+                                dtype = np.dtype( dtype ).name,
+                                sr = sr,
+                                format_version = AUDIO_CORPUS_FORMAT_VERSION,
+                                ),
+                            f,
+                            )
+        with open( header_path ) as f:
+            header = json.load( f )
+        self.dtype = np.dtype( header[ 'dtype' ] )
+        self.sr = header[ 'sr' ]
+        self._audio = None
+        self._index = None
+        self._metadata = []
+        return
+
+    def _file( self, name: str ) -> str:
+        return os.path.join( self.path, name )
+
+    def _lock( self ):
+        return _FileLock( os.path.join( self.path, '.lock' ) )
+
+    def append(
+            self,
+            x: ArrayLike,
+            **metadata: Any,
+            ) -> int:
+        """
+        Append a mono signal and return the index of the new item.
+
+        Float audio in the range [-1, 1] is converted into the dtype of
+        the corpus, see audioprocessing.convert_audio_dtype. The metadata
+        must be JSON serializable.
+        """
+        x = np.asarray( x )
+        if x.dtype != self.dtype:
+            x = convert_audio_dtype(
+                torch.as_tensor( x.astype( float, copy = False ) ),
+                dtype = self.dtype,
+                ).numpy()
+        x = np.ascontiguousarray( x ).reshape( -1 )
+        metadata_line = json.dumps( metadata ) + '\n'
+        with self._lock():
+            with open( self._file( 'audio.bin' ), 'ab' ) as f:
+                offset = f.seek( 0, os.SEEK_END ) // self.dtype.itemsize
+                f.write( x.tobytes() )
+            with open( self._file( 'index.bin' ), 'ab' ) as f:
+                index = f.seek( 0, os.SEEK_END ) // 16
+                f.write( np.array( [ offset, len( x ) ], dtype = np.int64 ).tobytes() )
+            with open( self._file( 'metadata.jsonl' ), 'a' ) as f:
+                f.write( metadata_line )
+        return index
+
+    def __len__( self ) -> int:
+        return os.path.getsize( self._file( 'index.bin' ) ) // 16
+
+    @property
+    def offsets( self ) -> np.ndarray:
+        return self._get_index()[ :, 0 ]
+
+    @property
+    def lengths( self ) -> np.ndarray:
+        return self._get_index()[ :, 1 ]
+
+    def _get_index( self ) -> np.ndarray:
+        # Items appended since the last call are mapped on demand
+        n_items = len( self )
+        if self._index is None or len( self._index ) != n_items:
+            if n_items == 0:
+                self._index = np.zeros( ( 0, 2 ), dtype = np.int64 )
+            else:
+                self._index = np.memmap(
+                    self._file( 'index.bin' ),
+                    dtype = np.int64,
+                    mode = 'r',
+                    shape = ( n_items, 2 ),
+                    )
+        return self._index
+
+    def _get_audio( self, end: int ) -> np.ndarray:
+        if self._audio is None or len( self._audio ) < end:
+            n_samples = os.path.getsize( self._file( 'audio.bin' ) ) // self.dtype.itemsize
+            self._audio = np.memmap(
+                self._file( 'audio.bin' ),
+                dtype = self.dtype,
+                mode = 'r',
+                shape = ( n_samples, ),
+                )
+        return self._audio
+
+    def __getitem__( self, index: int ) -> np.ndarray:
+        """
+        Return the samples of an item as a read-only view of the file.
+        """
+        # The index file is only checked again for items that were
+        # appended after the index was mapped
+        item_index = self._index
+        if item_index is None or index < 0 or index >= len( item_index ):
+            item_index = self._get_index()
+        if index < 0:
+            index += len( item_index )
+        if not 0 <= index < len( item_index ):
+            raise IndexError( f'Item index out of range: {index}' )
+        offset, length = item_index[ index ]
+        if length == 0:
+            return np.zeros( 0, dtype = self.dtype )
+        return self._get_audio( offset + length )[ offset : offset + length ]
+
+    def __iter__( self ):
+        for index in range( len( self ) ):
+            yield self[ index ]
+
+    def metadata( self, index: int ) -> Dict[ str, Any ]:
+        """
+        Return the metadata of an item.
+        """
+        if index < 0:
+            index += len( self )
+        if index >= len( self._metadata ):
+            with open( self._file( 'metadata.jsonl' ) ) as f:
+                self._metadata = [ json.loads( line ) for line in f ]
+        return self._metadata[ index ]
+
+class _FileLock():
+    # Exclusive lock that works across processes, with fcntl on POSIX
+    # and msvcrt on Windows. The modules are imported here, so that
+    # importing the package does not depend on the platform
+    def __init__( self, path: str ):
+        self.path = path
+        self._file = None
+        return
+
+    def __enter__( self ):
+        self._file = open( self.path, 'a+' )
+        try:
+            import fcntl
+        except ImportError:
+            _msvcrt_lock( self._file )
+        else:
+            fcntl.flock( self._file, fcntl.LOCK_EX )
+        return self
+
+    def __exit__( self, exc_type, exc_value, traceback ):
+        try:
+            import fcntl
+        except ImportError:
+            _msvcrt_unlock( self._file )
+        else:
+            fcntl.flock( self._file, fcntl.LOCK_UN )
+        self._file.close()
+        self._file = None
+        return False
+
+def _msvcrt_lock( f ):
+    import msvcrt
+    # LK_LOCK gives up after 10 attempts, so retry until the lock is free
+    f.seek( 0 )
+    while True:
+        try:
+            msvcrt.locking( f.fileno(), msvcrt.LK_LOCK, 1 )
+            return
+        except OSError:
+            continue
+
+def _msvcrt_unlock( f ):
+    import msvcrt
+    f.seek( 0 )
+    msvcrt.locking( f.fileno(), msvcrt.LK_UNLCK, 1 )
+    return
@@ -0,0 +1,264 @@
+
+
+
+import os
+import functools
+import numpy as np
+import torch
+import torchaudio.functional as F
+
+from typing import Callable, Dict, Iterable, Optional
+from numpy.typing import ArrayLike
+
+from .audioprocessing import MAX_WAV_VALUE
+from .audioprocessing import audio_to_f0
+from .audioprocessing import power_to_db
+
+
+
+class MelSpectrogram():
+    """
+    Mel spectrogram of shape (frames, n_mels), in dB if log is True.
+
+    The filterbank and the window are computed once per process and
+    reused for all signals with the same parameters.
+    """
+    def __init__(
+            self,
+            n_fft: int = 1024,
+            hop_length: int = 256,
+            n_mels: int = 80,
+            f_min: float = 0.0,
+            f_max: Optional[ float ] = None,
+            log: bool = True,
+            name: str = 'mel',
+            ):
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.f_min = f_min
+        self.f_max = f_max
+        self.log = log
+        self.name = name
+        return
+
+    def __call__( self, x: np.ndarray, sr: int ) -> Dict[ str, np.ndarray ]:
+        filterbank = _mel_filterbank(
+            sr = sr,
+            n_fft = self.n_fft,
+            n_mels = self.n_mels,
+            f_min = self.f_min,
+            f_max = sr / 2 if self.f_max is None else self.f_max,
+            )
+        mel = _power_spectrogram( x, self.n_fft, self.hop_length ) @ filterbank
+        if self.log:
+            mel = power_to_db( mel )
+        return { self.name: mel.astype( np.float32 ) }
+
+class LogSpectrogram():
+    """
+    Power spectrogram in dB of shape (frames, n_fft // 2 + 1).
+    """
+    def __init__(
+            self,
+            n_fft: int = 1024,
+            hop_length: int = 256,
+            name: str = 'log_spectrogram',
+            ):
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.name = name
+        return
+
+    def __call__( self, x: np.ndarray, sr: int ) -> Dict[ str, np.ndarray ]:
+        spectrogram = _power_spectrogram( x, self.n_fft, self.hop_length )
+        return { self.name: power_to_db( spectrogram ).astype( np.float32 ) }
+
+class RMSEnergy():
+    """
+    Root mean square of each frame, frames are centered like those of
+    the spectrograms with the same hop length.
+    """
+    def __init__(
+            self,
+            frame_length: int = 1024,
+            hop_length: int = 256,
+            name: str = 'rms',
+            ):
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.name = name
+        return
+
+    def __call__( self, x: np.ndarray, sr: int ) -> Dict[ str, np.ndarray ]:
+        x = np.pad( x, self.frame_length // 2 )
+        n_frames = 1 + ( len( x ) - self.frame_length ) // self.hop_length
+        frames = (
+            np.arange( n_frames )[ :, np.newaxis ] * self.hop_length
+            + np.arange( self.frame_length )
+            )
+        rms = np.sqrt( np.mean( x[ frames ]**2, axis = 1 ) )
+        return { self.name: rms.astype( np.float32 ) }
+
+class DurationStatistics():
+    """
+    Duration of the signal and of the parts above a silence threshold.
+
+    Returns the duration in seconds, the number of samples, the leading
+    and trailing silence in seconds, the active (non-silent) duration
+    and the peak and RMS amplitude. The threshold is relative to the
+    peak of the signal in dB.
+    """
+    def __init__(
+            self,
+            threshold: float = -40.0,
+            ):
+        self.threshold = threshold
+        return
+
+    def __call__( self, x: np.ndarray, sr: int ) -> Dict[ str, np.ndarray ]:
+        peak = np.max( np.abs( x ) ) if len( x ) > 0 else 0.0
+        active = np.flatnonzero( np.abs( x ) > peak * 10**( self.threshold * 0.05 ) )
+        if len( active ) > 0:
+            start, stop = active[ 0 ], active[ -1 ] + 1
+        else:
+            start, stop = len( x ), len( x )
+        return dict(
+            duration = np.array( len( x ) / sr ),
+            n_samples = np.array( len( x ) ),
+            leading_silence = np.array( start / sr ),
+            trailing_silence = np.array( ( len( x ) - stop ) / sr ),
+            active_duration = np.array( max( 0, stop - start ) / sr ),
+            peak_amplitude = np.array( peak ),
+            rms_amplitude = np.array( np.sqrt( np.mean( x**2 ) ) if len( x ) > 0 else 0.0 ),
+            )
+
+class Pitch():
+    """
+    F0 of the signal, see audioprocessing.audio_to_f0. Requires the
+    library 'parselmouth'.
+    """
+    def __init__(
+            self,
+            upper_f0_limit: int = 400,
+            lower_f0_limit: int = 50,
+            name: str = 'f0',
+            ):
+        self.upper_f0_limit = upper_f0_limit
+        self.lower_f0_limit = lower_f0_limit
+        self.name = name
+        return
+
+    def __call__( self, x: np.ndarray, sr: int ) -> Dict[ str, np.ndarray ]:
+        _, f0_feature = audio_to_f0(
+            x,
+            sr_in = sr,
+            upper_f0_limit = self.upper_f0_limit,
+            lower_f0_limit = self.lower_f0_limit,
+            )
+        return { self.name: f0_feature }
+
+def extract_features(
+        x: ArrayLike,
+        sr: int,
+        extractors: Iterable[ Callable[ [ np.ndarray, int ], Dict[ str, np.ndarray ] ] ],
+        ) -> Dict[ str, np.ndarray ]:
+    """
+    Apply feature extractors to a mono signal.
+
+    Parameters
+    ----------
+    x : ArrayLike
+        The signal as float in the range [-1, 1] or as int16.
+
+    sr : int
+        Sampling rate of the signal.
+
+    extractors : Iterable[Callable]
+        Called as extractor( x, sr ) with x as a 1-d float array, each
+        returns a dict of named features, e.g. MelSpectrogram or RMSEnergy.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The features of all extractors.
+    """
+    x = np.asarray( x )
+    if x.dtype == np.int16:
+        x = x / ( MAX_WAV_VALUE - 1 )
+    x = x.astype( float, copy = False ).reshape( -1 )
+    features = {}
+    for extractor in extractors:
+        for name, value in extractor( x, sr ).items():
+            if name in features:
+                raise ValueError(
+                    f"""
+                    The feature name: '{name}' is returned by more than
+                    one extractor. Use the argument 'name' of the
+                    extractors to make the names unique.
+                    """
+                    )
+            features[ name ] = value
+    return features
+
+def save_features(
+        file_path: str,
+        features: Dict[ str, np.ndarray ],
+        sr: int,
+        ) -> None:
+    """
+    Save features and the sampling rate of the audio to an npz file.
+    """
+    directory = os.path.dirname( file_path )
+    if directory and not os.path.exists( directory ):
+        os.makedirs(
+            directory,
+            exist_ok = True,
+            )
+    with open( file_path, 'wb' ) as f:
+        np.savez( f, sr = np.array( sr ), **features )
+    return
+
+def feature_file_path( audio_file: str ) -> str:
+    """
+    Default feature file of an audio file, e.g. 'x.wav' -> 'x.features.npz'.
+    """
+    return f'{os.path.splitext( audio_file )[ 0 ]}.features.npz'
+
+def _power_spectrogram(
+        x: np.ndarray,
+        n_fft: int,
+        hop_length: int,
+        ) -> np.ndarray:
+    spectrum = torch.stft(
+        torch.from_numpy( x ),
+        n_fft = n_fft,
+        hop_length = hop_length,
+        window = _window( n_fft ),
+        center = True,
+        pad_mode = 'constant',
+        return_complex = True,
+        )
+    return ( spectrum.abs()**2 ).T.numpy()
+
+@functools.lru_cache( maxsize = None )
+def _window( n_fft: int ) -> torch.Tensor:
+    return torch.hann_window( n_fft, dtype = torch.float64 )
+
+@functools.lru_cache( maxsize = None )
+def _mel_filterbank(
+        sr: int,
+        n_fft: int,
+        n_mels: int,
+        f_min: float,
+        f_max: float,
+        ) -> np.ndarray:
+    return F.melscale_fbanks(
+        n_freqs = n_fft // 2 + 1,
+        f_min = f_min,
+        f_max = f_max,
+        n_mels = n_mels,
+        sample_rate = sr,
+        norm = 'slaney',
+        mel_scale = 'slaney',
+        ).numpy().astype( float )
@@ -11,8 +11,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.signal import find_peaks
 
+from typing import List, Optional, Sequence, Tuple, Union
+from numpy.typing import ArrayLike
+
 from vocaltractlab.utils import multiple_formatter
 from vocaltractlab.audioprocessing import amplitude_to_db
+from vocaltractlab.storage import load_columns
+from vocaltractlab.storage import save_columns
 
 
 
@@ -23,6 +28,9 @@ class TransferFunction():
             magnitude_spectrum: np.ndarray,
             phase_spectrum: np.ndarray,
             n_spectrum_samples: int,
+            frequencies: Optional[ np.ndarray ] = None,
+            refine_formants: bool = False,
+            dtype: Optional[ str ] = None,
             #name: str = 'transfer_function'
             ):
         if not isinstance( n_spectrum_samples, int ):
@@ -36,8 +44,14 @@ class TransferFunction():
         self.constants = get_constants()
         self.tract_state = tract_state
         self.delta_frequency = self.constants[ 'sr_audio' ] / n_spectrum_samples
-        max_bin = round( n_spectrum_samples / self.delta_frequency )
         self.n_spectrum_samples = n_spectrum_samples
+        if frequencies is None:
+            max_bin = round( n_spectrum_samples / self.delta_frequency )
+            frequencies = np.arange( max_bin ) * self.delta_frequency
+        else:
+            # The spectra were evaluated on a custom frequency grid
+            frequencies = np.asarray( frequencies )
+            max_bin = len( frequencies )
         if isinstance( magnitude_spectrum, np.ndarray ):
             self.magnitude_spectrum = magnitude_spectrum[ : max_bin ]
         else:
@@ -46,12 +60,23 @@ class TransferFunction():
             self.phase_spectrum = phase_spectrum[ : max_bin ]
         else:
             self.phase_spectrum = None
+        self.frequencies = frequencies[ : max_bin ]
         self.data = dict(
             frequency = self.magnitude_spectrum,
             phase = self.phase_spectrum,
             )
-        self.formants = self.get_formants()
+        self.formants = self.get_formants( refine = refine_formants )
         self.f1, self.f2, self.f3, self.f4 = self.formants
+        if dtype is not None:
+            # Storage type of the spectra, the formants are computed first
+            if self.magnitude_spectrum is not None:
+                self.magnitude_spectrum = self.magnitude_spectrum.astype( dtype, copy = False )
+            if self.phase_spectrum is not None:
+                self.phase_spectrum = self.phase_spectrum.astype( dtype, copy = False )
+            self.data = dict(
+                frequency = self.magnitude_spectrum,
+                phase = self.phase_spectrum,
+                )
         return
     
     @classmethod
@@ -64,22 +89,33 @@ class TransferFunction():
             magnitude_spectrum = x[ 'magnitude_spectrum' ],
             phase_spectrum = x[ 'phase_spectrum' ],
             n_spectrum_samples = x[ 'n_spectrum_samples' ],
+            frequencies = x.get( 'frequencies' ),
+            refine_formants = x.get( 'refine_formants', False ),
+            dtype = x.get( 'dtype' ),
             )
 
     def get_formants(
             self,
             peak_distance = 1,
+            refine = False,
             # = 44100,
             ):
-        sr = self.constants[ 'sr_audio' ]
         peaks, _ = find_peaks(
             self.magnitude_spectrum,
             distance = peak_distance,
             )
-        peaks = [
-            peak * sr/self.n_spectrum_samples
-            for peak in peaks
-            ]
+        if refine:
+            # Sub-bin precision, see refine_peak_frequencies
+            peaks = list( refine_peak_frequencies(
+                self.magnitude_spectrum,
+                peaks,
+                self.frequencies,
+                ) )
+        else:
+            peaks = [
+                self.frequencies[ peak ]
+                for peak in peaks
+                ]
         while peaks[ 0 ] < 100:
             del peaks[ 0 ]
         if len( peaks ) < 4:
@@ -127,7 +163,7 @@ class TransferFunction():
                 axs[ index ].set( ylim = [ -3.76, 3.76 ] )
             else:
                 raise ValueError( 'parameters must be frequency and/or phase! Passed values are: {}'.format( parameters ) )
-            x = np.arange( 0, self.n_spectrum_samples, self.delta_frequency )
+            x = self.frequencies
             for _slice in continuities:
                 axs[ index ].plot( x[ _slice ], y[ _slice ], **plot_kwargs[ index ] )
             axs[ index ].set( ylabel = y_title )
@@ -139,4 +175,414 @@ class TransferFunction():
         for ax in axs:
             ax.label_outer()
         finalize_plot( figure, axs, **kwargs )
-        return axs
\ No newline at end of file
+        return axs
+
+
+
+class TransferFunctionSeries():
+    """
+    Transfer functions of consecutive frames, stored as one array per field.
+
+    All frames share one frequency grid. Like TubeSeries, the series can
+    be saved to a columnar npz file and parts of a file, i.e. selected
+    fields and time ranges, can be loaded without reading the whole file.
+
+    Attributes
+    ----------
+    tract_state : np.ndarray
+        Tract states of shape (n_frames, n_tract_params).
+
+    magnitude_spectrum : np.ndarray
+        Magnitude spectra of shape (n_frames, n_bins).
+
+    phase_spectrum : np.ndarray
+        Phase spectra of shape (n_frames, n_bins).
+
+    formants : np.ndarray
+        Formants in Hz of shape (n_frames, 4), missing formants are NaN.
+
+    frequencies : np.ndarray
+        Frequencies in Hz of the bins, of shape (n_bins,).
+
+    n_spectrum_samples : int
+        Number of spectrum samples the spectra were computed with.
+
+    sr : float
+        Frame rate in Hz.
+
+    Fields that were not computed or not loaded are None.
+    """
+    fields = [
+        'tract_state',
+        'magnitude_spectrum',
+        'phase_spectrum',
+        'formants',
+        ]
+
+    def __init__(
+            self,
+            frequencies: np.ndarray,
+            n_spectrum_samples: int,
+            tract_state: Optional[ np.ndarray ] = None,
+            magnitude_spectrum: Optional[ np.ndarray ] = None,
+            phase_spectrum: Optional[ np.ndarray ] = None,
+            formants: Optional[ np.ndarray ] = None,
+            sr: float = 441,
+            ):
+        self.frequencies = np.asarray( frequencies )
+        self.n_spectrum_samples = int( n_spectrum_samples )
+        self.tract_state = tract_state
+        self.magnitude_spectrum = magnitude_spectrum
+        self.phase_spectrum = phase_spectrum
+        self.formants = formants
+        self.sr = sr
+        n_frames = {
+            len( x ) for x in self.columns().values() if x is not None
+            }
+        if len( n_frames ) > 1:
+            raise ValueError(
+                f"""
+                All fields must have the same number of frames, but the
+                fields have the following numbers of frames: {n_frames}
+                """
+                )
+        return
+
+    @classmethod
+    def from_transfer_functions(
+            cls,
+            transfer_functions: Sequence[ TransferFunction ],
+            sr: float = 441,
+            ):
+        """
+        Stack a list of TransferFunction objects, e.g. from
+        motor_to_transfer_function. The objects must share one
+        frequency grid.
+        """
+        if len( transfer_functions ) == 0:
+            raise ValueError(
+                'At least one transfer function is required.'
+                )
+        frequencies = transfer_functions[ 0 ].frequencies
+        for tf in transfer_functions:
+            if tf.frequencies is not frequencies and not np.array_equal(
+                    tf.frequencies,
+                    frequencies,
+                    ):
+                raise ValueError(
+                    'All transfer functions must share one frequency grid.'
+                    )
+        columns = dict(
+            tract_state = [ tf.tract_state for tf in transfer_functions ],
+            magnitude_spectrum = [ tf.magnitude_spectrum for tf in transfer_functions ],
+            phase_spectrum = [ tf.phase_spectrum for tf in transfer_functions ],
+            )
+        columns = {
+            field: (
+                np.array( values )
+                if all( x is not None for x in values ) else None
+                )
+            for field, values in columns.items()
+            }
+        formants = np.array( [
+            [ np.nan if f is None else f for f in tf.formants ]
+            for tf in transfer_functions
+            ], dtype = float )
+        return cls(
+            frequencies = frequencies,
+            n_spectrum_samples = transfer_functions[ 0 ].n_spectrum_samples,
+            formants = formants,
+            sr = sr,
+            **columns,
+            )
+
+    def columns( self ):
+        return { field: getattr( self, field ) for field in self.fields }
+
+    def __len__( self ):
+        for x in self.columns().values():
+            if x is not None:
+                return len( x )
+        return 0
+
+    def __getitem__(
+            self,
+            index: Union[ int, slice ],
+            ) -> Union[ TransferFunction, 'TransferFunctionSeries' ]:
+        if isinstance( index, slice ):
+            return TransferFunctionSeries(
+                frequencies = self.frequencies,
+                n_spectrum_samples = self.n_spectrum_samples,
+                sr = self.sr,
+                **{
+                    field: x[ index ] if x is not None else None
+                    for field, x in self.columns().items()
+                    },
+                )
+        if self.magnitude_spectrum is None:
+            raise ValueError(
+                f"""
+                A TransferFunction can only be created if the magnitude
+                spectrum is available, but it was not computed or not
+                loaded.
+                """
+                )
+        return TransferFunction(
+            tract_state = (
+                self.tract_state[ index ]
+                if self.tract_state is not None else None
+                ),
+            magnitude_spectrum = self.magnitude_spectrum[ index ],
+            phase_spectrum = (
+                self.phase_spectrum[ index ]
+                if self.phase_spectrum is not None else None
+                ),
+            n_spectrum_samples = self.n_spectrum_samples,
+            frequencies = self.frequencies,
+            )
+
+    def __iter__( self ):
+        for index in range( len( self ) ):
+            yield self[ index ]
+
+    def to_transfer_functions( self ) -> List[ TransferFunction ]:
+        return list( self )
+
+    def save(
+            self,
+            file_path: str,
+            compress: bool = False,
+            ) -> None:
+        """
+        Save the series to a columnar npz file, see storage.save_columns.
+        """
+        save_columns(
+            file_path = file_path,
+            columns = self.columns(),
+            attributes = dict(
+                frequencies = self.frequencies,
+                n_spectrum_samples = self.n_spectrum_samples,
+                sr = self.sr,
+                ),
+            compress = compress,
+            )
+        return
+
+    @classmethod
+    def load(
+            cls,
+            file_path: str,
+            fields: Optional[ Sequence[ str ] ] = None,
+            time_range: Optional[ Tuple[ float, float ] ] = None,
+            ):
+        """
+        Load a series that was saved with save, see TubeSeries.load.
+        """
+        columns, attributes = load_columns(
+            file_path,
+            fields = fields,
+            time_range = time_range,
+            )
+        sr = float( attributes[ 'sr' ] )
+        return cls(
+            frequencies = attributes[ 'frequencies' ],
+            n_spectrum_samples = int( attributes[ 'n_spectrum_samples' ] ),
+            sr = sr,
+            **columns,
+            )
+
+
+
+def _find_peaks( x: np.ndarray ) -> np.ndarray:
+    # Vectorized scipy.signal.find_peaks without conditions, returns a
+    # mask of the peaks of each row. A peak rises from the left and,
+    # after a possibly flat top, falls to the right. Flat peaks are
+    # placed at their middle bin like find_peaks does.
+    is_peak = np.zeros( x.shape, dtype = bool )
+    if x.shape[ 1 ] < 3:
+        return is_peak
+    d = np.sign( np.diff( x, axis = 1 ) )
+    # Index of the next non-zero difference at or after each position,
+    # len( d ) if there is none
+    positions = np.broadcast_to( np.arange( d.shape[ 1 ] ), d.shape )
+    next_change = np.where( d != 0, positions, d.shape[ 1 ] )
+    next_change = np.minimum.accumulate( next_change[ :, : : -1 ], axis = 1 )[ :, : : -1 ]
+    # Flat tops start at bins that rise from the left and end at the
+    # bin before the next change, which must be a fall
+    rows, starts = np.nonzero( d[ :, : -1 ] > 0 )
+    starts += 1
+    ends = next_change[ rows, starts ]
+    falls = ends < d.shape[ 1 ]
+    rows, starts, ends = rows[ falls ], starts[ falls ], ends[ falls ]
+    falls = d[ rows, ends ] < 0
+    rows, starts, ends = rows[ falls ], starts[ falls ], ends[ falls ]
+    is_peak[ rows, ( starts + ends ) // 2 ] = True
+    return is_peak
+
+def spectra_to_formants(
+        magnitude_spectra: ArrayLike,
+        n_spectrum_samples: Optional[ int ] = None,
+        n_formants: int = 4,
+        min_frequency: float = 100,
+        sr: Optional[ int ] = None,
+        frequencies: Optional[ ArrayLike ] = None,
+        refine: bool = False,
+        ) -> np.ndarray:
+    """
+    Extract formant trajectories from a matrix of magnitude spectra.
+
+    The formants are the first local maxima of each spectrum above
+    min_frequency, i.e. the same peaks that TransferFunction.get_formants
+    reports for a single spectrum. Like scipy.signal.find_peaks, a flat
+    peak is reported at its middle bin and shelves are not peaks. The
+    peak picking is vectorized over all frames, so no Python objects
+    are created per frame.
+
+    Parameters
+    ----------
+    magnitude_spectra : ArrayLike
+        Magnitude spectra of shape (n_frames, n_bins) or (n_bins,).
+        Bin k is expected at frequency k * sr / n_spectrum_samples.
+
+    n_spectrum_samples : int, optional
+        Number of spectrum samples the spectra were computed with.
+        Must be provided if frequencies is None.
+
+    n_formants : int, optional
+        Number of formants to extract per frame. Default is 4.
+
+    min_frequency : float, optional
+        Peaks below this frequency (in Hz) are ignored. Default is 100.
+
+    sr : int, optional
+        Audio sampling rate. If None, the sampling rate of the
+        VocalTractLab API is used.
+
+    frequencies : ArrayLike, optional
+        Frequencies in Hz of the spectrum bins, for spectra that were
+        evaluated on a custom frequency grid. Overrides n_spectrum_samples
+        and sr. Default is None.
+
+    refine : bool, optional
+        If True, the formants are refined to sub-bin precision by fitting
+        a parabola to the log magnitude of each peak and its neighbours.
+        This allows much smaller spectra for the same precision, see
+        refine_peak_frequencies. Default is False.
+
+    Returns
+    -------
+    np.ndarray
+        Formant frequencies in Hz of shape (n_frames, n_formants).
+        Frames with fewer than n_formants peaks are padded with NaN.
+    """
+    x = np.asarray( magnitude_spectra )
+    if x.ndim == 1:
+        x = x.reshape( 1, -1 )
+    elif x.ndim != 2:
+        raise ValueError(
+            f"""
+            Argument magnitude_spectra must be of shape
+            (n_frames, n_bins) or (n_bins,), but has shape:
+            {x.shape}
+            """
+            )
+    if frequencies is not None:
+        frequencies = np.asarray( frequencies )
+        if frequencies.shape != ( x.shape[ 1 ], ):
+            raise ValueError(
+                f"""
+                The number of frequencies: {frequencies.shape}
+                does not match the number of bins: {x.shape[ 1 ]}.
+                """
+                )
+    elif n_spectrum_samples is None:
+        raise ValueError(
+            "Must provide n_spectrum_samples if frequencies is None."
+            )
+    else:
+        if sr is None:
+            sr = get_constants()[ 'sr_audio' ]
+        frequencies = np.arange( x.shape[ 1 ] ) * sr / n_spectrum_samples
+
+    is_peak = _find_peaks( x )
+    is_peak &= frequencies >= min_frequency
+
+    # Rank the peaks of each frame and keep the first n_formants
+    rank = np.cumsum( is_peak, axis = 1, dtype = np.int32 ) - 1
+    rows, cols = np.nonzero( is_peak & ( rank < n_formants ) )
+    formants = np.full( ( x.shape[ 0 ], n_formants ), np.nan )
+    if refine:
+        formants[ rows, rank[ rows, cols ] ] = refine_peak_frequencies(
+            x,
+            cols,
+            frequencies,
+            rows = rows,
+            )
+    else:
+        formants[ rows, rank[ rows, cols ] ] = frequencies[ cols ]
+    return formants
+
+def refine_peak_frequencies(
+        magnitude_spectra: np.ndarray,
+        peaks: np.ndarray,
+        frequencies: np.ndarray,
+        rows: Optional[ np.ndarray ] = None,
+        ) -> np.ndarray:
+    """
+    Estimate the frequencies of spectral peaks with sub-bin precision.
+
+    A parabola is fitted through the log magnitude of each peak bin and
+    its two neighbours, the vertex of the parabola is the refined peak.
+    For resonances, the log magnitude is close to a parabola near the
+    peak, so the error is a small fraction of the bin spacing.
+
+    Parameters
+    ----------
+    magnitude_spectra : np.ndarray
+        A magnitude spectrum of shape (n_bins,) or spectra of shape
+        (n_spectra, n_bins).
+
+    peaks : np.ndarray
+        Bin index of each peak, of shape (n_peaks,). Must not be the
+        first or last bin.
+
+    frequencies : np.ndarray
+        Frequencies in Hz of the bins, of shape (n_bins,). The grid may
+        be non-uniform.
+
+    rows : np.ndarray, optional
+        Index of the spectrum of each peak, of shape (n_peaks,). Only
+        the peak bins and their neighbours are read, so the spectra are
+        not copied per peak. If None, all peaks belong to a single
+        spectrum of shape (n_bins,), or each peak has its own row of
+        spectra of shape (n_peaks, n_bins). Default is None.
+
+    Returns
+    -------
+    np.ndarray
+        The refined peak frequencies in Hz, of shape (n_peaks,).
+    """
+    peaks = np.asarray( peaks, dtype = int )
+    if magnitude_spectra.ndim == 1:
+        magnitude_spectra = magnitude_spectra[ np.newaxis ]
+        rows = np.zeros( len( peaks ), dtype = int )
+    elif rows is None:
+        rows = np.arange( len( peaks ) )
+    # The fit is done in double precision, also for float32 spectra
+    left, center, right = (
+        amplitude_to_db( magnitude_spectra[ rows, peaks + offset ].astype( float ) )
+        for offset in ( -1, 0, 1 )
+        )
+    curvature = left - 2 * center + right
+    # Flat or numerically degenerate peaks are not refined
+    safe = np.where( curvature < 0, curvature, -1.0 )
+    delta = np.where(
+        curvature < 0,
+        np.clip( 0.5 * ( left - right ) / safe, -0.5, 0.5 ),
+        0.0,
+        )
+    return frequencies[ peaks ] + np.where(
+        delta < 0,
+        delta * ( frequencies[ peaks ] - frequencies[ peaks - 1 ] ),
+        delta * ( frequencies[ peaks + 1 ] - frequencies[ peaks ] ),
+        )
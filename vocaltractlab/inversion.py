@@ -0,0 +1,498 @@
+
+
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from vocaltractlab_cython import get_param_info
+from target_approximation.vocaltractlab import SupraGlottalSeries
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+from numpy.typing import ArrayLike
+
+from .core import limit
+from .core import motor_to_transfer_function
+from .core import motor_to_tube
+from .frequency_domain import spectra_to_formants
+from .shapes import ShapeLibrary
+
+
+
+JACOBIAN_OUTPUTS = [ 'formants', 'magnitude_spectrum', 'tube_area' ]
+
+class Codebook():
+    """
+    Precomputed tract states with their formants and tube geometries.
+
+    The codebook maps acoustics back to articulation: the formants of
+    all tract states are indexed with a KD-tree, so that the tract
+    states whose formants are closest to a query can be retrieved in
+    microseconds, e.g. as initial candidates of an acoustic-to-
+    articulatory inversion. Codebooks are expensive to compute, but can
+    be saved and reused across runs.
+
+    Distances are measured between the logarithms of the formants, so
+    that a deviation of a given percentage weighs the same for all
+    formants.
+
+    Attributes
+    ----------
+    tract_states : np.ndarray
+        Tract states of shape (n_states, n_tract_params).
+
+    formants : np.ndarray
+        Formants in Hz of shape (n_states, 4), NaN if missing.
+
+    tube_length : np.ndarray
+        Tube section lengths in cm of shape (n_states, n_sections).
+
+    tube_area : np.ndarray
+        Tube section areas in cm^2 of shape (n_states, n_sections).
+
+    Examples
+    --------
+    >>> codebook = Codebook.from_param_ranges( n_states = 100000 )
+    >>> codebook.save( 'codebook.npz' )
+    >>> codebook = Codebook.load( 'codebook.npz' )
+    >>> tract_states = codebook.invert( [ 700, 1200, 2600 ], k = 10 )
+    """
+    def __init__(
+            self,
+            tract_states: ArrayLike,
+            formants: ArrayLike,
+            tube_length: ArrayLike,
+            tube_area: ArrayLike,
+            ):
+        self.tract_states = np.asarray( tract_states, dtype = np.float32 )
+        self.formants = np.asarray( formants, dtype = np.float32 )
+        self.tube_length = np.asarray( tube_length, dtype = np.float32 )
+        self.tube_area = np.asarray( tube_area, dtype = np.float32 )
+        n_states = len( self.tract_states )
+        for name in [ 'formants', 'tube_length', 'tube_area' ]:
+            if len( getattr( self, name ) ) != n_states:
+                raise ValueError(
+                    f"""
+                    The number of {name}: {len( getattr( self, name ) )}
+                    does not match the number of tract states: {n_states}.
+                    """
+                    )
+        # KD-trees and the codebook rows they index, per number of formants
+        self._trees: Dict[ int, Tuple[ cKDTree, np.ndarray ] ] = {}
+        return
+
+    def __len__( self ):
+        return len( self.tract_states )
+
+    @classmethod
+    def from_tract_states(
+            cls,
+            tract_states: ArrayLike,
+            engine: str = 'vtl',
+            workers: Optional[ int ] = None,
+            verbose: bool = True,
+            ):
+        """
+        Compute the codebook entries of the given tract states.
+
+        The tract states are limited to the valid range of the speaker
+        first. See motor_to_transfer_function for the engine argument.
+        """
+        sgs = limit(
+            SupraGlottalSeries( np.asarray( tract_states, dtype = float ) ),
+            workers = workers,
+            verbose = verbose,
+            )
+        formants = motor_to_transfer_function(
+            sgs,
+            formants_only = True,
+            engine = engine,
+            workers = workers,
+            verbose = verbose,
+            )
+        # The codebook stores float32, so the workers convert already
+        tube_states = motor_to_tube(
+            sgs,
+            save_tube_articulator = False,
+            save_incisor_position = False,
+            save_tongue_tip_side_elevation = False,
+            save_velum_opening = False,
+            dtype = 'float32',
+            workers = workers,
+            verbose = verbose,
+            )
+        return cls(
+            tract_states = sgs.to_numpy( transpose = False ),
+            formants = formants,
+            tube_length = np.array( [ ts.tube_length for ts in tube_states ] ),
+            tube_area = np.array( [ ts.tube_area for ts in tube_states ] ),
+            )
+
+    @classmethod
+    def from_param_ranges(
+            cls,
+            n_states: int,
+            seed: Optional[ int ] = None,
+            **kwargs,
+            ):
+        """
+        Sample tract states uniformly from the parameter ranges of the speaker.
+
+        Keyword arguments are passed to from_tract_states.
+        """
+        param_info = get_param_info( 'tract' )
+        low = np.array( [ p[ 'min' ] for p in param_info ] )
+        high = np.array( [ p[ 'max' ] for p in param_info ] )
+        rng = np.random.default_rng( seed )
+        tract_states = rng.uniform( low, high, size = ( n_states, len( low ) ) )
+        return cls.from_tract_states( tract_states, **kwargs )
+
+    @classmethod
+    def from_shapes(
+            cls,
+            n_states_per_shape: int,
+            scale: float = 0.1,
+            shapes: Optional[ ShapeLibrary ] = None,
+            seed: Optional[ int ] = None,
+            **kwargs,
+            ):
+        """
+        Sample tract states around the tract shapes of the speaker.
+
+        Each shape is included once, followed by n_states_per_shape - 1
+        perturbed copies. The perturbations are normally distributed
+        with a standard deviation of scale times the range of each
+        parameter. Keyword arguments are passed to from_tract_states.
+        """
+        if shapes is None:
+            shapes = ShapeLibrary.from_speaker()
+        param_info = get_param_info( 'tract' )
+        low = np.array( [ p[ 'min' ] for p in param_info ] )
+        high = np.array( [ p[ 'max' ] for p in param_info ] )
+        rng = np.random.default_rng( seed )
+        tract_states = np.repeat( shapes.tract_shapes, n_states_per_shape, axis = 0 )
+        noise = rng.normal( 0.0, scale, size = tract_states.shape ) * ( high - low )
+        noise[ : : n_states_per_shape ] = 0.0
+        tract_states = np.clip( tract_states + noise, low, high )
+        return cls.from_tract_states( tract_states, **kwargs )
+
+    def query(
+            self,
+            formants: ArrayLike,
+            k: int = 1,
+            n_formants: int = 3,
+            ) -> Tuple[ np.ndarray, np.ndarray ]:
+        """
+        Find the codebook entries with the closest formants.
+
+        Parameters
+        ----------
+        formants : ArrayLike
+            Formants in Hz of shape (n_queries, >= n_formants) or
+            (>= n_formants,). Only the first n_formants are used.
+
+        k : int, optional
+            Number of neighbours per query. Default is 1.
+
+        n_formants : int, optional
+            Number of formants to compare. Entries that lack one of
+            these formants are not considered. Default is 3.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Distances in log frequency and codebook indices, each of
+            shape (n_queries, k), or (k,) for a single query.
+        """
+        formants = np.asarray( formants, dtype = float )
+        single = formants.ndim == 1
+        formants = np.atleast_2d( formants )[ :, : n_formants ]
+        if formants.shape[ 1 ] != n_formants:
+            raise ValueError(
+                f"""
+                The queries have {formants.shape[ 1 ]} formants,
+                but n_formants is {n_formants}.
+                """
+                )
+        tree, rows = self._get_tree( n_formants )
+        distances, indices = tree.query( np.log( formants ), k = k )
+        indices = rows[ np.asarray( indices ).reshape( len( formants ), k ) ]
+        distances = np.asarray( distances ).reshape( len( formants ), k )
+        if single:
+            return distances[ 0 ], indices[ 0 ]
+        return distances, indices
+
+    def invert(
+            self,
+            formants: ArrayLike,
+            k: int = 1,
+            n_formants: int = 3,
+            ) -> np.ndarray:
+        """
+        Return the tract states of the k closest codebook entries.
+
+        See query for the arguments. The result has the shape
+        (n_queries, k, n_tract_params), or (k, n_tract_params) for a
+        single query.
+        """
+        _, indices = self.query( formants, k = k, n_formants = n_formants )
+        return self.tract_states[ indices ]
+
+    def save(
+            self,
+            file_path: str,
+            ) -> None:
+        """
+        Save the codebook as a compressed .npz file.
+        """
+        np.savez_compressed(
+            file_path,
+            tract_states = self.tract_states,
+            formants = self.formants,
+            tube_length = self.tube_length,
+            tube_area = self.tube_area,
+            )
+        return
+
+    @classmethod
+    def load(
+            cls,
+            file_path: str,
+            ):
+        """
+        Load a codebook that was saved with save.
+        """
+        with np.load( file_path ) as x:
+            return cls(
+                tract_states = x[ 'tract_states' ],
+                formants = x[ 'formants' ],
+                tube_length = x[ 'tube_length' ],
+                tube_area = x[ 'tube_area' ],
+                )
+
+    def _get_tree( self, n_formants ):
+        if n_formants not in self._trees:
+            if not 1 <= n_formants <= self.formants.shape[ 1 ]:
+                raise ValueError(
+                    f"""
+                    Argument n_formants must be between 1 and
+                    {self.formants.shape[ 1 ]}, but is {n_formants}.
+                    """
+                    )
+            features = self.formants[ :, : n_formants ]
+            rows = np.flatnonzero( np.all( np.isfinite( features ), axis = 1 ) )
+            if len( rows ) == 0:
+                raise ValueError(
+                    f'No codebook entry has {n_formants} formants.'
+                    )
+            self._trees[ n_formants ] = (
+                cKDTree( np.log( features[ rows ].astype( float ) ) ),
+                rows,
+                )
+        return self._trees[ n_formants ]
+
+def tract_jacobian(
+        tract_states: ArrayLike,
+        outputs: Sequence[ str ] = ( 'formants', ),
+        step: float = 0.01,
+        cache: Optional[ Dict ] = None,
+        return_values: bool = False,
+        engine: str = 'vtl',
+        n_spectrum_samples: Optional[ int ] = None,
+        max_frequency: Optional[ float ] = None,
+        workers: Optional[ int ] = None,
+        verbose: bool = True,
+        ) -> Union[ Dict[ str, np.ndarray ], Tuple[ Dict[ str, np.ndarray ], Dict[ str, np.ndarray ] ] ]:
+    """
+    Compute the derivatives of acoustic and geometric outputs with
+    respect to the tract parameters by finite differences.
+
+    The base states and all perturbed states are evaluated in a single
+    batch, which is spread across the worker processes. Central
+    differences are used, except where a step would leave the parameter
+    range of the speaker (see get_param_info), there a one-sided
+    difference with the base state is used instead.
+
+    Parameters
+    ----------
+    tract_states : ArrayLike
+        Tract states of shape (n_states, n_tract_params) or (n_tract_params,).
+
+    outputs : Sequence[str], optional
+        Outputs to differentiate, any of 'formants' (in Hz, refined to
+        sub-bin precision), 'magnitude_spectrum' and 'tube_area'.
+        Default is ( 'formants', ).
+
+    step : float, optional
+        Step size relative to the range of each parameter. Default is 0.01.
+
+    cache : Dict, optional
+        Evaluated states are stored in and looked up from this dict, so
+        that states that are evaluated repeatedly, e.g. in the iterations
+        of an optimizer, are only computed once. Only reuse a cache for
+        calls with the same engine and spectrum settings. Default is None.
+
+    return_values : bool, optional
+        If True, the outputs of the base states are returned as well.
+        Default is False.
+
+    engine : str, optional
+        Transfer function engine, see motor_to_transfer_function.
+        Default is 'vtl'.
+
+    n_spectrum_samples : int, optional
+        Number of spectrum samples, see motor_to_transfer_function.
+
+    max_frequency : float, optional
+        Band limit of the spectra in Hz, see motor_to_transfer_function.
+
+    workers : int, optional
+        Number of worker processes for parallel processing.
+        If None, uses the system's default number of CPU cores.
+
+    verbose : bool, optional
+        Verbosity mode. If True, displays progress information.
+        Default is True.
+
+    Returns
+    -------
+    Union[Dict[str, np.ndarray], Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]]
+        The Jacobian of each output, of shape (n_states, n_values,
+        n_tract_params), or (n_values, n_tract_params) for a single
+        state. If return_values is True, also the outputs of the base
+        states, of shape (n_states, n_values) or (n_values,).
+    """
+    outputs = list( outputs )
+    for output in outputs:
+        if output not in JACOBIAN_OUTPUTS:
+            raise ValueError(
+                f"""
+                The specified output: '{output}'
+                is not supported. Outputs must be any of:
+                {JACOBIAN_OUTPUTS}
+                """
+                )
+    states = np.asarray( tract_states, dtype = float )
+    single = states.ndim == 1
+    states = np.atleast_2d( states )
+    param_info = get_param_info( 'tract' )
+    low = np.array( [ p[ 'min' ] for p in param_info ] )
+    high = np.array( [ p[ 'max' ] for p in param_info ] )
+    if states.shape[ 1 ] != len( low ):
+        raise ValueError(
+            f"""
+            The tract states have {states.shape[ 1 ]} parameters,
+            but the speaker has {len( low )} tract parameters.
+            """
+            )
+    n_states, n_params = states.shape
+
+    # Perturbed states of shape (n_states, n_params, n_params), where
+    # parameter j of state i is perturbed in entry [ i, j ]
+    h = step * ( high - low )
+    perturbation = np.eye( n_params ) * h
+    plus = states[ :, np.newaxis, : ] + perturbation
+    minus = states[ :, np.newaxis, : ] - perturbation
+    # Steps that leave the parameter range are replaced by the base state
+    plus_valid = states + h <= high
+    minus_valid = states - h >= low
+    plus = np.where( plus_valid[ :, :, np.newaxis ], plus, states[ :, np.newaxis, : ] )
+    minus = np.where( minus_valid[ :, :, np.newaxis ], minus, states[ :, np.newaxis, : ] )
+    distance = h * ( plus_valid.astype( float ) + minus_valid.astype( float ) )
+    distance[ distance == 0 ] = np.nan
+
+    values = _evaluate_tract_states(
+        np.concatenate( [
+            states,
+            plus.reshape( -1, n_params ),
+            minus.reshape( -1, n_params ),
+            ] ),
+        outputs = outputs,
+        cache = {} if cache is None else cache,
+        engine = engine,
+        n_spectrum_samples = n_spectrum_samples,
+        max_frequency = max_frequency,
+        workers = workers,
+        verbose = verbose,
+        )
+
+    jacobians = {}
+    base_values = {}
+    n_perturbed = n_states * n_params
+    for output in outputs:
+        x = values[ output ]
+        y_plus = x[ n_states : n_states + n_perturbed ].reshape( n_states, n_params, -1 )
+        y_minus = x[ n_states + n_perturbed : ].reshape( n_states, n_params, -1 )
+        jacobian = ( y_plus - y_minus ) / distance[ :, :, np.newaxis ]
+        jacobians[ output ] = np.swapaxes( jacobian, 1, 2 )
+        base_values[ output ] = x[ : n_states ]
+        if single:
+            jacobians[ output ] = jacobians[ output ][ 0 ]
+            base_values[ output ] = base_values[ output ][ 0 ]
+    if return_values:
+        return jacobians, base_values
+    return jacobians
+
+def _evaluate_tract_states(
+        states,
+        outputs,
+        cache,
+        engine,
+        n_spectrum_samples,
+        max_frequency,
+        workers,
+        verbose,
+        ):
+    # Evaluate each distinct state that is not cached yet, in one batch
+    keys = [ state.tobytes() for state in states ]
+    missing = {}
+    for key, state in zip( keys, states ):
+        if any( ( output, key ) not in cache for output in outputs ) and key not in missing:
+            missing[ key ] = state
+    if missing:
+        sgs = SupraGlottalSeries( np.array( list( missing.values() ) ) )
+        results = {}
+        if 'magnitude_spectrum' in outputs:
+            tfs = motor_to_transfer_function(
+                sgs,
+                n_spectrum_samples = n_spectrum_samples,
+                save_phase_spectrum = False,
+                engine = engine,
+                max_frequency = max_frequency,
+                workers = workers,
+                verbose = verbose,
+                )
+            results[ 'magnitude_spectrum' ] = np.array( [ tf.magnitude_spectrum for tf in tfs ] )
+            if 'formants' in outputs:
+                results[ 'formants' ] = spectra_to_formants(
+                    results[ 'magnitude_spectrum' ],
+                    frequencies = tfs[ 0 ].frequencies,
+                    refine = True,
+                    )
+        elif 'formants' in outputs:
+            results[ 'formants' ] = motor_to_transfer_function(
+                sgs,
+                n_spectrum_samples = n_spectrum_samples,
+                engine = engine,
+                max_frequency = max_frequency,
+                formants_only = True,
+                workers = workers,
+                verbose = verbose,
+                )
+        if 'tube_area' in outputs:
+            tube_states = motor_to_tube(
+                sgs,
+                save_tube_articulator = False,
+                save_incisor_position = False,
+                save_tongue_tip_side_elevation = False,
+                save_velum_opening = False,
+                workers = workers,
+                verbose = verbose,
+                )
+            results[ 'tube_area' ] = np.array( [ ts.tube_area for ts in tube_states ] )
+        for index, key in enumerate( missing ):
+            for output in outputs:
+                cache[ ( output, key ) ] = results[ output ][ index ]
+    return {
+        output: np.array( [ cache[ ( output, key ) ] for key in keys ] )
+        for output in outputs
+        }
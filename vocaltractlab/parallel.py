@@ -0,0 +1,423 @@
+
+
+
+import os
+import errno
+import itertools
+import multiprocessing
+import queue
+import shutil
+import tempfile
+import uuid
+import numpy as np
+import tqdm
+from collections import deque
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+
+# Smaller arrays are cheaper to pickle than to map from a file
+SHARED_ARRAY_MIN_NBYTES = 2**16
+
+# /dev/shm is only used for shared arrays if it has this much free
+# space, containers often mount a /dev/shm of only 64 MiB
+SHARED_MEMORY_MIN_FREE_BYTES = 2**30
+
+# Directory of the shared arrays, None chooses /dev/shm or the default
+# temporary directory, see shared_memory_dir
+SHARED_MEMORY_DIR = None
+
+# Start method of the worker pools, None is the platform default
+START_METHOD = None
+
+# Imported once by the fork server, new workers fork from it with the
+# modules and the default speaker already loaded
+FORKSERVER_PRELOAD = [ 'vocaltractlab' ]
+
+def set_start_method( method: Optional[ str ] ) -> None:
+    """
+    Set the start method of the worker pools of iprocess.
+
+    'fork' starts workers as copies of the calling process, which is
+    fast but unsafe if the calling process runs threads, e.g. the
+    background writers of AudioWriter. 'spawn' starts each worker in a
+    fresh interpreter, which has to import torch and the other modules
+    and load the speaker again. 'forkserver' starts a server process
+    that imports the modules in FORKSERVER_PRELOAD once. New workers
+    fork from this server, so they start within milliseconds and share
+    the memory of the modules and the speaker data copy-on-write.
+    None restores the platform default.
+    """
+    global START_METHOD
+    if method is not None and method not in multiprocessing.get_all_start_methods():
+        raise ValueError(
+            f"""
+            The specified start method: '{method}'
+            is not supported on this platform. Start method must be
+            one of the following:
+            {multiprocessing.get_all_start_methods()}
+            """
+            )
+    START_METHOD = method
+    return
+
+def get_context( method: Optional[ str ] = None ):
+    """
+    Return the multiprocessing context of the worker pools.
+    """
+    if method is None:
+        method = START_METHOD
+    context = multiprocessing.get_context( method )
+    if context.get_start_method() == 'forkserver':
+        # Only takes effect if the server is not running yet
+        context.set_forkserver_preload( FORKSERVER_PRELOAD )
+    return context
+
+class SharedArray():
+    """
+    Lightweight, picklable handle of an array in a memory-mapped file.
+
+    Worker processes store large results with SharedArray.from_array and
+    only send the handle to the parent process, which maps the file with
+    load() instead of unpickling a copy of the data. The file is created
+    in /dev/shm if available, so the data never touches the disk.
+    """
+    def __init__(
+            self,
+            path: str,
+            shape: Tuple[ int, ... ],
+            dtype: str,
+            ):
+        self.path = path
+        self.shape = shape
+        self.dtype = dtype
+        return
+
+    @classmethod
+    def from_array(
+            cls,
+            x: np.ndarray,
+            directory: Optional[ str ] = None,
+            ):
+        if directory is None:
+            directory = shared_memory_dir()
+        # The file is written, not mapped, so that a full file system
+        # raises ENOSPC instead of killing the process with SIGBUS
+        try:
+            path = _save_array( x, directory )
+        except OSError as e:
+            fallback = _fallback_directory( directory )
+            if e.errno != errno.ENOSPC or fallback == directory:
+                raise
+            os.makedirs( fallback, exist_ok = True )
+            path = _save_array( x, fallback )
+        return cls( path = path, shape = x.shape, dtype = x.dtype.str )
+
+    def load( self ) -> np.ndarray:
+        """
+        Map the array into memory and remove the file.
+
+        The mapping stays valid after the file is removed and the memory
+        is released once the array is garbage collected. The array is
+        copy-on-write, so it can be modified without affecting the file.
+        """
+        x = np.load( self.path, mmap_mode = 'c' )
+        os.remove( self.path )
+        return x
+
+def shared_memory_dir(
+        min_free_bytes: Optional[ int ] = None,
+        ) -> str:
+    """
+    Return the directory of shared arrays.
+
+    Returns SHARED_MEMORY_DIR if it is set. Otherwise /dev/shm if it is
+    writable and has at least min_free_bytes of free space, else the
+    default temporary directory. If min_free_bytes is None,
+    SHARED_MEMORY_MIN_FREE_BYTES is used.
+    """
+    if SHARED_MEMORY_DIR is not None:
+        return SHARED_MEMORY_DIR
+    if min_free_bytes is None:
+        min_free_bytes = SHARED_MEMORY_MIN_FREE_BYTES
+    if os.path.isdir( '/dev/shm' ) and os.access( '/dev/shm', os.W_OK ):
+        try:
+            free_bytes = shutil.disk_usage( '/dev/shm' ).free
+        except OSError:
+            free_bytes = 0
+        if free_bytes >= min_free_bytes:
+            return '/dev/shm'
+    return tempfile.gettempdir()
+
+def _save_array( x: np.ndarray, directory: str ) -> str:
+    path = os.path.join( directory, f'{uuid.uuid4().hex}.npy' )
+    try:
+        with open( path, 'wb' ) as f:
+            np.lib.format.write_array( f, x, allow_pickle = False )
+    except BaseException:
+        if os.path.exists( path ):
+            os.remove( path )
+        raise
+    return path
+
+def _fallback_directory( directory: str ) -> str:
+    # Directory on the disk for arrays that do not fit into the shared
+    # memory, with the same name, so that it is removed together with it
+    return os.path.join( tempfile.gettempdir(), os.path.basename( directory ) )
+
+def share_arrays(
+        x: Any,
+        directory: Optional[ str ] = None,
+        min_nbytes: int = SHARED_ARRAY_MIN_NBYTES,
+        ) -> Any:
+    """
+    Replace large arrays in (nested) lists, tuples and dicts by SharedArray handles.
+    """
+    if isinstance( x, np.ndarray ):
+        if x.nbytes >= min_nbytes and x.dtype != object:
+            return SharedArray.from_array( x, directory = directory )
+        return x
+    elif isinstance( x, dict ):
+        return { k: share_arrays( v, directory, min_nbytes ) for k, v in x.items() }
+    elif isinstance( x, ( list, tuple ) ):
+        return type( x )( share_arrays( v, directory, min_nbytes ) for v in x )
+    return x
+
+def load_shared_arrays( x: Any ) -> Any:
+    """
+    Inverse of share_arrays, maps all SharedArray handles into memory.
+    """
+    if isinstance( x, SharedArray ):
+        return x.load()
+    elif isinstance( x, dict ):
+        return { k: load_shared_arrays( v ) for k, v in x.items() }
+    elif isinstance( x, ( list, tuple ) ):
+        return type( x )( load_shared_arrays( v ) for v in x )
+    return x
+
+def _call( args ):
+    function, kwargs, directory, return_data = args
+    x = function( **kwargs )
+    if not return_data:
+        return None
+    if directory is not None:
+        return share_arrays( x, directory = directory )
+    return x
+
+def iprocess(
+        function: Callable,
+        args: Iterable[ Dict[ str, Any ] ],
+        verbose: bool = True,
+        workers: Optional[ int ] = None,
+        mp_threshold: int = 4,
+        initializer: Optional[ Callable ] = None,
+        initargs: Tuple = (),
+        shared_memory: bool = False,
+        return_data: bool = True,
+        max_in_flight: Optional[ int ] = None,
+        ordered: bool = True,
+        return_index: bool = False,
+        cost: Optional[ Callable[ [ Dict[ str, Any ] ], float ] ] = None,
+        start_method: Optional[ str ] = None,
+        shared_directory: Optional[ str ] = None,
+        ) -> Iterator[ Any ]:
+    """
+    Lazily apply a function to keyword arguments in worker processes.
+
+    Works like tools_mp.process with return_data=True, but yields the
+    results as soon as they are available, so that the caller can
+    consume them while the workers are still busy. The results are
+    yielded in input order, or in the order in which the workers
+    complete them if ordered is False.
+
+    The arguments can be a lazy iterable, e.g. a generator that loads
+    the inputs from disk. At most max_in_flight items are submitted to
+    the workers at once and the next item is only taken from args when
+    the caller consumed a result, so memory usage stays bounded no
+    matter how many items are processed.
+
+    Parameters
+    ----------
+    function : Callable
+        Function that is called as function( **kwargs ) for each item.
+
+    args : Iterable[Dict[str, Any]]
+        Keyword arguments for each call.
+
+    verbose : bool, optional
+        If True, displays progress information. Default is True.
+
+    workers : int, optional
+        Number of worker processes. If None, uses the number of CPU cores.
+
+    mp_threshold : int, optional
+        If fewer items are passed, they are processed in the calling
+        process. Default is 4.
+
+    initializer : Callable, optional
+        Called as initializer( *initargs ) in each worker process on start.
+
+    initargs : Tuple, optional
+        Arguments for the initializer.
+
+    shared_memory : bool, optional
+        If True, large NumPy arrays in the results are passed from the
+        workers to the calling process via memory-mapped files instead
+        of being pickled, see SharedArray. The files are stored in
+        /dev/shm if it has enough free space, else on the disk, see
+        shared_memory_dir. Default is False.
+
+    return_data : bool, optional
+        If False, the results are discarded in the workers and None is
+        yielded for each item. Default is True.
+
+    max_in_flight : int, optional
+        Maximum number of items that are submitted to the workers but
+        not yet consumed by the caller. If None, uses four times the
+        number of workers.
+
+    ordered : bool, optional
+        If True, results are yielded in input order. Results that complete
+        early are held in a reorder buffer, which is bounded by
+        max_in_flight. If False, results are yielded as they complete.
+        Default is True.
+
+    return_index : bool, optional
+        If True, yields ( index, result ) pairs, where index is the
+        position of the item in args. Default is False.
+
+    cost : Callable, optional
+        Estimates the processing time of an item from its keyword
+        arguments. If given, the items are submitted longest first, so
+        that long items do not determine the total time by starting
+        last. Idle workers take the next item from the queue one at a
+        time. If ordered is False, all args are read up front and
+        sorted. If ordered is True, consecutive blocks of max_in_flight
+        items are sorted, so that the reorder buffer stays bounded
+        even if the first item is the shortest. The max_in_flight
+        window applies in both cases. Default is None.
+
+    start_method : str, optional
+        'fork', 'spawn' or 'forkserver'. If None, uses the start method
+        that was set with set_start_method. Default is None.
+
+    shared_directory : str, optional
+        Directory of the shared memory files. If None, uses
+        shared_memory_dir(). Arrays that do not fit into the directory
+        are written to the default temporary directory. Default is None.
+
+    Yields
+    ------
+    Any
+        The result of each call, or ( index, result ) pairs.
+    """
+    total = len( args ) if hasattr( args, '__len__' ) else None
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if max_in_flight is None:
+        max_in_flight = 4 * workers
+    args = enumerate( args )
+    if cost is not None:
+        if ordered:
+            args = _longest_first_blocks( args, cost, max_in_flight )
+        else:
+            args = sorted( args, key = lambda x: cost( x[ 1 ] ), reverse = True )
+            total = len( args )
+    args = iter( args )
+    head = list( itertools.islice( args, mp_threshold ) )
+    if len( head ) < mp_threshold:
+        if ordered:
+            head = sorted( head, key = lambda x: x[ 0 ] )
+        for index, kwargs in tqdm.tqdm( head, disable = not verbose ):
+            x = function( **kwargs )
+            if not return_data:
+                x = None
+            yield ( index, x ) if return_index else x
+        return
+    args = itertools.chain( head, args )
+
+    pool = get_context( start_method ).Pool(
+        workers,
+        initializer = initializer,
+        initargs = initargs,
+        )
+    # Results that were not loaded yet, e.g. if the caller stops
+    # iterating early, are removed together with the directory
+    directory = None
+    if shared_memory and return_data:
+        directory = tempfile.mkdtemp(
+            prefix = 'vocaltractlab_',
+            dir = shared_directory or shared_memory_dir(),
+            )
+    # The workers put finished results into the queue, completed
+    # results that are not yielded yet are held in the buffer
+    completed = queue.Queue()
+    buffer = {}
+    n_yielded = 0
+    progress = tqdm.tqdm( total = total, disable = not verbose )
+    def _submit( index, kwargs ):
+        pool.apply_async(
+            _call,
+            ( ( function, kwargs, directory, return_data ), ),
+            callback = lambda x: completed.put( ( index, x, None ) ),
+            error_callback = lambda e: completed.put( ( index, None, e ) ),
+            )
+    def _receive():
+        index, x, error = completed.get()
+        if error is not None:
+            raise error
+        buffer[ index ] = x
+    def _next_result():
+        nonlocal n_yielded
+        if ordered:
+            while n_yielded not in buffer:
+                _receive()
+            index = n_yielded
+        else:
+            if not buffer:
+                _receive()
+            index = next( iter( buffer ) )
+        x = buffer.pop( index )
+        n_yielded += 1
+        progress.update()
+        if directory is not None:
+            x = load_shared_arrays( x )
+        return ( index, x ) if return_index else x
+    try:
+        n_submitted = 0
+        for index, kwargs in args:
+            if n_submitted - n_yielded >= max_in_flight:
+                yield _next_result()
+            _submit( index, kwargs )
+            n_submitted += 1
+        while n_yielded < n_submitted:
+            yield _next_result()
+    except BaseException:
+        # Reached on errors and if the caller stops iterating early
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        progress.close()
+        pool.join()
+        if directory is not None:
+            shutil.rmtree( directory, ignore_errors = True )
+            shutil.rmtree( _fallback_directory( directory ), ignore_errors = True )
+    return
+
+def _longest_first_blocks(
+        args: Iterator[ Tuple[ int, Dict[ str, Any ] ] ],
+        cost: Callable[ [ Dict[ str, Any ] ], float ],
+        block_size: int,
+        ) -> Iterator[ Tuple[ int, Dict[ str, Any ] ] ]:
+    # Sort consecutive blocks of ( index, kwargs ) pairs by decreasing
+    # cost. The items of a block are submitted before the next block is
+    # read, so the item that is yielded next in input order has always
+    # been submitted once max_in_flight items are pending
+    while True:
+        block = list( itertools.islice( args, block_size ) )
+        if not block:
+            return
+        yield from sorted( block, key = lambda x: cost( x[ 1 ] ), reverse = True )
@@ -0,0 +1,128 @@
+
+
+
+import numpy as np
+
+from typing import List, Optional, Tuple
+from numpy.typing import ArrayLike
+
+
+
+def plan_segments(
+        n_frames: int,
+        segment_frames: int,
+        warmup_frames: int,
+        crossfade_frames: int,
+        loudness: Optional[ ArrayLike ] = None,
+        ) -> List[ Tuple[ int, int, int, int ] ]:
+    """
+    Split a series of frames into segments that can be synthesized independently.
+
+    Each segment is synthesized with warmup_frames of context before its
+    first output frame, so that the synthesizer can settle, and with
+    crossfade_frames after its last output frame, which overlap with
+    the next segment.
+
+    Parameters
+    ----------
+    n_frames : int
+        Number of frames of the series.
+
+    segment_frames : int
+        Nominal number of output frames per segment.
+
+    warmup_frames : int
+        Number of context frames that are synthesized before each
+        segment and discarded.
+
+    crossfade_frames : int
+        Number of frames over which consecutive segments are cross-faded.
+
+    loudness : ArrayLike, optional
+        A per-frame estimate of the loudness, e.g. the lung pressure. If
+        given, each boundary is moved to the quietest frame within a
+        quarter segment of its nominal position. Default is None.
+
+    Returns
+    -------
+    List[Tuple[int, int, int, int]]
+        ( synth_start, output_start, output_end, synth_end ) frame
+        indices for each segment, where output_end is the first frame
+        of the next segment.
+    """
+    if segment_frames < 1:
+        raise ValueError(
+            'Argument segment_frames must be positive.'
+            )
+    boundaries = [ 0 ]
+    nominal = segment_frames
+    while nominal < n_frames - crossfade_frames:
+        boundary = nominal
+        if loudness is not None:
+            radius = segment_frames // 4
+            lo = max( boundaries[ -1 ] + crossfade_frames + 1, nominal - radius )
+            hi = min( n_frames - crossfade_frames, nominal + radius + 1 )
+            if lo < hi:
+                candidates = np.asarray( loudness[ lo : hi ], dtype = float )
+                # Prefer the nominal position among equally quiet frames
+                distance = np.abs( np.arange( lo, hi ) - nominal ) / ( radius + 1 )
+                scale = max( np.ptp( candidates ), 1e-12 )
+                boundary = lo + int( np.argmin( candidates / scale + 1e-3 * distance ) )
+        boundaries.append( boundary )
+        nominal = boundary + segment_frames
+    boundaries.append( n_frames )
+    return [
+        (
+            max( 0, start - warmup_frames ),
+            start,
+            end,
+            min( n_frames, end + crossfade_frames ),
+            )
+        for start, end in zip( boundaries[ : -1 ], boundaries[ 1 : ] )
+        ]
+
+def stitch_segments(
+        segments: List[ np.ndarray ],
+        plan: List[ Tuple[ int, int, int, int ] ],
+        state_samples: int,
+        ) -> np.ndarray:
+    """
+    Join segment audio that was synthesized according to plan_segments.
+
+    The warm-up of each segment is discarded and the overlapping frames
+    of consecutive segments are cross-faded with a raised cosine.
+
+    Parameters
+    ----------
+    segments : List[np.ndarray]
+        Audio of each segment, covering the frames synth_start to synth_end.
+
+    plan : List[Tuple[int, int, int, int]]
+        The segment plan returned by plan_segments.
+
+    state_samples : int
+        Number of audio samples per frame.
+
+    Returns
+    -------
+    np.ndarray
+        The joined audio.
+    """
+    n_samples = plan[ -1 ][ 2 ] * state_samples
+    audio = np.zeros( n_samples )
+    for index, ( x, ( synth_start, start, end, synth_end ) ) in enumerate(
+            zip( segments, plan )
+            ):
+        x = np.asarray( x, dtype = float ).ravel()
+        offset = ( start - synth_start ) * state_samples
+        x = x[ offset : offset + ( synth_end - start ) * state_samples ]
+        # Fade in over the tail of the previous segment
+        if index > 0:
+            n_fade = ( plan[ index - 1 ][ 3 ] - start ) * state_samples
+            n_fade = min( n_fade, len( x ) )
+            fade_in = 0.5 - 0.5 * np.cos( np.pi * ( np.arange( n_fade ) + 0.5 ) / n_fade )
+            x = x.copy()
+            x[ : n_fade ] *= fade_in
+            audio[ start * state_samples : start * state_samples + n_fade ] *= 1.0 - fade_in
+        audio[ start * state_samples : start * state_samples + len( x ) ] += x
+    return audio
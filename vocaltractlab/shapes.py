@@ -0,0 +1,323 @@
+
+
+
+import xml.etree.ElementTree as ET
+import numpy as np
+
+import vocaltractlab_cython as cyvtl
+from vocaltractlab_cython import get_shape
+from target_approximation.vocaltractlab import MotorSeries
+from target_approximation.vocaltractlab import SupraGlottalSeries
+
+from typing import Union, List, Dict, Sequence
+from numpy.typing import ArrayLike
+
+
+
+class ShapeLibrary():
+    """
+    All tract and glottis shapes of a speaker as NumPy arrays.
+
+    The shapes are queried from the VocalTractLab API once, afterwards
+    shapes can be looked up, blended and interpolated into trajectories
+    without any further API calls.
+
+    Attributes
+    ----------
+    tract_names : List[str]
+        Names of the tract shapes.
+
+    tract_shapes : np.ndarray
+        Tract shapes of shape (n_tract_shapes, n_tract_params).
+
+    glottis_names : List[str]
+        Names of the glottis shapes of the selected glottis model.
+
+    glottis_shapes : np.ndarray
+        Glottis shapes of shape (n_glottis_shapes, n_glottis_params).
+
+    Examples
+    --------
+    >>> shapes = ShapeLibrary.from_speaker()
+    >>> ms = shapes.to_motor_series(
+    ...     tract_keys = [ 'a', 'i', 'u' ],
+    ...     glottis_keys = 'modal',
+    ...     times = [ 0.0, 0.2, 0.4 ],
+    ...     )
+    """
+    def __init__(
+            self,
+            tract_names: List[ str ],
+            tract_shapes: np.ndarray,
+            glottis_names: List[ str ],
+            glottis_shapes: np.ndarray,
+            ):
+        self.tract_names = list( tract_names )
+        self.tract_shapes = np.asarray( tract_shapes, dtype = float )
+        self.glottis_names = list( glottis_names )
+        self.glottis_shapes = np.asarray( glottis_shapes, dtype = float )
+        if len( self.tract_names ) != len( self.tract_shapes ):
+            raise ValueError(
+                f"""
+                The number of tract shape names: {len(self.tract_names)}
+                does not match the number of tract shapes: {len(self.tract_shapes)}.
+                """
+                )
+        if len( self.glottis_names ) != len( self.glottis_shapes ):
+            raise ValueError(
+                f"""
+                The number of glottis shape names: {len(self.glottis_names)}
+                does not match the number of glottis shapes: {len(self.glottis_shapes)}.
+                """
+                )
+        self._index = dict(
+            tract = { name: i for i, name in enumerate( self.tract_names ) },
+            glottis = { name: i for i, name in enumerate( self.glottis_names ) },
+            )
+        return
+
+    @classmethod
+    def from_speaker(
+            cls,
+            ):
+        """
+        Load all shapes of the active speaker.
+
+        The shape names are read from the speaker file and the
+        parameters of each shape are queried from the API once.
+        """
+        tract_names, glottis_names = _read_shape_names( cyvtl.active_speaker() )
+        return cls(
+            tract_names = tract_names,
+            tract_shapes = np.array( [
+                get_shape( name, params = 'tract' )
+                for name in tract_names
+                ] ),
+            glottis_names = glottis_names,
+            glottis_shapes = np.array( [
+                get_shape( name, params = 'glottis' )
+                for name in glottis_names
+                ] ),
+            )
+
+    def __getitem__( self, name: str ) -> np.ndarray:
+        if name in self._index[ 'tract' ]:
+            return self.tract_shapes[ self._index[ 'tract' ][ name ] ].copy()
+        elif name in self._index[ 'glottis' ]:
+            return self.glottis_shapes[ self._index[ 'glottis' ][ name ] ].copy()
+        raise KeyError( f'Shape does not exist: {name}' )
+
+    def get_shape(
+            self,
+            shape_name: str,
+            params: str,
+            ) -> np.ndarray:
+        """
+        Return a shape, like vocaltractlab_cython.get_shape but without
+        calling the API.
+        """
+        return self.shapes( params )[ self.indices( shape_name, params ) ].copy()
+
+    def shapes(
+            self,
+            params: str,
+            ) -> np.ndarray:
+        if params == 'tract':
+            return self.tract_shapes
+        elif params == 'glottis':
+            return self.glottis_shapes
+        raise ValueError(
+            'Argument params must be either "tract" or "glottis".'
+            )
+
+    def indices(
+            self,
+            keys: Union[ str, int, Sequence[ Union[ str, int ] ] ],
+            params: str,
+            ) -> Union[ int, np.ndarray ]:
+        """
+        Convert shape names (or indices) into row indices of the shapes array.
+        """
+        # Raises a ValueError for invalid params
+        self.shapes( params )
+        index = self._index[ params ]
+        if isinstance( keys, ( str, int, np.integer ) ):
+            return keys if not isinstance( keys, str ) else index[ keys ]
+        return np.array( [
+            key if not isinstance( key, str ) else index[ key ]
+            for key in keys
+            ], dtype = int )
+
+    def blend(
+            self,
+            weights: Union[ ArrayLike, Dict[ str, float ] ],
+            params: str = 'tract',
+            normalize: bool = True,
+            ) -> np.ndarray:
+        """
+        Blend shapes as weighted sums.
+
+        Parameters
+        ----------
+        weights : Union[ArrayLike, Dict[str, float]]
+            Weights of shape (n_shapes,) or (n_frames, n_shapes), or a dict
+            that maps shape names to weights.
+
+        params : str, optional
+            'tract' or 'glottis'. Default is 'tract'.
+
+        normalize : bool, optional
+            If True, the weights of each frame are divided by their sum,
+            so that the result is a convex combination of the shapes.
+            Default is True.
+
+        Returns
+        -------
+        np.ndarray
+            Blended shapes of shape (n_params,) or (n_frames, n_params).
+        """
+        shapes = self.shapes( params )
+        if isinstance( weights, dict ):
+            w = np.zeros( len( shapes ) )
+            w[ self.indices( list( weights.keys() ), params ) ] = list( weights.values() )
+        else:
+            w = np.asarray( weights, dtype = float )
+        if w.shape[ -1 ] != len( shapes ):
+            raise ValueError(
+                f"""
+                The number of weights: {w.shape[ -1 ]}
+                does not match the number of shapes: {len( shapes )}.
+                """
+                )
+        if normalize:
+            w = w / np.sum( w, axis = -1, keepdims = True )
+        return w @ shapes
+
+    def interpolate(
+            self,
+            keys: Sequence[ Union[ str, int ] ],
+            times: ArrayLike,
+            sr: float = 441,
+            params: str = 'tract',
+            ) -> np.ndarray:
+        """
+        Linearly interpolate between key shapes.
+
+        Parameters
+        ----------
+        keys : Sequence[Union[str, int]]
+            Names (or indices) of the key shapes.
+
+        times : ArrayLike
+            Strictly increasing times of the key shapes in seconds.
+
+        sr : float, optional
+            Sampling rate of the trajectory. Default is 441.
+
+        params : str, optional
+            'tract' or 'glottis'. Default is 'tract'.
+
+        Returns
+        -------
+        np.ndarray
+            Trajectory of shape (n_frames, n_params) that starts at the
+            first and ends at the last key shape.
+        """
+        shapes = self.shapes( params )[ self.indices( keys, params ) ]
+        times = np.asarray( times, dtype = float )
+        if len( times ) != len( shapes ):
+            raise ValueError(
+                f"""
+                The number of times: {len( times )}
+                does not match the number of key shapes: {len( shapes )}.
+                """
+                )
+        if np.any( np.diff( times ) <= 0 ):
+            raise ValueError(
+                'The times of the key shapes must be strictly increasing.'
+                )
+        n_frames = int( round( ( times[ -1 ] - times[ 0 ] ) * sr ) ) + 1
+        t = times[ 0 ] + np.arange( n_frames ) / sr
+        if len( shapes ) == 1:
+            return np.repeat( shapes, n_frames, axis = 0 )
+        segment = np.clip(
+            np.searchsorted( times, t, side = 'right' ) - 1,
+            0,
+            len( times ) - 2,
+            )
+        w = np.clip(
+            ( t - times[ segment ] ) / ( times[ segment + 1 ] - times[ segment ] ),
+            0.0,
+            1.0,
+            )[ :, np.newaxis ]
+        return ( 1 - w ) * shapes[ segment ] + w * shapes[ segment + 1 ]
+
+    def to_motor_series(
+            self,
+            tract_keys: Sequence[ Union[ str, int ] ],
+            glottis_keys: Union[ str, Sequence[ Union[ str, int ] ] ],
+            times: ArrayLike,
+            sr: float = 441,
+            ) -> MotorSeries:
+        """
+        Create a MotorSeries by interpolating between key shapes.
+
+        Parameters
+        ----------
+        tract_keys : Sequence[Union[str, int]]
+            Names (or indices) of the tract key shapes.
+
+        glottis_keys : Union[str, Sequence[Union[str, int]]]
+            Names (or indices) of the glottis key shapes, or a single
+            name that is used for the whole series.
+
+        times : ArrayLike
+            Strictly increasing times of the key shapes in seconds.
+
+        sr : float, optional
+            Sampling rate of the series. Default is 441.
+
+        Returns
+        -------
+        MotorSeries
+            The interpolated motor series.
+        """
+        if isinstance( glottis_keys, str ):
+            glottis_keys = [ glottis_keys ] * len( tract_keys )
+        tract = self.interpolate( tract_keys, times, sr, params = 'tract' )
+        glottis = self.interpolate( glottis_keys, times, sr, params = 'glottis' )
+        return MotorSeries(
+            np.concatenate( [ tract, glottis ], axis = 1 ),
+            sr = sr,
+            )
+
+    def to_supra_glottal_series(
+            self,
+            tract_keys: Sequence[ Union[ str, int ] ],
+            times: ArrayLike,
+            sr: float = 441,
+            ) -> SupraGlottalSeries:
+        """
+        Create a SupraGlottalSeries by interpolating between key shapes.
+        """
+        return SupraGlottalSeries(
+            self.interpolate( tract_keys, times, sr, params = 'tract' ),
+            sr = sr,
+            )
+
+def _read_shape_names(
+        speaker_file: str,
+        ):
+    root = ET.parse( speaker_file ).getroot()
+    tract_names = [
+        shape.get( 'name' )
+        for shape in root.findall( './vocal_tract_model/shapes/shape' )
+        ]
+    glottis_names = []
+    for glottis_model in root.findall( './glottis_models/glottis_model' ):
+        if glottis_model.get( 'selected' ) == '1':
+            glottis_names = [
+                shape.get( 'name' )
+                for shape in glottis_model.findall( './shapes/shape' )
+                ]
+    return tract_names, glottis_names
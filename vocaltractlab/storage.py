@@ -0,0 +1,213 @@
+
+
+
+import os
+import struct
+import zipfile
+import numpy as np
+
+from typing import Dict, Iterable, Optional, Tuple
+
+
+
+STORAGE_FORMAT_VERSION = 1
+
+def save_columns(
+        file_path: str,
+        columns: Dict[ str, Optional[ np.ndarray ] ],
+        attributes: Optional[ Dict[ str, np.ndarray ] ] = None,
+        compress: bool = False,
+        ) -> None:
+    """
+    Save per-frame arrays and attributes to a columnar npz file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file. '.npz' is appended if it is missing, like
+        load_columns does.
+
+    columns : Dict[str, Optional[np.ndarray]]
+        Arrays with one row per frame, columns that are None are skipped.
+
+    attributes : Dict[str, np.ndarray], optional
+        Arrays and scalars that apply to all frames, e.g. a frequency grid.
+
+    compress : bool, optional
+        If True, the arrays are compressed. Compressed files are smaller,
+        but partial reads have to decompress the whole column, while
+        uncompressed columns are read via memory-mapping, see
+        load_columns. Default is False.
+    """
+    arrays = {
+        f'columns/{name}': np.asarray( x )
+        for name, x in columns.items()
+        if x is not None
+        }
+    n_frames = { len( x ) for x in arrays.values() }
+    if len( n_frames ) > 1:
+        raise ValueError(
+            f"""
+            All columns must have the same number of frames, but the
+            columns have the following numbers of frames: {n_frames}
+            """
+            )
+    if attributes is not None:
+        arrays.update( {
+            f'attributes/{name}': np.asarray( x )
+            for name, x in attributes.items()
+            if x is not None
+            } )
+    arrays[ 'format_version' ] = np.array( STORAGE_FORMAT_VERSION )
+    file_path = _npz_path( file_path )
+    directory = os.path.dirname( file_path )
+    if directory and not os.path.exists( directory ):
+        os.makedirs(
+            directory,
+            exist_ok = True,
+            )
+    if compress:
+        np.savez_compressed( file_path, **arrays )
+    else:
+        np.savez( file_path, **arrays )
+    return
+
+def load_columns(
+        file_path: str,
+        fields: Optional[ Iterable[ str ] ] = None,
+        frames: Optional[ slice ] = None,
+        time_range: Optional[ Tuple[ float, float ] ] = None,
+        ) -> Tuple[ Dict[ str, np.ndarray ], Dict[ str, np.ndarray ] ]:
+    """
+    Load (a part of) a file that was written with save_columns.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the file. '.npz' is appended if it is missing.
+
+    fields : Iterable[str], optional
+        Names of the columns to load. If None, all columns are loaded.
+        Attributes are always loaded.
+
+    frames : slice, optional
+        Frames to load. Uncompressed columns are memory-mapped and only
+        the selected frames are read from the disk. If None, all frames
+        are loaded.
+
+    time_range : Tuple[float, float], optional
+        Start and stop time in seconds, converted into frames with the
+        attribute 'sr', see time_range_to_frames. Cannot be combined
+        with frames. If None, frames is used. Default is None.
+
+    Returns
+    -------
+    Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]
+        The columns and the attributes.
+    """
+    if frames is not None and time_range is not None:
+        raise ValueError(
+            f"""
+            Only one of frames: {frames} and time_range: {time_range}
+            can be specified.
+            """
+            )
+    file_path = _npz_path( file_path )
+    with zipfile.ZipFile( file_path ) as archive:
+        names = [ name[ : -4 ] for name in archive.namelist() if name.endswith( '.npy' ) ]
+        version = _read_member( file_path, archive, 'format_version' )
+        if version > STORAGE_FORMAT_VERSION:
+            raise ValueError(
+                f"""
+                The file: '{file_path}' was written with the storage
+                format version {version}, but only versions up to
+                {STORAGE_FORMAT_VERSION} are supported.
+                """
+                )
+        available = [
+            name.split( '/', 1 )[ 1 ]
+            for name in names
+            if name.startswith( 'columns/' )
+            ]
+        if fields is None:
+            fields = available
+        for field in fields:
+            if field not in available:
+                raise ValueError(
+                    f"""
+                    The field: '{field}' does not exist in the file:
+                    '{file_path}'. Available fields are:
+                    {available}
+                    """
+                    )
+        attributes = {
+            name.split( '/', 1 )[ 1 ]: _read_member( file_path, archive, name )
+            for name in names
+            if name.startswith( 'attributes/' )
+            }
+        if time_range is not None:
+            frames = time_range_to_frames( time_range, float( attributes[ 'sr' ] ) )
+        columns = {
+            field: _read_member( file_path, archive, f'columns/{field}', frames )
+            for field in fields
+            }
+    return columns, attributes
+
+def time_range_to_frames(
+        time_range: Optional[ Tuple[ float, float ] ],
+        sr: float,
+        ) -> Optional[ slice ]:
+    """
+    Convert a time range ( start, stop ) in seconds into a slice of frames.
+    """
+    if time_range is None:
+        return None
+    start, stop = time_range
+    # The tolerance keeps times that are multiples of the frame period,
+    # like 2 / 441, from being rounded to the next frame
+    return slice(
+        None if start is None else int( np.floor( start * sr + 1e-6 ) ),
+        None if stop is None else int( np.ceil( stop * sr - 1e-6 ) ),
+        )
+
+def _npz_path( file_path: str ) -> str:
+    # np.savez appends the suffix, so files are also loaded with it
+    if not file_path.endswith( '.npz' ):
+        return f'{file_path}.npz'
+    return file_path
+
+def _read_member(
+        file_path: str,
+        archive: zipfile.ZipFile,
+        name: str,
+        frames: Optional[ slice ] = None,
+        ) -> np.ndarray:
+    info = archive.getinfo( f'{name}.npy' )
+    if frames is not None and info.compress_type == zipfile.ZIP_STORED:
+        # Uncompressed members are contiguous in the file, so the array
+        # can be mapped directly and only the selected rows are read
+        with open( file_path, 'rb' ) as f:
+            f.seek( info.header_offset )
+            local_header = f.read( 30 )
+            name_length, extra_length = struct.unpack( '<HH', local_header[ 26 : 30 ] )
+            f.seek( info.header_offset + 30 + name_length + extra_length )
+            version = np.lib.format.read_magic( f )
+            if version == ( 1, 0 ):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0( f )
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0( f )
+            offset = f.tell()
+        if not dtype.hasobject and not fortran_order and len( shape ) > 0 and np.prod( shape ) > 0:
+            x = np.memmap(
+                file_path,
+                dtype = dtype,
+                mode = 'r',
+                offset = offset,
+                shape = shape,
+                )
+            return np.array( x[ frames ] )
+    with archive.open( info ) as f:
+        x = np.lib.format.read_array( f )
+    if frames is not None:
+        return x[ frames ]
+    return x
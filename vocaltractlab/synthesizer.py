@@ -0,0 +1,192 @@
+
+
+
+import numpy as np
+import torch
+import torchaudio
+
+import vocaltractlab_cython as cyvtl
+from vocaltractlab_cython import get_constants
+from vocaltractlab_cython import get_param_info
+from vocaltractlab_cython import synth_block
+
+from target_approximation.vocaltractlab import MotorSequence
+from target_approximation.vocaltractlab import MotorSeries
+
+from typing import Optional, Tuple, Union
+
+from .audioprocessing import MAX_WAV_VALUE
+from .core import _to_motor_series
+from .core import load_speaker
+
+
+
+class Synthesizer():
+    """
+    In-process synthesizer with minimal overhead per call.
+
+    motor_to_audio is made for many files. For a single short utterance,
+    its overhead, the dispatch of the work item, repeated queries of the
+    API constants and several conversions between NumPy and torch,
+    becomes noticeable in interactive use. A Synthesizer loads the
+    speaker once, caches the constants and the parameter info, copies
+    the parameters into reusable buffers and post-processes the audio
+    in NumPy. The result is the same as that of motor_to_audio.
+
+    The time of synth_block itself grows with the duration of the
+    utterance and is not affected, see
+    benchmarks/bench_synthesizer_latency.py.
+
+    Parameters
+    ----------
+    speaker : str, optional
+        Speaker that is loaded on construction. If None, the active
+        speaker is used. The speaker is loaded again if another speaker
+        was made active in between two calls. Default is None.
+
+    sr : int, optional
+        Sampling rate of the output audio. If None, the audio is
+        returned with the sampling rate of the synthesizer. Default is
+        None.
+
+    normalize_audio : int, optional
+        Peak level in dBFS, see motor_to_audio. If None, the audio is
+        not normalized. Default is -1.
+
+    dtype : str, optional
+        Storage type of the audio, 'float64', 'float32' or 'int16'. If
+        None, the audio is returned as float64. Default is None.
+
+    Examples
+    --------
+    >>> synthesizer = Synthesizer( sr = 16000 )
+    >>> audio = synthesizer.synthesize( motor_series )
+    """
+    def __init__(
+            self,
+            speaker: Optional[ str ] = None,
+            sr: Optional[ int ] = None,
+            normalize_audio: Optional[ int ] = -1,
+            dtype: Optional[ str ] = None,
+            ):
+        if speaker is not None:
+            load_speaker( speaker )
+        self.speaker = cyvtl.active_speaker()
+        self.constants = get_constants()
+        self.tract_param_info = get_param_info( 'tract' )
+        self.glottis_param_info = get_param_info( 'glottis' )
+        self.parameter_names = [
+            x[ 'name' ] for x in self.tract_param_info + self.glottis_param_info
+            ]
+        self.sr_audio = self.constants[ 'sr_audio' ]
+        self.sr = self.sr_audio if sr is None else sr
+        self.normalize_audio = normalize_audio
+        self.dtype = None if dtype is None else np.dtype( dtype )
+        if self.dtype not in [ None, np.float64, np.float32, np.int16 ]:
+            raise ValueError(
+                f"""
+                The specified audio dtype: '{dtype}'
+                is not supported. Dtype must be one of the following:
+                - float64
+                - float32
+                - int16
+                """
+                )
+        self._resampler = None
+        if self.sr != self.sr_audio:
+            # Same filter as audioprocessing.resample_like_librosa, but
+            # the kernel is only computed once
+            self._resampler = torchaudio.transforms.Resample(
+                orig_freq = self.sr_audio,
+                new_freq = self.sr,
+                lowpass_filter_width = 64,
+                rolloff = 0.9475937167399596,
+                resampling_method = 'sinc_interp_kaiser',
+                beta = 14.769656459379492,
+                dtype = torch.float32,
+                )
+        n_tract_params = len( self.tract_param_info )
+        self._tract = np.empty( ( 0, n_tract_params ) )
+        self._glottis = np.empty( ( 0, len( self.parameter_names ) - n_tract_params ) )
+        return
+
+    def synthesize(
+            self,
+            motor_series: Union[ MotorSeries, MotorSequence, str ],
+            ) -> np.ndarray:
+        """
+        Synthesize the audio of a motor series as a 1-d array.
+        """
+        tract, glottis, state_samples = self.parameters( motor_series )
+        audio = self.synthesize_block( tract, glottis, state_samples )
+        return self.postprocess( audio )
+
+    def parameters(
+            self,
+            motor_series: Union[ MotorSeries, MotorSequence, str ],
+            ) -> Tuple[ np.ndarray, np.ndarray, int ]:
+        """
+        Copy the tract and glottis parameters into the reusable buffers.
+
+        Returns views of the buffers, which are overwritten by the next
+        call, and the number of audio samples per frame.
+        """
+        motor_series = _to_motor_series( motor_data = motor_series )
+        if list( motor_series.series.columns ) == self.parameter_names:
+            x = motor_series.to_numpy( transpose = False )
+        else:
+            x = motor_series.series[ self.parameter_names ].to_numpy()
+        n_frames = len( x )
+        if n_frames > len( self._tract ):
+            # Grow geometrically, so that few calls allocate at all
+            n_rows = max( n_frames, 2 * len( self._tract ) )
+            self._tract = np.empty( ( n_rows, self._tract.shape[ 1 ] ) )
+            self._glottis = np.empty( ( n_rows, self._glottis.shape[ 1 ] ) )
+        tract = self._tract[ : n_frames ]
+        glottis = self._glottis[ : n_frames ]
+        tract[ ... ] = x[ :, : tract.shape[ 1 ] ]
+        glottis[ ... ] = x[ :, tract.shape[ 1 ] : ]
+        return tract, glottis, int( self.sr_audio / motor_series.sr )
+
+    def synthesize_block(
+            self,
+            tract: np.ndarray,
+            glottis: np.ndarray,
+            state_samples: int,
+            ) -> np.ndarray:
+        """
+        Synthesize raw audio with the speaker of the synthesizer.
+        """
+        if cyvtl.active_speaker() != self.speaker:
+            load_speaker( self.speaker )
+        return synth_block(
+            tract_parameters = tract,
+            glottis_parameters = glottis,
+            state_samples = state_samples,
+            verbose_api = False,
+            )
+
+    def postprocess(
+            self,
+            audio: np.ndarray,
+            ) -> np.ndarray:
+        """
+        Resample, normalize and convert raw audio like postprocess.
+        """
+        if self._resampler is not None:
+            # Resampled in single precision like resample_like_librosa
+            audio = self._resampler(
+                torch.from_numpy( audio ).float().unsqueeze( 0 )
+                )[ 0 ].numpy()
+        if self.normalize_audio is not None:
+            # Same operations as normalize_audio_amplitude
+            factor = 10**( -1 * self.normalize_audio * 0.05 ) - 1
+            peak = np.max( np.abs( audio ) )
+            audio = audio / ( peak + ( peak * factor ) )
+        if self.dtype == np.int16:
+            audio = np.round(
+                np.clip( audio, -1.0, 1.0 ) * ( MAX_WAV_VALUE - 1 )
+                ).astype( np.int16 )
+        elif self.dtype is not None:
+            audio = audio.astype( self.dtype )
+        return audio
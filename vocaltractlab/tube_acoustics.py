@@ -0,0 +1,202 @@
+
+
+
+import numpy as np
+
+from typing import List, Optional
+from numpy.typing import ArrayLike
+
+from .tube_state import TubeState
+
+
+
+# Physical constants in CGS units, as used by the tube model of VocalTractLab
+SPEED_OF_SOUND = 35000.0 # cm/s
+AIR_DENSITY = 1.14e-3 # g/cm^3
+AIR_VISCOSITY = 1.86e-4 # dyn s/cm^2
+HEAT_CONDUCTION = 5.5e-5 # cal/(cm s K)
+SPECIFIC_HEAT = 0.24 # cal/(g K)
+ADIABATIC_CONSTANT = 1.4
+WALL_MASS = 6.0 # g/cm^2, effective value fitted to the VocalTractLab API
+WALL_RESISTANCE = 1600.0 # g/(s cm^2)
+WALL_STIFFNESS = 3.0e5 # g/(s^2 cm^2)
+MIN_AREA = 1.0e-6 # cm^2
+
+def tube_to_transfer_function(
+        tube_length: ArrayLike,
+        tube_area: ArrayLike,
+        frequencies: ArrayLike,
+        losses: bool = True,
+        radiation: bool = True,
+        chunk_size: Optional[ int ] = None,
+        ) -> np.ndarray:
+    """
+    Compute vocal tract transfer functions from tube geometries.
+
+    The tract is modelled as a concatenation of cylindrical tube
+    sections, ordered from the glottis to the lips. Each section is
+    represented by its chain (ABCD) matrix and the matrices are
+    multiplied for all frames and frequencies at once. The result is
+    the volume velocity transfer function U_lips / U_glottis.
+
+    Parameters
+    ----------
+    tube_length : ArrayLike
+        Section lengths in cm of shape (n_frames, n_sections)
+        or (n_sections,).
+
+    tube_area : ArrayLike
+        Section areas in cm^2, same shape as tube_length.
+
+    frequencies : ArrayLike
+        Frequencies in Hz at which the transfer function is evaluated.
+
+    losses : bool, optional
+        If True, viscous, thermal and wall vibration losses are modelled.
+        Default is True.
+
+    radiation : bool, optional
+        If True, the lips are terminated by a radiation impedance,
+        otherwise by a short circuit. Default is True.
+
+    chunk_size : int, optional
+        Number of frames that are processed at once. Small chunks keep
+        the intermediate (chunk_size, n_frequencies) matrices in the
+        CPU cache. If None, the chunk size is chosen such that a chunk
+        holds about 16k frequency bins. Default is None.
+
+    Returns
+    -------
+    np.ndarray
+        Complex transfer function of shape (n_frames, n_frequencies).
+
+    Notes
+    -----
+    The model is an approximation of the transfer function computed by
+    the VocalTractLab API. It ignores the nasal cavity, the piriform
+    fossa and the glottal opening, so results are most accurate for
+    oral sounds with a closed velum.
+    """
+    tube_length = np.atleast_2d( np.asarray( tube_length, dtype = float ) )
+    tube_area = np.atleast_2d( np.asarray( tube_area, dtype = float ) )
+    if tube_length.shape != tube_area.shape:
+        raise ValueError(
+            f"""
+            The shape of tube_length: {tube_length.shape}
+            does not match the shape of tube_area: {tube_area.shape}.
+            """
+            )
+    tube_area = np.maximum( tube_area, MIN_AREA )
+
+    # The DC bin is evaluated slightly above 0 Hz to avoid a division
+    # by zero in the wall impedance, the result converges to 1.
+    omega = 2 * np.pi * np.maximum(
+        np.asarray( frequencies, dtype = float ),
+        1e-3,
+        )
+    omega = omega[ np.newaxis, : ]
+
+    if chunk_size is None:
+        chunk_size = max( 1, 2**14 // omega.shape[ 1 ] )
+
+    h = np.empty( ( tube_length.shape[ 0 ], omega.shape[ 1 ] ), dtype = complex )
+    for start in range( 0, tube_length.shape[ 0 ], chunk_size ):
+        frames = slice( start, start + chunk_size )
+        h[ frames ] = _chain_matrix_transfer_function(
+            tube_length = tube_length[ frames ],
+            tube_area = tube_area[ frames ],
+            omega = omega,
+            losses = losses,
+            radiation = radiation,
+            )
+    return h
+
+def tube_states_to_transfer_function(
+        tube_states: List[ TubeState ],
+        frequencies: ArrayLike,
+        **kwargs,
+        ) -> np.ndarray:
+    """
+    Compute the transfer functions of a list of TubeState objects.
+
+    See tube_to_transfer_function for the keyword arguments.
+    """
+    tube_length = np.array( [ ts.tube_length for ts in tube_states ] )
+    tube_area = np.array( [ ts.tube_area for ts in tube_states ] )
+    return tube_to_transfer_function(
+        tube_length = tube_length,
+        tube_area = tube_area,
+        frequencies = frequencies,
+        **kwargs,
+        )
+
+def _chain_matrix_transfer_function(
+        tube_length: np.ndarray,
+        tube_area: np.ndarray,
+        omega: np.ndarray,
+        losses: bool,
+        radiation: bool,
+        ):
+    # The frequency dependent parts of the impedance and admittance
+    # per unit length do not depend on the geometry, so they are
+    # computed once and scaled by the area and perimeter of each section.
+    z_inertance = 1j * omega * AIR_DENSITY
+    y_compliance = 1j * omega / ( AIR_DENSITY * SPEED_OF_SOUND**2 )
+    if losses:
+        z_viscous = np.sqrt( omega * AIR_DENSITY * AIR_VISCOSITY / 2 )
+        y_wall = ( ADIABATIC_CONSTANT - 1 ) / (
+            AIR_DENSITY * SPEED_OF_SOUND**2
+            ) * np.sqrt(
+                HEAT_CONDUCTION * omega / ( 2 * SPECIFIC_HEAT * AIR_DENSITY )
+                ) + 1.0 / (
+                    WALL_RESISTANCE
+                    + 1j * omega * WALL_MASS
+                    + WALL_STIFFNESS / ( 1j * omega )
+                    )
+
+    n_frames = tube_length.shape[ 0 ]
+    a = np.ones( ( n_frames, omega.shape[ 1 ] ), dtype = complex )
+    b = np.zeros_like( a )
+    c = np.zeros_like( a )
+    d = np.ones_like( a )
+    for section in range( tube_length.shape[ 1 ] ):
+        length = tube_length[ :, section, np.newaxis ]
+        area = tube_area[ :, section, np.newaxis ]
+        z = z_inertance / area
+        y = y_compliance * area
+        if losses:
+            perimeter = 2 * np.sqrt( np.pi * area )
+            z = z + z_viscous * ( perimeter / area**2 )
+            y = y + y_wall * perimeter
+        # The chain matrix of a section is [[cosh, Z_c sinh], [sinh / Z_c, cosh]]
+        # with the propagation constant gamma = sqrt( z y ) and the
+        # characteristic impedance Z_c = z / gamma = gamma / y.
+        gamma = np.sqrt( z * y )
+        exp_pos = np.exp( gamma * length )
+        exp_neg = 1.0 / exp_pos
+        cosh = 0.5 * ( exp_pos + exp_neg )
+        sinh_over_gamma = 0.5 * ( exp_pos - exp_neg ) / gamma
+        k_b = z * sinh_over_gamma
+        k_c = y * sinh_over_gamma
+        a, b, c, d = (
+            a * cosh + b * k_c,
+            a * k_b + b * cosh,
+            c * cosh + d * k_c,
+            c * k_b + d * cosh,
+            )
+
+    # The lips are the output port: U_glottis = ( C * Z_rad + D ) * U_lips
+    if radiation:
+        z_rad = _radiation_impedance( tube_area[ :, -1, np.newaxis ], omega )
+        return 1.0 / ( c * z_rad + d )
+    return 1.0 / d
+
+def _radiation_impedance(
+        area: np.ndarray,
+        omega: np.ndarray,
+        ):
+    # Parallel resistance and inductance of a piston in an infinite baffle
+    radius = np.sqrt( area / np.pi )
+    r_rad = 128 * AIR_DENSITY * SPEED_OF_SOUND / ( 9 * np.pi**2 * area )
+    l_rad = 8 * AIR_DENSITY * radius / ( 3 * np.pi * area )
+    return ( 1j * omega * l_rad * r_rad ) / ( r_rad + 1j * omega * l_rad )
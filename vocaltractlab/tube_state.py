@@ -7,9 +7,37 @@ from target_approximation.utils import get_plot_limits
 import numpy as np
 import matplotlib.pyplot as plt
 
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .storage import load_columns
+from .storage import save_columns
+
 
 
 class TubeState():
+    """
+    Tube geometry of a single tract state.
+
+    The constriction analysis (constriction, constriction_data and
+    tube_articulator_tokens) is computed on first access only, so that
+    TubeState objects are cheap to create if only the geometry is used.
+    The class uses __slots__ to keep the memory per instance small.
+    """
+    __slots__ = (
+        'tract_state',
+        'tube_length',
+        'tube_area',
+        'tube_articulator',
+        'incisor_position',
+        'tongue_tip_side_elevation',
+        'velum_opening',
+        '_constriction',
+        '_constriction_data',
+        '_tube_articulator_tokens',
+        )
+    open_limit = 0.3  # 0.3 cm^2 for open tracts
+    tight_limit = 0.001 # above 0.001 tight, below or equal closed # actual value is 0.0001 however
+
     def __init__(
             self,
             tract_state,
@@ -19,7 +47,12 @@ class TubeState():
             incisor_position,
             tongue_tip_side_elevation,
             velum_opening,
+            dtype = None,
             ):
+        if dtype is not None:
+            # Storage type of the geometry, e.g. float32 for long analyses
+            tube_length = np.asarray( tube_length ).astype( dtype, copy = False )
+            tube_area = np.asarray( tube_area ).astype( dtype, copy = False )
         self.tract_state = tract_state
         self.tube_length = tube_length
         self.tube_area = tube_area
@@ -27,13 +60,30 @@ class TubeState():
         self.incisor_position = incisor_position
         self.tongue_tip_side_elevation = tongue_tip_side_elevation
         self.velum_opening = velum_opening
-        self.open_limit = 0.3  # 0.3 cm^2 for open tracts
-        self.tight_limit = 0.001 # above 0.001 tight, below or equal closed # actual value is 0.0001 however
-        self.constriction = self.get_constriction_class(
-            tube_area = np.min( tube_area ),
-            )
-        self.constriction_data = self.get_constriction_threshold_crossings()
+        self._constriction = None
+        self._constriction_data = None
+        self._tube_articulator_tokens = None
         return
+
+    @property
+    def constriction( self ):
+        if self._constriction is None:
+            self._constriction = self.get_constriction_class(
+                tube_area = np.min( self.tube_area ),
+                )
+        return self._constriction
+
+    @property
+    def constriction_data( self ):
+        if self._constriction_data is None:
+            self._constriction_data = self.get_constriction_threshold_crossings()
+        return self._constriction_data
+
+    @property
+    def tube_articulator_tokens( self ):
+        if self._tube_articulator_tokens is None:
+            self._tube_articulator_tokens = self.get_tube_articulator_tokens()
+        return self._tube_articulator_tokens
     
     @classmethod
     def from_dict(
@@ -48,6 +98,7 @@ class TubeState():
             incisor_position = x[ 'incisor_position' ],
             tongue_tip_side_elevation = x[ 'tongue_tip_side_elevation' ],
             velum_opening = x[ 'velum_opening' ],
+            dtype = x.get( 'dtype' ),
             )
 
     #def get_constriction( self, return_str = False ):
@@ -105,30 +156,10 @@ class TubeState():
                         break
         return np.array( [ x, y ] ).T
 
-    def get_constriction_threshold_crossings(
+    def get_tube_articulator_tokens(
         self,
         n_tongue_sections = 8,
         ):
-        tight_crossings = []
-        close_crossings = []
-        tight_crossed = False
-        close_crossed = False
-        tight_articulators = []
-        close_articulators = []
-        #for x in tube_area_function:
-        #    y = x[1]
-        #    if tight_crossed == False and y < self.open_limit:
-        #        tight_crossings.append( x )
-        #        tight_crossed = True
-        #    if tight_crossed == True and y >= self.open_limit:
-        #        tight_crossings.append( x )
-        #        tight_crossed = False
-        #    if close_crossed == False and y < self.tight_limit:
-        #        close_crossings.append( x )
-        #        close_crossed = True
-        #    if close_crossed == True and y >= self.tight_limit:
-        #        close_crossings.append( x )
-        #        close_crossed = False
         articulator_token = {
             '1': 'T',# tongue;
             '2': 'I',#= lower incisors;
@@ -152,19 +183,47 @@ class TubeState():
                 tube_articulator_tokens.append(
                     articulator_token[ str( ar ) ]
                     )
-        self.tube_articulator_tokens = tube_articulator_tokens
+        return tube_articulator_tokens
+
+    def get_constriction_threshold_crossings(
+        self,
+        n_tongue_sections = 8,
+        ):
+        tight_crossings = []
+        close_crossings = []
+        tight_crossed = False
+        close_crossed = False
+        tight_articulators = []
+        close_articulators = []
+        #for x in tube_area_function:
+        #    y = x[1]
+        #    if tight_crossed == False and y < self.open_limit:
+        #        tight_crossings.append( x )
+        #        tight_crossed = True
+        #    if tight_crossed == True and y >= self.open_limit:
+        #        tight_crossings.append( x )
+        #        tight_crossed = False
+        #    if close_crossed == False and y < self.tight_limit:
+        #        close_crossings.append( x )
+        #        close_crossed = True
+        #    if close_crossed == True and y >= self.tight_limit:
+        #        close_crossings.append( x )
+        #        close_crossed = False
+        tube_articulator_tokens = self.get_tube_articulator_tokens(
+            n_tongue_sections = n_tongue_sections,
+            )
 
         assert len( self.tube_area ) == len( self.tube_length ), 'Not the same length, ta: {}, tl: {}'.format(
             len( self.tube_area ),
             len( self.tube_length ),
             )
-        assert len( self.tube_area ) == len( self.tube_articulator_tokens ), 'Not the same length, ta: {}, ar: {}'.format(
+        assert len( self.tube_area ) == len( tube_articulator_tokens ), 'Not the same length, ta: {}, ar: {}'.format(
             len( self.tube_area ),
-            len( self.tube_articulator_tokens ),
+            len( tube_articulator_tokens ),
             )
 
         x = 0
-        for ta, tl, ar in zip( self.tube_area, self.tube_length, self.tube_articulator_tokens ):
+        for ta, tl, ar in zip( self.tube_area, self.tube_length, tube_articulator_tokens ):
             if tight_crossed == False and ta < self.open_limit:
                 tight_crossings.append( x )
                 tight_tb_articulators = []
@@ -335,4 +394,189 @@ class TubeState():
         axs[0].set( yscale = 'log' )
         finalize_plot( figure, axs, **kwargs )
         #ax.set( xlabel = 'Tube Length [cm]', ylabel = r'Cross-sectional Area [cm$^2$]' )
-        return axs
\ No newline at end of file
+        return axs
+
+
+
+class TubeSeries():
+    """
+    Tube states of consecutive frames, stored as one array per field.
+
+    Unlike a list of TubeState objects, the series can be saved to and
+    loaded from a columnar npz file quickly, and parts of a file, i.e.
+    selected fields and time ranges, can be loaded without reading the
+    whole file.
+
+    Attributes
+    ----------
+    tract_state : np.ndarray
+        Tract states of shape (n_frames, n_tract_params).
+
+    tube_length : np.ndarray
+        Section lengths of shape (n_frames, n_sections).
+
+    tube_area : np.ndarray
+        Section areas of shape (n_frames, n_sections).
+
+    tube_articulator : np.ndarray
+        Articulator ids of shape (n_frames, n_sections).
+
+    incisor_position, tongue_tip_side_elevation, velum_opening : np.ndarray
+        Scalars of each frame, of shape (n_frames,).
+
+    sr : float
+        Frame rate in Hz.
+
+    Fields that were not computed or not loaded are None.
+
+    Examples
+    --------
+    >>> tube_series = TubeSeries.from_tube_states( motor_to_tube( sgs ) )
+    >>> tube_series.save( 'tube.npz' )
+    >>> areas = TubeSeries.load(
+    ...     'tube.npz',
+    ...     fields = [ 'tube_area' ],
+    ...     time_range = ( 1.0, 2.0 ),
+    ...     ).tube_area
+    """
+    fields = [
+        'tract_state',
+        'tube_length',
+        'tube_area',
+        'tube_articulator',
+        'incisor_position',
+        'tongue_tip_side_elevation',
+        'velum_opening',
+        ]
+
+    def __init__(
+            self,
+            tract_state: Optional[ np.ndarray ] = None,
+            tube_length: Optional[ np.ndarray ] = None,
+            tube_area: Optional[ np.ndarray ] = None,
+            tube_articulator: Optional[ np.ndarray ] = None,
+            incisor_position: Optional[ np.ndarray ] = None,
+            tongue_tip_side_elevation: Optional[ np.ndarray ] = None,
+            velum_opening: Optional[ np.ndarray ] = None,
+            sr: float = 441,
+            ):
+        self.tract_state = tract_state
+        self.tube_length = tube_length
+        self.tube_area = tube_area
+        self.tube_articulator = tube_articulator
+        self.incisor_position = incisor_position
+        self.tongue_tip_side_elevation = tongue_tip_side_elevation
+        self.velum_opening = velum_opening
+        self.sr = sr
+        n_frames = {
+            len( x ) for x in self.columns().values() if x is not None
+            }
+        if len( n_frames ) > 1:
+            raise ValueError(
+                f"""
+                All fields must have the same number of frames, but the
+                fields have the following numbers of frames: {n_frames}
+                """
+                )
+        return
+
+    @classmethod
+    def from_tube_states(
+            cls,
+            tube_states: Sequence[ TubeState ],
+            sr: float = 441,
+            ):
+        """
+        Stack a list of TubeState objects, e.g. from motor_to_tube.
+        """
+        columns = {}
+        for field in cls.fields:
+            values = [ getattr( ts, field ) for ts in tube_states ]
+            columns[ field ] = (
+                np.array( values )
+                if values and all( x is not None for x in values ) else None
+                )
+        return cls( sr = sr, **columns )
+
+    def columns( self ):
+        return { field: getattr( self, field ) for field in self.fields }
+
+    def __len__( self ):
+        for x in self.columns().values():
+            if x is not None:
+                return len( x )
+        return 0
+
+    def __getitem__(
+            self,
+            index: Union[ int, slice ],
+            ) -> Union[ TubeState, 'TubeSeries' ]:
+        if isinstance( index, slice ):
+            return TubeSeries(
+                sr = self.sr,
+                **{
+                    field: x[ index ] if x is not None else None
+                    for field, x in self.columns().items()
+                    },
+                )
+        return TubeState(
+            **{
+                field: x[ index ] if x is not None else None
+                for field, x in self.columns().items()
+                },
+            )
+
+    def __iter__( self ):
+        for index in range( len( self ) ):
+            yield self[ index ]
+
+    def to_tube_states( self ) -> List[ TubeState ]:
+        return list( self )
+
+    def save(
+            self,
+            file_path: str,
+            compress: bool = False,
+            ) -> None:
+        """
+        Save the series to a columnar npz file, see storage.save_columns.
+        """
+        save_columns(
+            file_path = file_path,
+            columns = self.columns(),
+            attributes = dict( sr = self.sr ),
+            compress = compress,
+            )
+        return
+
+    @classmethod
+    def load(
+            cls,
+            file_path: str,
+            fields: Optional[ Sequence[ str ] ] = None,
+            time_range: Optional[ Tuple[ float, float ] ] = None,
+            ):
+        """
+        Load a series that was saved with save.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the file.
+
+        fields : Sequence[str], optional
+            Fields to load, the other fields are None. If None, all
+            saved fields are loaded.
+
+        time_range : Tuple[float, float], optional
+            Start and stop time in seconds. Only the frames in this
+            range are read. If None, all frames are loaded.
+        """
+        columns, attributes = load_columns(
+            file_path,
+            fields = fields,
+            time_range = time_range,
+            )
+        sr = float( attributes[ 'sr' ] )
+        return cls( sr = sr, **columns )
+